@@ -0,0 +1,264 @@
+"""
+Decompressing bzip2 files with multiple threads, one block at a time.
+"""
+
+import bz2
+import io
+import mmap
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Optional, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from _typeshed import WriteableBuffer
+
+# every block starts with the 48-bit "magic number" 0x314159265359 (BCD pi), and every
+# stream ends with 0x177245385090 (BCD sqrt(pi)) followed by a 32-bit CRC of the whole stream...
+# neither is aligned to byte boundaries
+_BLOCK_MAGIC = 0x314159265359
+_END_OF_STREAM_MAGIC = 0x177245385090
+_MAGIC_BITS = 48
+_CRC_BITS = 32
+
+# 'BZh' followed by the block size ('1' - '9', in units of 100k)
+_STREAM_HEADER_BYTES = 4
+# header used for each block decompressed on its own... blocks written with a smaller
+# block size can always be read with the largest one
+_SINGLE_BLOCK_STREAM_HEADER = b"BZh9"
+
+# markers are searched for in windows of this size, so the first blocks can start
+# decompressing before the whole file has been scanned
+_SCAN_WINDOW_SIZE_BYTES = 16 * 1024 * 1024
+
+_BLOCK = "block"
+_END_OF_STREAM = "end-of-stream"
+
+
+def _marker_needles(magic: int) -> list[bytes]:
+    """
+    For each of the 8 possible bit offsets of ``magic`` within its first byte, the 5 bytes
+    that are entirely covered by it.
+    """
+    needles = []
+    for bit_offset in range(8):
+        # 'magic' starting at bit 'bit_offset' of a 7-byte window
+        window = (magic << (8 - bit_offset)).to_bytes(7, "big")
+        needles.append(window[1:6])
+    return needles
+
+
+_MARKER_NEEDLES = {
+    _BLOCK: _marker_needles(_BLOCK_MAGIC),
+    _END_OF_STREAM: _marker_needles(_END_OF_STREAM_MAGIC),
+}
+_MARKER_MAGICS = {_BLOCK: _BLOCK_MAGIC, _END_OF_STREAM: _END_OF_STREAM_MAGIC}
+
+
+def _read_bits(data: mmap.mmap, *, start_bit: int, num_bits: int) -> int:
+    first_byte = start_bit // 8
+    last_byte = -(-(start_bit + num_bits) // 8)
+    value = int.from_bytes(data[first_byte:last_byte], "big")
+    value >>= last_byte * 8 - (start_bit + num_bits)
+    return value & ((1 << num_bits) - 1)
+
+
+def _iter_markers(data: mmap.mmap) -> "Iterator[tuple[int, str]]":
+    """
+    Yield ``(bit offset, kind)`` for every block and end-of-stream marker in ``data``,
+    in order. Compressed data can contain the same bit pattern by chance (around once
+    every 2^48 bits), so a few of these might not really be markers.
+    """
+    for window_start in range(0, len(data), _SCAN_WINDOW_SIZE_BYTES):
+        window_end = min(window_start + _SCAN_WINDOW_SIZE_BYTES, len(data))
+        found = []
+        for kind, needles in _MARKER_NEEDLES.items():
+            for bit_offset, needle in enumerate(needles):
+                # a marker starting in byte 'i' has its needle at byte 'i + 1'
+                position = data.find(needle, window_start + 1, window_end + 6)
+                while position != -1:
+                    start_bit = (position - 1) * 8 + bit_offset
+                    if (
+                        position > 0
+                        and _read_bits(data, start_bit=start_bit, num_bits=_MAGIC_BITS)
+                        == _MARKER_MAGICS[kind]
+                    ):
+                        found.append((start_bit, kind))
+                    position = data.find(needle, position + 1, window_end + 6)
+        yield from sorted(found)
+
+
+class _UnexpectedLayoutError(Exception):
+    pass
+
+
+@dataclass
+class _Bzip2Block:
+    start_bit: int
+    end_bit: int
+    # if this is the last block of its stream, the CRC stored at the end of that stream
+    stream_crc: Optional[int] = None
+
+
+def _iter_blocks(data: mmap.mmap) -> "Iterator[_Bzip2Block]":
+    """
+    Yield the location of every block in the bzip2 file ``data``, in order. Raises
+    ``_UnexpectedLayoutError`` if the markers found don't line up with the expected
+    layout of a bzip2 file (i.e. some were false positives).
+    """
+    markers = _iter_markers(data)
+    stream_start = 0
+    # like 'bz2.decompress()', anything after the last stream that isn't
+    # another stream is ignored
+    while (
+        data[stream_start : stream_start + 3] == b"BZh"
+        and data[stream_start + 3 : stream_start + 4].isdigit()
+    ):
+        expected_bit = (stream_start + _STREAM_HEADER_BYTES) * 8
+        start_bit, kind = next(markers, (-1, ""))
+        if start_bit != expected_bit:
+            raise _UnexpectedLayoutError
+        while kind == _BLOCK:
+            end_bit, next_kind = next(markers, (-1, ""))
+            if end_bit == -1:
+                raise _UnexpectedLayoutError
+            stream_crc = None
+            if next_kind == _END_OF_STREAM:
+                stream_crc = _read_bits(
+                    data, start_bit=end_bit + _MAGIC_BITS, num_bits=_CRC_BITS
+                )
+            yield _Bzip2Block(
+                start_bit=start_bit, end_bit=end_bit, stream_crc=stream_crc
+            )
+            start_bit, kind = end_bit, next_kind
+        # streams are padded to a whole number of bytes
+        stream_start = -(-(start_bit + _MAGIC_BITS + _CRC_BITS) // 8)
+
+
+def _decompress_block(data: mmap.mmap, block: _Bzip2Block) -> tuple[bytes, int]:
+    """
+    Decompress one block, by copying it into a stream of its own. Returns the
+    decompressed data and the block's CRC.
+    """
+    num_bits = block.end_bit - block.start_bit
+    block_bits = _read_bits(data, start_bit=block.start_bit, num_bits=num_bits)
+    block_crc = (block_bits >> (num_bits - _MAGIC_BITS - _CRC_BITS)) & 0xFFFFFFFF
+    # a stream's CRC combines the CRCs of its blocks... for a stream with only 1 block,
+    # it's that block's CRC
+    stream_bits = (
+        (block_bits << (_MAGIC_BITS + _CRC_BITS))
+        | (_END_OF_STREAM_MAGIC << _CRC_BITS)
+        | block_crc
+    )
+    num_bits += _MAGIC_BITS + _CRC_BITS
+    padding_bits = -num_bits % 8
+    stream = (stream_bits << padding_bits).to_bytes(
+        (num_bits + padding_bits) // 8, "big"
+    )
+    return bz2.decompress(_SINGLE_BLOCK_STREAM_HEADER + stream), block_crc
+
+
+class _ParallelBzip2Reader(io.RawIOBase):
+    """
+    Read-only, forward-only view of the decompressed contents of a memory-mapped
+    bzip2 file.
+
+    bzip2 compresses each block (at most 900k of input) independently. This finds where
+    each block starts, and decompresses up to ``2 * jobs`` blocks ahead of the reader at
+    once, in threads (``bz2`` releases the GIL while decompressing).
+
+    If the file isn't laid out as expected (e.g. some data happened to look like a
+    block marker), or if decompressing a block fails, this switches to decompressing the
+    rest of the file sequentially with ``bz2.BZ2File``. That raises the same errors for
+    corrupt files as reading them sequentially always would.
+    """
+
+    def __init__(self, data: mmap.mmap, *, jobs: int):
+        super().__init__()
+        self._data = data
+        self._blocks = _iter_blocks(data)
+        self._executor = ThreadPoolExecutor(max_workers=jobs)
+        self._max_pending_blocks = 2 * jobs
+        self._pending: deque[tuple[_Bzip2Block, Future[tuple[bytes, int]]]] = deque()
+        self._all_blocks_submitted = False
+        self._buffer = b""
+        self._buffer_position = 0
+        self._num_bytes_decompressed = 0
+        self._stream_crc = 0
+        self._sequential_reader: Optional[bz2.BZ2File] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._sequential_reader is not None:
+            self._sequential_reader.close()
+        super().close()
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        view = memoryview(buffer).cast("B")
+        while self._buffer_position == len(self._buffer):
+            if self._sequential_reader is not None:
+                return self._sequential_reader.readinto(view)
+            if not self._next_block():
+                return 0
+        data = self._buffer[self._buffer_position : self._buffer_position + len(view)]
+        view[: len(data)] = data
+        self._buffer_position += len(data)
+        return len(data)
+
+    def _next_block(self) -> bool:
+        """
+        Replace ``_buffer`` with the next decompressed block. Returns ``False`` at the
+        end of the file.
+        """
+        try:
+            while (
+                not self._all_blocks_submitted
+                and len(self._pending) < self._max_pending_blocks
+            ):
+                block = next(self._blocks, None)
+                if block is None:
+                    self._all_blocks_submitted = True
+                else:
+                    self._pending.append(
+                        (
+                            block,
+                            self._executor.submit(_decompress_block, self._data, block),
+                        )
+                    )
+            if not self._pending:
+                return False
+            block, future = self._pending.popleft()
+            decompressed, block_crc = future.result()
+            self._stream_crc = (
+                ((self._stream_crc << 1) | (self._stream_crc >> 31)) & 0xFFFFFFFF
+            ) ^ block_crc
+            if block.stream_crc is not None:
+                if self._stream_crc != block.stream_crc:
+                    raise _UnexpectedLayoutError
+                self._stream_crc = 0
+        except (_UnexpectedLayoutError, EOFError, OSError, ValueError):
+            self._switch_to_sequential_reader()
+            return True
+
+        self._buffer = decompressed
+        self._buffer_position = 0
+        self._num_bytes_decompressed += len(decompressed)
+        return True
+
+    def _switch_to_sequential_reader(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending.clear()
+        self._data.seek(0)
+        self._sequential_reader = bz2.BZ2File(cast("IO[bytes]", self._data))
+        # skip everything that's already been read
+        num_bytes_to_skip = self._num_bytes_decompressed
+        while num_bytes_to_skip > 0:
+            skipped = self._sequential_reader.read(min(num_bytes_to_skip, 1024 * 1024))
+            if not skipped:
+                break
+            num_bytes_to_skip -= len(skipped)
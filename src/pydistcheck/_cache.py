@@ -0,0 +1,125 @@
+"""
+A small on-disk cache, used to avoid repeating expensive work
+across runs of ``pydistcheck``.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from contextlib import suppress
+from functools import lru_cache
+from typing import Any, Optional
+
+_HASH_CHUNK_SIZE_BYTES = 1024 * 1024
+
+# every key is a hex-encoded sha256 digest... this is used to ensure that pruning
+# only ever touches files that 'pydistcheck' wrote
+_CACHE_ENTRY_PATTERN = re.compile(r"^[0-9a-f]{64}\.json$")
+
+
+def _sha256_of_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=128)
+def _sha256_of_unchanged_file(path: str, size_bytes: int, mtime_ns: int) -> str:
+    # 'size_bytes' and 'mtime_ns' are only arguments so that they're part of the lru_cache key
+    return _sha256_of_file(path)
+
+
+def _sha256_of_distribution(path: str) -> str:
+    """
+    Like ``_sha256_of_file()``, but only reading the file once per process
+    as long as its size and modification time don't change.
+
+    Distributions can be very large, and their digests are needed in several places.
+    """
+    stat_result = os.stat(path)
+    return _sha256_of_unchanged_file(path, stat_result.st_size, stat_result.st_mtime_ns)
+
+
+def _sha256_of_json(obj: dict[str, Any]) -> str:
+    serialized = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class _DirectoryCache:
+    """
+    JSON documents stored in individual files under a local directory.
+
+    Entries are grouped into namespaces (one subdirectory each), and keyed by
+    hex-encoded sha256 digests. Writes are atomic, so multiple processes can safely
+    share a cache directory.
+
+    Reading an entry updates its modification time, and ``prune()`` removes
+    the least-recently-used entries until the cache is under ``max_size_bytes``.
+    """
+
+    def __init__(self, *, cache_dir: str, max_size_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+
+    def _path_for(self, *, namespace: str, key: str) -> str:
+        if _CACHE_ENTRY_PATTERN.match(f"{key}.json") is None:
+            msg = f"Cache keys must be hex-encoded sha256 digests, got '{key}'."
+            raise ValueError(msg)
+        return os.path.join(self.cache_dir, namespace, key[:2], f"{key}.json")
+
+    def get(self, *, namespace: str, key: str) -> Optional[dict[str, Any]]:
+        path = self._path_for(namespace=namespace, key=key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # mark this entry as recently-used, so it's not evicted
+        with suppress(OSError):
+            os.utime(path)
+
+        return value if isinstance(value, dict) else None
+
+    def put(self, *, namespace: str, key: str, value: dict[str, Any]) -> None:
+        path = self._path_for(namespace=namespace, key=key)
+        entry_dir = os.path.dirname(path)
+        os.makedirs(entry_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=entry_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def prune(self) -> None:
+        """
+        Remove least-recently-used entries until the total size of all
+        entries is at most ``max_size_bytes``.
+        """
+        entries: list[tuple[float, int, str]] = []
+        for root, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if _CACHE_ENTRY_PATTERN.match(file_name) is None:
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat_result = os.stat(path)
+                except OSError:  # pragma: no cover
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, path))
+
+        total_size_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size_bytes <= self.max_size_bytes:
+                break
+            with suppress(OSError):
+                os.remove(path)
+            total_size_bytes -= size
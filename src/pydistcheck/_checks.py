@@ -4,16 +4,24 @@ performs on distributions.
 """
 
 import os
+from abc import abstractmethod
 from collections import defaultdict
 from collections.abc import Sequence
-from fnmatch import fnmatchcase
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import TemporaryDirectory
-from typing import Protocol
-
-from ._distribution_summary import _DistributionSummary
-from ._file_utils import _extract_subset_of_files_from_archive
-from ._shared_lib_utils import _file_has_debug_symbols
-from ._utils import _FileSize
+from typing import Optional, Protocol, Union
+
+from . import __version__
+from ._cache import _DirectoryCache, _sha256_of_file
+from ._distribution_summary import _DataTier, _DistributionSummary
+from ._file_utils import (
+    _DirectoryInfo,
+    _extract_subset_of_files_from_archive,
+    _FileInfo,
+)
+from ._shared_lib_utils import _DebugSymbolsResult, _detect_debug_symbols
+from ._size_estimate import _SizeEstimate
+from ._utils import _FileSize, _PatternIndex
 
 # ALL_CHECKS constant is used to validate configuration options like '--ignore' that reference
 # check names. It's a set literal so it doesn't need to be recomputed at runtime, and this project
@@ -32,9 +40,19 @@ ALL_CHECKS = {
     "unexpected-files",
 }
 
+# cached results of checking individual compiled objects for debug symbols
+_DEBUG_SYMBOLS_CACHE_NAMESPACE = "debug-symbols"
+# incremented whenever entries written by an earlier build can't be used... e.g. 2
+# ignores entries from a build that could store the verdict for one member under
+# another member's digest (when their basenames were the same), and 3 ignores
+# entries without "detected_by"
+_DEBUG_SYMBOLS_CACHE_ENTRY_VERSION = 3
+
 
 class _CheckProtocol(Protocol):
     check_name: str
+    # least information about the distribution this check needs (see '_DataTier')
+    data_tier: int
 
     def __call__(
         self, distro_summary: _DistributionSummary
@@ -42,41 +60,226 @@ class _CheckProtocol(Protocol):
         ...
 
 
+class _StreamingCheck(_CheckProtocol):
+    """
+    Base class for checks that only need to look at one file or directory at a time.
+    Subclasses have to implement ``reset()``, ``observe()``, and ``finalize()``.
+
+    ``observe()`` is called with each member of a distribution (e.g. while it's being read,
+    see ``_StreamingChecksObserver``), and then ``finalize()`` returns the results.
+    ``__call__()`` adapts that to checking a whole ``_DistributionSummary`` at once.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    @abstractmethod
+    def reset(self) -> None:
+        """
+        Forget every member observed so far, to start checking another distribution.
+        """
+
+    @abstractmethod
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None: ...
+
+    @abstractmethod
+    def finalize(self) -> list[str]: ...
+
+    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
+        self.reset()
+        for file_info in distro_summary.files:
+            self.observe(file_info)
+        for directory_info in distro_summary.directories:
+            self.observe(directory_info)
+        return self.finalize()
+
+
+_DATA_TIER_DESCRIPTIONS = {
+    _DataTier.NONE: "the distribution itself",
+    _DataTier.NAMES: "file names",
+    _DataTier.SIZES: "file sizes",
+    _DataTier.HEADERS: "file headers",
+    _DataTier.CONTENT: "file contents",
+}
+
+
+def _reason_check_cannot_run(
+    *, check: _CheckProtocol, distro_summary: _DistributionSummary
+) -> Optional[str]:
+    """
+    Explain why ``check`` can't be run on ``distro_summary``, e.g. because that summary was built
+    from a manifest instead of the distribution itself. Returns ``None`` if it can be run.
+    """
+    if check.data_tier > distro_summary.data_tier:
+        return f"{_DATA_TIER_DESCRIPTIONS[check.data_tier]} not available"
+    if (
+        isinstance(check, _DistroTooLargeCompressedCheck)
+        and distro_summary.compressed_size_bytes is None
+    ):
+        return "compressed size not available"
+    return None
+
+
 class _CompiledObjectsDebugSymbolCheck(_CheckProtocol):
     check_name = "compiled-objects-have-debug-symbols"
+    data_tier = _DataTier.CONTENT
+
+    def __init__(self, *, jobs: int, cache: Optional[_DirectoryCache] = None):
+        if jobs < 1:
+            msg = f"'jobs' must be a positive integer, got {jobs}."
+            raise ValueError(msg)
+        self.jobs = jobs
+        self.cache = cache
+        # how the result for each compiled object checked by the last call was decided
+        # (e.g. "built-in ELF parser" or "objdump -W")
+        self.detected_by: dict[str, str] = {}
+
+    def _cached_result(self, digest: str) -> Optional[_DebugSymbolsResult]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(namespace=_DEBUG_SYMBOLS_CACHE_NAMESPACE, key=digest)
+        if (
+            cached is None
+            or cached.get("pydistcheck_version") != __version__
+            or cached.get("entry_version") != _DEBUG_SYMBOLS_CACHE_ENTRY_VERSION
+        ):
+            return None
+        return _DebugSymbolsResult(
+            has_debug_symbols=bool(cached["has_debug_symbols"]),
+            command=str(cached["command"]),
+            detected_by=str(cached["detected_by"]),
+        )
+
+    def _detect_debug_symbols(
+        self, *, file_absolute_path: str, file_format: str, digest: Optional[str]
+    ) -> _DebugSymbolsResult:
+        """
+        Like ``_detect_debug_symbols()``, but reusing results for files with exactly
+        the same content (e.g. vendored libraries) from previous runs, if a cache was provided.
+        """
+        if self.cache is None:
+            return _detect_debug_symbols(file_absolute_path, file_format=file_format)
+
+        key = digest or _sha256_of_file(file_absolute_path)
+        cached_result = self._cached_result(key)
+        if cached_result is not None:
+            return cached_result
+
+        result = _detect_debug_symbols(file_absolute_path, file_format=file_format)
+        self.cache.put(
+            namespace=_DEBUG_SYMBOLS_CACHE_NAMESPACE,
+            key=key,
+            value={
+                "pydistcheck_version": __version__,
+                "entry_version": _DEBUG_SYMBOLS_CACHE_ENTRY_VERSION,
+                "has_debug_symbols": result.has_debug_symbols,
+                "command": result.command,
+                "detected_by": result.detected_by,
+            },
+        )
+        return result
+
+    def cached_detected_by(
+        self, distro_summary: _DistributionSummary
+    ) -> Optional[dict[str, str]]:
+        """
+        Like ``detected_by``, but only from results cached by previous runs (without checking
+        anything). ``None`` unless there's a cached result for every compiled object.
+        """
+        out = {}
+        digests = distro_summary.compiled_object_digests
+        for file_info in distro_summary.compiled_objects:
+            digest = digests.get(file_info.name)
+            cached_result = None if digest is None else self._cached_result(digest)
+            if cached_result is None:
+                return None
+            out[file_info.name] = cached_result.detected_by
+        return out
 
     def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
         out: list[str] = []
-        compiled_object_paths = [
-            file_info.name for file_info in distro_summary.compiled_objects
-        ]
-        if not compiled_object_paths:
+        self.detected_by = {}
+        compiled_objects = distro_summary.compiled_objects
+        if not compiled_objects:
             return out
 
-        with TemporaryDirectory() as tmp_dir:
-            _extract_subset_of_files_from_archive(
-                archive_file=distro_summary.original_file,
-                archive_format=distro_summary.archive_format,
-                relative_paths=compiled_object_paths,
-                out_dir=tmp_dir,
+        # if the content of a compiled object is already known (e.g. from a summary stored
+        # by a previous run), results can come straight from the cache without reading it
+        digests = distro_summary.compiled_object_digests
+        results: dict[str, _DebugSymbolsResult] = {}
+        for file_info in compiled_objects:
+            digest = digests.get(file_info.name)
+            cached_result = None if digest is None else self._cached_result(digest)
+            if cached_result is not None:
+                results[file_info.name] = cached_result
+
+        files_to_check = [f for f in compiled_objects if f.name not in results]
+        if files_to_check:
+            results.update(
+                self._check_files(
+                    distro_summary=distro_summary, files_to_check=files_to_check
+                )
             )
 
-            for file_relative_path in compiled_object_paths:
-                has_debug_symbols, cmd_str = _file_has_debug_symbols(
-                    file_absolute_path=os.path.join(tmp_dir, file_relative_path)
+        for file_info in compiled_objects:
+            file_relative_path = file_info.name
+            result = results[file_relative_path]
+            self.detected_by[file_relative_path] = result.detected_by
+            if result.has_debug_symbols:
+                msg = (
+                    f"[{self.check_name}] Found compiled object containing debug symbols. "
+                    "For details, extract the distribution contents and run "
+                    f"'{result.command} \"{file_relative_path}\"'."
                 )
-                if has_debug_symbols:
-                    msg = (
-                        f"[{self.check_name}] Found compiled object containing debug symbols. "
-                        "For details, extract the distribution contents and run "
-                        f"'{cmd_str} \"{file_relative_path}\"'."
-                    )
-                    out.append(msg)
+                out.append(msg)
         return out
 
+    def _check_files(
+        self, *, distro_summary: _DistributionSummary, files_to_check: list[_FileInfo]
+    ) -> dict[str, _DebugSymbolsResult]:
+        relative_paths = [file_info.name for file_info in files_to_check]
+        digests = distro_summary.compiled_object_digests
+        with TemporaryDirectory() as tmp_dir:
+            # compiled objects are usually captured while building the summary... only go
+            # back to the archive for any that weren't
+            captured = distro_summary.compiled_object_contents
+            paths_to_extract = [p for p in relative_paths if p not in captured]
+            if paths_to_extract:
+                _extract_subset_of_files_from_archive(
+                    archive_file=distro_summary.original_file,
+                    archive_format=distro_summary.archive_format,
+                    relative_paths=paths_to_extract,
+                    out_dir=tmp_dir,
+                )
+            absolute_paths = {
+                p: (
+                    captured.materialize(p, out_dir=tmp_dir)
+                    if p in captured
+                    else os.path.join(tmp_dir, p)
+                )
+                for p in relative_paths
+            }
+
+            # Checking a file mostly means waiting on file I/O or external processes, so threads
+            # work well here. Each one works on 1 file (and runs at most 1 process) at a time.
+            #
+            # Executor.map() yields results in the same order as its inputs, so output
+            # doesn't depend on which files happen to finish first.
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                results = executor.map(
+                    lambda file_info: self._detect_debug_symbols(
+                        file_absolute_path=absolute_paths[file_info.name],
+                        file_format=file_info.file_format,
+                        digest=digests.get(file_info.name),
+                    ),
+                    files_to_check,
+                )
+                return dict(zip(relative_paths, results))
+
 
 class _DistroTooLargeCompressedCheck(_CheckProtocol):
     check_name = "distro-too-large-compressed"
+    data_tier = _DataTier.NONE
 
     def __init__(
         self,
@@ -91,6 +294,8 @@ class _DistroTooLargeCompressedCheck(_CheckProtocol):
 
     def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
         out: list[str] = []
+        if distro_summary.compressed_size_bytes is None:
+            return out
         max_size = _FileSize(num=self.max_allowed_size_bytes, unit_str="B")
         actual_size = _FileSize(num=distro_summary.compressed_size_bytes, unit_str="B")
         if actual_size > max_size:
@@ -112,6 +317,7 @@ class _DistroTooLargeCompressedCheck(_CheckProtocol):
 
 class _DistroTooLargeUnCompressedCheck(_CheckProtocol):
     check_name = "distro-too-large-uncompressed"
+    data_tier = _DataTier.SIZES
 
     def __init__(
         self,
@@ -125,11 +331,35 @@ class _DistroTooLargeUnCompressedCheck(_CheckProtocol):
         self.output_file_size_unit = output_file_size_unit
 
     def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
+        return self._check_size(distro_summary.uncompressed_size_bytes)
+
+    def check_estimate(self, estimate: _SizeEstimate) -> Optional[list[str]]:
+        """
+        Run this check against an estimate of the uncompressed size (see
+        ``_estimate_uncompressed_size()``). Returns ``None`` if the estimate isn't
+        enough to tell whether the distribution passes... an upper bound that's
+        larger than the allowed size.
+        """
+        if (
+            estimate.is_upper_bound
+            and estimate.size_bytes > self.max_allowed_size_bytes
+        ):
+            return None
+        return self._check_size(
+            estimate.size_bytes, qualifier=f" (estimated from {estimate.source})"
+        )
+
+    def check_running_size(self, size_bytes: int) -> list[str]:
+        """
+        Like ``__call__()``, but for the total size of files read so far
+        (see ``_FailFastObserver``).
+        """
+        return self._check_size(size_bytes, qualifier=" (of the files read so far)")
+
+    def _check_size(self, size_bytes: int, *, qualifier: str = "") -> list[str]:
         out: list[str] = []
         max_size = _FileSize(num=self.max_allowed_size_bytes, unit_str="B")
-        actual_size = _FileSize(
-            num=distro_summary.uncompressed_size_bytes, unit_str="B"
-        )
+        actual_size = _FileSize(num=size_bytes, unit_str="B")
         if actual_size > max_size:
             actual_size_str = actual_size.to_string(
                 precision=self.output_file_size_precision,
@@ -140,8 +370,8 @@ class _DistroTooLargeUnCompressedCheck(_CheckProtocol):
                 unit_str=self.output_file_size_unit,
             )
             msg = (
-                f"[{self.check_name}] Uncompressed size {actual_size_str} is larger "
-                f"than the allowed size ({max_size_str})."
+                f"[{self.check_name}] Uncompressed size {actual_size_str}{qualifier} "
+                f"is larger than the allowed size ({max_size_str})."
             )
             out.append(msg)
         return out
@@ -149,33 +379,45 @@ class _DistroTooLargeUnCompressedCheck(_CheckProtocol):
 
 class _FileCountCheck(_CheckProtocol):
     check_name = "too-many-files"
+    data_tier = _DataTier.NAMES
 
     def __init__(self, *, max_allowed_files: int):
         self.max_allowed_files = max_allowed_files
 
     def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
+        return self._check_count(distro_summary.num_files)
+
+    def check_running_count(self, num_files: int) -> list[str]:
+        """
+        Like ``__call__()``, but for the number of files read so far (see ``_FailFastObserver``).
+        """
+        return self._check_count(num_files, qualifier="at least ")
+
+    def _check_count(self, num_files: int, *, qualifier: str = "") -> list[str]:
         out: list[str] = []
-        num_files = distro_summary.num_files
         if num_files > self.max_allowed_files:
             msg = (
-                f"[{self.check_name}] Found {num_files} files. "
+                f"[{self.check_name}] Found {qualifier}{num_files} files. "
                 f"Only {self.max_allowed_files} allowed."
             )
             out.append(msg)
         return out
 
 
-class _FilesOnlyDifferByCaseCheck(_CheckProtocol):
+class _FilesOnlyDifferByCaseCheck(_StreamingCheck):
     check_name = "files-only-differ-by-case"
+    data_tier = _DataTier.NAMES
 
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
-        out: list[str] = []
-        path_lower_to_raw = defaultdict(list)
-        for file_path in distro_summary.all_paths:
-            path_lower_to_raw[file_path.lower()].append(file_path)
+    def reset(self) -> None:
+        self.path_lower_to_raw: defaultdict[str, list[str]] = defaultdict(list)
 
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        self.path_lower_to_raw[member.name.lower()].append(member.name)
+
+    def finalize(self) -> list[str]:
+        out: list[str] = []
         duplicates_list: list[str] = []
-        for filepaths in path_lower_to_raw.values():
+        for filepaths in self.path_lower_to_raw.values():
             if len(filepaths) > 1:
                 duplicates_list += filepaths
 
@@ -186,29 +428,36 @@ class _FilesOnlyDifferByCaseCheck(_CheckProtocol):
                 f"Files: {duplicates_str}"
             )
             out.append(msg)
+        self.reset()
         return out
 
 
-class _NonAsciiCharacterCheck(_CheckProtocol):
+class _NonAsciiCharacterCheck(_StreamingCheck):
     check_name = "path-contains-non-ascii-characters"
+    data_tier = _DataTier.NAMES
 
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
-        out: list[str] = []
-        for file_path in distro_summary.all_paths:
-            if not file_path.isascii():
-                ascii_converted_str = file_path.encode("ascii", "replace").decode(
-                    "ascii"
-                )
-                msg = (
-                    f"[{self.check_name}] Found file path containing non-ASCII characters: "
-                    f"'{ascii_converted_str}'"
-                )
-                out.append(msg)
+    def reset(self) -> None:
+        self.out: list[str] = []
+
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        file_path = member.name
+        if not file_path.isascii():
+            ascii_converted_str = file_path.encode("ascii", "replace").decode("ascii")
+            msg = (
+                f"[{self.check_name}] Found file path containing non-ASCII characters: "
+                f"'{ascii_converted_str}'"
+            )
+            self.out.append(msg)
+
+    def finalize(self) -> list[str]:
+        out = self.out
+        self.reset()
         return out
 
 
-class _MixedFileExtensionCheck(_CheckProtocol):
+class _MixedFileExtensionCheck(_StreamingCheck):
     check_name = "mixed-file-extensions"
+    data_tier = _DataTier.NAMES
 
     file_ext_groups = (
         {".cc", ".CC", ".cpp", ".CPP"},
@@ -219,14 +468,20 @@ class _MixedFileExtensionCheck(_CheckProtocol):
         {".yaml", ".YAML", ".yml", ".YML"},
     )
 
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
+    def reset(self) -> None:
+        self.count_by_file_extension: defaultdict[str, int] = defaultdict(int)
+
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        if isinstance(member, _FileInfo):
+            self.count_by_file_extension[member.file_extension] += 1
+
+    def finalize(self) -> list[str]:
         out: list[str] = []
-        file_extensions_in_distro = set(distro_summary.files_by_extension.keys())
         for file_ext_group in self.file_ext_groups:
-            extensions_found = file_ext_group.intersection(file_extensions_in_distro)
+            extensions_found = file_ext_group.intersection(self.count_by_file_extension)
             if len(extensions_found) >= 2:
                 count_str = ", ".join(
-                    f"{ext} ({distro_summary.count_by_file_extension[ext]})"
+                    f"{ext} ({self.count_by_file_extension[ext]})"
                     for ext in sorted(extensions_found)
                 )
                 msg = (
@@ -234,43 +489,58 @@ class _MixedFileExtensionCheck(_CheckProtocol):
                     f"the same file type: {count_str}"
                 )
                 out.append(msg)
+        self.reset()
         return out
 
 
-class _PathTooLongCheck(_CheckProtocol):
+class _PathTooLongCheck(_StreamingCheck):
     check_name = "path-too-long"
+    data_tier = _DataTier.NAMES
 
     def __init__(self, *, max_path_length: int):
         self.max_path_length = max_path_length
+        super().__init__()
 
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
-        out: list[str] = []
-        bad_paths = [
-            p for p in distro_summary.all_paths if len(p) > self.max_path_length
-        ]
-        for file_path in bad_paths:
+    def reset(self) -> None:
+        self.out: list[str] = []
+
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        file_path = member.name
+        if len(file_path) > self.max_path_length:
             msg = (
                 f"[{self.check_name}] Path too long ({len(file_path)} > {self.max_path_length}): "
                 f"'{file_path}'"
             )
-            out.append(msg)
+            self.out.append(msg)
+
+    def finalize(self) -> list[str]:
+        out = self.out
+        self.reset()
         return out
 
 
-class _SpacesInPathCheck(_CheckProtocol):
+class _SpacesInPathCheck(_StreamingCheck):
     check_name = "path-contains-spaces"
+    data_tier = _DataTier.NAMES
 
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
-        out: list[str] = []
-        for file_path in distro_summary.all_paths:
-            if file_path != file_path.replace(" ", ""):
-                msg = f"[{self.check_name}] Found path with spaces: '{file_path}'"
-                out.append(msg)
+    def reset(self) -> None:
+        self.out: list[str] = []
+
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        file_path = member.name
+        if file_path != file_path.replace(" ", ""):
+            msg = f"[{self.check_name}] Found path with spaces: '{file_path}'"
+            self.out.append(msg)
+
+    def finalize(self) -> list[str]:
+        out = self.out
+        self.reset()
         return out
 
 
-class _ExpectedFilesCheck(_CheckProtocol):
+class _ExpectedFilesCheck(_StreamingCheck):
     check_name = "expected-files"
+    data_tier = _DataTier.NAMES
 
     def __init__(
         self,
@@ -282,38 +552,48 @@ class _ExpectedFilesCheck(_CheckProtocol):
             d for d in directory_patterns if not d.startswith("!")
         ]
         self.file_patterns = [f for f in file_patterns if not f.startswith("!")]
+        self.directory_pattern_index = _PatternIndex(self.directory_patterns)
+        self.file_pattern_index = _PatternIndex(self.file_patterns)
+        super().__init__()
+
+    def reset(self) -> None:
+        # positions of patterns that haven't matched anything yet
+        self.missing_file_patterns = set(range(len(self.file_patterns)))
+        self.missing_directory_patterns = set(range(len(self.directory_patterns)))
+
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        # once every pattern has matched something, there's nothing left to look for
+        if isinstance(member, _FileInfo):
+            if self.missing_file_patterns:
+                self.missing_file_patterns.difference_update(
+                    self.file_pattern_index.match(member.name)
+                )
+        elif self.missing_directory_patterns:
+            self.missing_directory_patterns.difference_update(
+                self.directory_pattern_index.match_directory(member.name)
+            )
 
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
+    def finalize(self) -> list[str]:
         out: list[str] = []
-        for pattern in self.file_patterns:
-            found_any = False
-            for file_path in distro_summary.file_paths:
-                if fnmatchcase(file_path, pattern):
-                    found_any = True
-                    break
-
-            if not found_any:
-                msg = f"[{self.check_name}] Did not find any files matching pattern '{pattern}'."
-                out.append(msg)
-
-        for pattern in self.directory_patterns:
-            found_any = False
-            for directory_path in distro_summary.directory_paths:
-                # NOTE: some archive formats have a trailing "/" on directory names,
-                #       some do not
-                if fnmatchcase(directory_path, pattern) or fnmatchcase(
-                    directory_path, pattern + "/"
-                ):
-                    found_any = True
-                    break
-            if not found_any:
-                msg = f"[{self.check_name}] Did not find any directories matching pattern '{pattern}'."
-                out.append(msg)
+        for i in sorted(self.missing_file_patterns):
+            msg = (
+                f"[{self.check_name}] Did not find any files matching pattern "
+                f"'{self.file_patterns[i]}'."
+            )
+            out.append(msg)
+        for i in sorted(self.missing_directory_patterns):
+            msg = (
+                f"[{self.check_name}] Did not find any directories matching pattern "
+                f"'{self.directory_patterns[i]}'."
+            )
+            out.append(msg)
+        self.reset()
         return out
 
 
-class _UnexpectedFilesCheck(_CheckProtocol):
+class _UnexpectedFilesCheck(_StreamingCheck):
     check_name = "unexpected-files"
+    data_tier = _DataTier.NAMES
 
     def __init__(
         self,
@@ -325,22 +605,114 @@ class _UnexpectedFilesCheck(_CheckProtocol):
             d[1:] for d in directory_patterns if d.startswith("!")
         ]
         self.file_patterns = [f[1:] for f in file_patterns if f.startswith("!")]
-
-    def __call__(self, distro_summary: _DistributionSummary) -> list[str]:
+        self.directory_pattern_index = _PatternIndex(self.directory_patterns)
+        self.file_pattern_index = _PatternIndex(self.file_patterns)
+        super().__init__()
+
+    def reset(self) -> None:
+        self.unexpected_files: list[str] = []
+        self.unexpected_directories: list[str] = []
+
+    def observe(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        # reported once for each pattern the member matches
+        if isinstance(member, _FileInfo):
+            for _ in self.file_pattern_index.match(member.name):
+                self.unexpected_files.append(member.name)
+        else:
+            for _ in self.directory_pattern_index.match_directory(member.name):
+                self.unexpected_directories.append(member.name)
+
+    def finalize(self) -> list[str]:
         out: list[str] = []
-        for file_path in distro_summary.file_paths:
-            for pattern in self.file_patterns:
-                if fnmatchcase(file_path, pattern):
-                    msg = f"[{self.check_name}] Found unexpected file '{file_path}'."
-                    out.append(msg)
-
-        for directory_path in distro_summary.directory_paths:
-            for pattern in self.directory_patterns:
-                # NOTE: some archive formats have a trailing "/" on directory names,
-                #       some do not
-                if fnmatchcase(directory_path, pattern) or fnmatchcase(
-                    directory_path, pattern + "/"
-                ):
-                    msg = f"[{self.check_name}] Found unexpected directory '{directory_path}'."
-                    out.append(msg)
+        for file_path in self.unexpected_files:
+            msg = f"[{self.check_name}] Found unexpected file '{file_path}'."
+            out.append(msg)
+        for directory_path in self.unexpected_directories:
+            msg = f"[{self.check_name}] Found unexpected directory '{directory_path}'."
+            out.append(msg)
+        self.reset()
         return out
+
+
+class _LimitExceededError(Exception):
+    """
+    Raised by ``_FailFastObserver`` while a distribution is being read, as soon as
+    some check is certain to fail.
+    """
+
+    def __init__(self, errors: list[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+class _FailFastObserver:
+    """
+    For ``--fail-fast``... keeps running totals for checks whose limits can only be
+    exceeded by reading more of a distribution (the number of files and their total
+    uncompressed size), and raises ``_LimitExceededError`` as soon as one is exceeded.
+
+    Pass this as ``member_observer`` to ``_DistributionSummary.from_file()``.
+    """
+
+    def __init__(self, checks: Sequence[_CheckProtocol]):
+        self.file_count_checks = [c for c in checks if isinstance(c, _FileCountCheck)]
+        self.size_checks = [
+            c for c in checks if isinstance(c, _DistroTooLargeUnCompressedCheck)
+        ]
+        self.num_files = 0
+        self.uncompressed_size_bytes = 0
+
+    def __call__(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        if not isinstance(member, _FileInfo):
+            return
+        self.num_files += 1
+        self.uncompressed_size_bytes += member.uncompressed_size_bytes
+        errors: list[str] = []
+        for file_count_check in self.file_count_checks:
+            errors += file_count_check.check_running_count(self.num_files)
+        for size_check in self.size_checks:
+            errors += size_check.check_running_size(self.uncompressed_size_bytes)
+        if errors:
+            raise _LimitExceededError(errors)
+
+
+class _StreamingChecksObserver:
+    """
+    Runs every ``_StreamingCheck`` in ``checks`` together, in a single loop over the members
+    of a distribution as they're read. Pass this as ``member_observer`` to
+    ``_DistributionSummary.from_file()``, and then get each check's results with ``run_check()``.
+
+    With ``fail_fast=True``, also raises ``_LimitExceededError`` as soon as a limit is
+    exceeded (see ``_FailFastObserver``).
+    """
+
+    def __init__(self, checks: Sequence[_CheckProtocol], *, fail_fast: bool = False):
+        self.streaming_checks = [c for c in checks if isinstance(c, _StreamingCheck)]
+        for this_check in self.streaming_checks:
+            this_check.reset()
+        self.fail_fast_observer = _FailFastObserver(checks) if fail_fast else None
+        self.num_members_observed = 0
+
+    def __call__(self, member: Union[_FileInfo, _DirectoryInfo]) -> None:
+        self.num_members_observed += 1
+        for this_check in self.streaming_checks:
+            this_check.observe(member)
+        if self.fail_fast_observer is not None:
+            self.fail_fast_observer(member)
+
+    def run_check(
+        self, this_check: _CheckProtocol, *, distro_summary: _DistributionSummary
+    ) -> list[str]:
+        """
+        Results of ``this_check`` for ``distro_summary``... from the members observed while it was
+        read if possible, otherwise (e.g. for summaries stored by a previous run, which
+        are never read member by member) from the whole summary.
+        """
+        num_members = distro_summary.num_files + distro_summary.num_directories
+        if (
+            isinstance(this_check, _StreamingCheck)
+            and this_check in self.streaming_checks
+            and self.num_members_observed == num_members
+        ):
+            return this_check.finalize()
+        return this_check(distro_summary=distro_summary)
@@ -16,10 +16,14 @@ from ._compat import tomllib
 #
 # unit tests confirm that it matches the `_Config` class, so it shouldn't ever drift from that class
 _ALLOWED_CONFIG_VALUES = {
+    "cache_dir",
+    "cache_max_size",
+    "decompression_backend",
     "expected_directories",
     "expected_files",
     "ignore",
     "inspect",
+    "jobs",
     "max_allowed_files",
     "max_allowed_size_compressed",
     "max_allowed_size_uncompressed",
@@ -29,6 +33,15 @@ _ALLOWED_CONFIG_VALUES = {
     "select",
 }
 
+# configuration values that control how 'pydistcheck' runs, but can't change the results of checks
+_RUNTIME_ONLY_CONFIG_VALUES = {
+    "cache_dir",
+    "cache_max_size",
+    "decompression_backend",
+    "inspect",
+    "jobs",
+}
+
 _EXPECTED_DIRECTORIES = (
     "!*/.appveyor",
     "!*/.binder",
@@ -64,10 +77,14 @@ _EXPECTED_FILES = (
 
 @dataclass
 class _Config:
+    cache_dir: str = ""
+    cache_max_size: str = "1G"
+    decompression_backend: str = "auto"
     expected_directories: Sequence[str] = _EXPECTED_DIRECTORIES
     expected_files: Sequence[str] = _EXPECTED_FILES
     ignore: Sequence[str] = ()
     inspect: bool = False
+    jobs: int = 1
     max_allowed_files: int = 2000
     max_allowed_size_compressed: str = "50M"
     max_allowed_size_uncompressed: str = "75M"
@@ -81,8 +98,26 @@ class _Config:
         if attr_name not in _ALLOWED_CONFIG_VALUES:
             msg = f"Configuration value '{name}' is not recognized by pydistcheck"
             raise ValueError(msg)
+        if attr_name == "jobs" and (
+            isinstance(value, bool) or not isinstance(value, int) or value < 1
+        ):
+            msg = f"Configuration value '{name}' must be a positive integer, got {value!r}."
+            raise ValueError(msg)
         object.__setattr__(self, attr_name, value)
 
+    def check_result_settings(self) -> dict[str, object]:
+        """
+        Configuration values that can change the results of checks, normalized
+        so they compare (and serialize) the same way regardless of where they came from.
+        """
+        out: dict[str, object] = {}
+        for name in sorted(_ALLOWED_CONFIG_VALUES - _RUNTIME_ONLY_CONFIG_VALUES):
+            value = getattr(self, name)
+            if isinstance(value, (list, tuple)):
+                value = list(value)
+            out[name] = value
+        return out
+
     def update_from_dict(self, input_dict: dict[str, object]) -> "_Config":
         for k, v in input_dict.items():
             setattr(self, k, v)
@@ -0,0 +1,429 @@
+"""
+Decompressing gzip, bzip2, and zstd streams with the fastest of the available
+decompressors ("backends"), including external programs like ``pigz``.
+"""
+
+import gzip
+import importlib.util
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import IO, TYPE_CHECKING, Optional, cast
+
+from ._file_utils import (
+    _ArchiveFormat,
+    _guess_archive_format,
+    _is_stream,
+    _mapped_file,
+    _open_bzip2_stream,
+    _open_zstd_stream,
+)
+from ._remote import _is_url
+from ._shared_lib_utils import _tool_is_available
+
+if TYPE_CHECKING:
+    import mmap
+    from collections.abc import Iterator
+
+_COPY_CHUNK_SIZE_BYTES = 1024 * 1024
+
+
+class _Compression:
+    BZIP2 = "bzip2"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+class _DecompressionBackend:
+    # the fastest available backend for each compression format
+    AUTO = "auto"
+    # 'isal' library (https://github.com/pycompression/python-isal)
+    ISAL = "isal"
+    # 'lbzip2' program, which decompresses bzip2 with multiple threads
+    LBZIP2 = "lbzip2"
+    # 'pigz' program
+    PIGZ = "pigz"
+    # modules that come with Python ('gzip', 'bz2', 'compression.zstd'), or the
+    # 'zstandard' library for zstd before Python 3.14
+    PYTHON = "python"
+    # 'zlib-ng' library (https://github.com/pycompression/python-zlib-ng)
+    ZLIB_NG = "zlib-ng"
+    # 'zstd' program
+    ZSTD = "zstd"
+
+
+_ALL_DECOMPRESSION_BACKENDS = (
+    _DecompressionBackend.AUTO,
+    _DecompressionBackend.ISAL,
+    _DecompressionBackend.LBZIP2,
+    _DecompressionBackend.PIGZ,
+    _DecompressionBackend.PYTHON,
+    _DecompressionBackend.ZLIB_NG,
+    _DecompressionBackend.ZSTD,
+)
+
+# backends that can decompress each format, fastest first
+_BACKENDS_BY_COMPRESSION = {
+    _Compression.GZIP: (
+        _DecompressionBackend.ISAL,
+        _DecompressionBackend.ZLIB_NG,
+        _DecompressionBackend.PIGZ,
+        _DecompressionBackend.PYTHON,
+    ),
+    _Compression.BZIP2: (
+        _DecompressionBackend.LBZIP2,
+        _DecompressionBackend.PYTHON,
+    ),
+    # 'zstd' is no faster than the in-process decompressor, but can be used
+    # if 'zstandard' isn't installed
+    _Compression.ZSTD: (
+        _DecompressionBackend.PYTHON,
+        _DecompressionBackend.ZSTD,
+    ),
+}
+
+_EXTERNAL_COMMANDS = {
+    _DecompressionBackend.LBZIP2: ["lbzip2", "--decompress", "--stdout"],
+    _DecompressionBackend.PIGZ: ["pigz", "--decompress", "--stdout"],
+    _DecompressionBackend.ZSTD: ["zstd", "--decompress", "--stdout", "--quiet"],
+}
+
+_LIBRARY_MODULES = {
+    _DecompressionBackend.ISAL: "isal",
+    _DecompressionBackend.ZLIB_NG: "zlib_ng",
+}
+
+_COMPRESSION_BY_ARCHIVE_FORMAT = {
+    _ArchiveFormat.BZIP2_TAR: _Compression.BZIP2,
+    _ArchiveFormat.CONDA: _Compression.ZSTD,
+    _ArchiveFormat.GZIP_TAR: _Compression.GZIP,
+    _ArchiveFormat.ZSTD_TAR: _Compression.ZSTD,
+}
+
+
+def _module_is_available(module_name: str) -> bool:
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:
+        # raised for submodules of packages that don't exist, like 'compression.zstd'
+        return False
+
+
+@lru_cache
+def _backend_is_available(backend: str, *, compression: Optional[str] = None) -> bool:
+    """
+    Check whether ``backend`` can be used in this environment (for ``compression``,
+    if provided). Cached, so each library or program is only looked for once per process.
+    """
+    if backend in _EXTERNAL_COMMANDS:
+        return _tool_is_available(_EXTERNAL_COMMANDS[backend][0])
+    if backend in _LIBRARY_MODULES:
+        return _module_is_available(_LIBRARY_MODULES[backend])
+    if backend == _DecompressionBackend.PYTHON and compression == _Compression.ZSTD:
+        return _module_is_available("compression.zstd") or _module_is_available(
+            "zstandard"
+        )
+    return backend in _ALL_DECOMPRESSION_BACKENDS
+
+
+def _raise_if_backend_is_unavailable(backend: str) -> None:
+    """
+    Raise a ``ValueError`` explaining why ``backend`` can't be used,
+    if it can't be used.
+    """
+    if backend not in _ALL_DECOMPRESSION_BACKENDS:
+        msg = (
+            f"Unrecognized decompression backend '{backend}'. "
+            f"Valid values: {', '.join(_ALL_DECOMPRESSION_BACKENDS)}"
+        )
+        raise ValueError(msg)
+    if _backend_is_available(backend):
+        return
+    if backend in _EXTERNAL_COMMANDS:
+        msg = (
+            f"Decompression backend '{backend}' requires the '{backend}' program, "
+            "which was not found on PATH."
+        )
+    else:
+        msg = (
+            f"Decompression backend '{backend}' requires the '{backend}' library. "
+            f"Install it with e.g. 'pip install {backend}'."
+        )
+    raise ValueError(msg)
+
+
+@lru_cache
+def _archive_read_errors() -> tuple[type[Exception], ...]:
+    """
+    Exceptions raised while reading a truncated or corrupt archive, by the standard
+    library or any of the decompression backends that are installed.
+
+    ``OSError`` covers external programs like ``pigz``, which fail with
+    whatever they wrote to ``stderr`` (see ``_open_external_decompressor_stream()``).
+    """
+    errors: list[type[Exception]] = [
+        EOFError,
+        OSError,
+        tarfile.TarError,
+        zipfile.BadZipFile,
+        zlib.error,
+    ]
+    if _module_is_available("isal"):
+        from isal import igzip_lib  # noqa: PLC0415
+
+        errors.append(cast("type[Exception]", igzip_lib.IsalError))
+    if _module_is_available("zlib_ng"):
+        from zlib_ng import zlib_ng  # noqa: PLC0415
+
+        errors.append(cast("type[Exception]", zlib_ng.error))
+    if _module_is_available("zstandard"):
+        import zstandard  # noqa: PLC0415
+
+        errors.append(zstandard.ZstdError)
+    if _module_is_available("compression.zstd"):  # pragma: no cover
+        from compression import zstd  # noqa: PLC0415
+
+        errors.append(zstd.ZstdError)
+    return tuple(errors)
+
+
+def _choose_backend(*, compression: str, backend: str) -> str:
+    """
+    Resolve ``backend`` (possibly ``'auto'``) to the backend used for ``compression``.
+
+    A specific backend only applies to the formats it supports... everything else is
+    decompressed with ``'python'``.
+    """
+    candidates = _BACKENDS_BY_COMPRESSION[compression]
+    if backend != _DecompressionBackend.AUTO:
+        return backend if backend in candidates else _DecompressionBackend.PYTHON
+    # piping through another program only pays off if that program gets a CPU of its own
+    if (os.cpu_count() or 1) < 2:
+        candidates = tuple(sorted(candidates, key=lambda b: b in _EXTERNAL_COMMANDS))
+    for candidate in candidates:
+        if _backend_is_available(candidate, compression=compression):
+            return candidate
+    return _DecompressionBackend.PYTHON
+
+
+class _PipeFeeder(threading.Thread):
+    """
+    Copies a file-like object into a pipe (e.g. the standard input of another process),
+    then closes the pipe.
+    """
+
+    def __init__(self, *, source: IO[bytes], pipe: IO[bytes]):
+        super().__init__(daemon=True)
+        self.source = source
+        self.pipe = pipe
+        self.error: Optional[Exception] = None
+
+    def run(self) -> None:
+        try:
+            shutil.copyfileobj(self.source, self.pipe, _COPY_CHUNK_SIZE_BYTES)
+        except BrokenPipeError:
+            # the other end stopped reading early (e.g. it was killed)
+            pass
+        except Exception as err:
+            # re-raised in the thread reading from the pipe
+            self.error = err
+        finally:
+            with suppress(BrokenPipeError):
+                self.pipe.close()
+
+
+@contextmanager
+def _open_external_decompressor_stream(
+    fileobj: IO[bytes], *, command: list[str]
+) -> "Iterator[IO[bytes]]":
+    """
+    Pipe ``fileobj`` through a decompressor like ``pigz --decompress --stdout``, yielding a
+    forward-only file-like object with its output.
+
+    ``fileobj`` is copied into the decompressor from a separate thread, so it can be any
+    file-like object (e.g. a member of a zip file, or a file being downloaded).
+    If the decompressor fails, an ``OSError`` with whatever it wrote to ``stderr`` is raised.
+    """
+    with tempfile.TemporaryFile(prefix="pydistcheck-") as stderr:
+        proc = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr
+        )
+        stdout = cast("IO[bytes]", proc.stdout)
+        feeder = _PipeFeeder(source=fileobj, pipe=cast("IO[bytes]", proc.stdin))
+        feeder.start()
+
+        def _finish() -> int:
+            stdout.close()
+            returncode = proc.wait()
+            feeder.join()
+            return returncode
+
+        def _raise_if_failed(returncode: int) -> None:
+            if feeder.error is not None:
+                raise feeder.error
+            if returncode != 0:
+                stderr.seek(0)
+                details = stderr.read().decode("utf-8", errors="replace").strip()
+                msg = f"'{' '.join(command)}' exited with code {returncode}: {details}"
+                raise OSError(msg)
+
+        try:
+            yield stdout
+            # read whatever's left (e.g. padding at the end of a tarfile), so the
+            # decompressor checks the whole stream
+            while stdout.read(_COPY_CHUNK_SIZE_BYTES):
+                pass
+        except BaseException:
+            # if the decompressor was still running, it's only being stopped because the
+            # caller stopped reading... so how it exits doesn't matter
+            if proc.poll() is None:
+                proc.kill()
+                _finish()
+                raise
+            # otherwise, it probably failed first (and caused this error)
+            _raise_if_failed(_finish())
+            raise
+        _raise_if_failed(_finish())
+
+
+@contextmanager
+def _open_decompressed_stream(
+    fileobj: IO[bytes],
+    *,
+    compression: str,
+    backend: str = _DecompressionBackend.AUTO,
+    jobs: int = 1,
+    mapped_archive: Optional["mmap.mmap"] = None,
+) -> "Iterator[IO[bytes]]":
+    """
+    Yield a read-only, forward-only file-like object with the decompressed contents of
+    ``fileobj``, decompressed with ``backend`` (see ``_choose_backend()``).
+
+    ``jobs`` and ``mapped_archive`` are only used for bzip2 (see ``_open_bzip2_stream()``
+    and the 'lbzip2' backend). Closing the returned object does not close ``fileobj``.
+    """
+    backend = _choose_backend(compression=compression, backend=backend)
+    _raise_if_backend_is_unavailable(backend)
+    if backend in _EXTERNAL_COMMANDS:
+        command = list(_EXTERNAL_COMMANDS[backend])
+        if backend == _DecompressionBackend.LBZIP2:
+            command += ["-n", str(max(1, jobs))]
+        with _open_external_decompressor_stream(fileobj, command=command) as out:
+            yield out
+    elif backend == _DecompressionBackend.ISAL:
+        from isal import igzip  # noqa: PLC0415
+
+        with igzip.open(fileobj, mode="rb") as out:  # type: ignore[no-untyped-call]
+            yield cast("IO[bytes]", out)
+    elif backend == _DecompressionBackend.ZLIB_NG:
+        from zlib_ng import gzip_ng  # noqa: PLC0415
+
+        with gzip_ng.open(fileobj, mode="rb") as out:  # type: ignore[no-untyped-call]
+            yield cast("IO[bytes]", out)
+    elif compression == _Compression.GZIP:
+        with gzip.GzipFile(fileobj=fileobj, mode="rb") as out:
+            yield cast("IO[bytes]", out)
+    elif compression == _Compression.BZIP2:
+        with _open_bzip2_stream(
+            fileobj, mapped_archive=mapped_archive, jobs=jobs
+        ) as out:
+            yield out
+    else:
+        with _open_zstd_stream(fileobj) as out:
+            yield out
+
+
+@dataclass
+class _BenchmarkResult:
+    backend: str
+    # fastest of all runs, or None if the backend isn't available
+    seconds: Optional[float]
+    uncompressed_size_bytes: int = 0
+
+
+def _decompress_and_discard(
+    filename: str, *, archive_format: str, backend: str, jobs: int
+) -> int:
+    compression = _COMPRESSION_BY_ARCHIVE_FORMAT[archive_format]
+    num_bytes = 0
+    with open(filename, "rb") as f:
+        if archive_format == _ArchiveFormat.CONDA:
+            # just the zstd-compressed tarfiles inside the zip file
+            with zipfile.ZipFile(f) as zf:
+                for zip_info in zf.infolist():
+                    if not zip_info.filename.lower().endswith("tar.zst"):
+                        continue
+                    with (
+                        zf.open(zip_info) as compressed,
+                        _open_decompressed_stream(
+                            compressed, compression=compression, backend=backend
+                        ) as decompressed,
+                    ):
+                        while chunk := decompressed.read(_COPY_CHUNK_SIZE_BYTES):
+                            num_bytes += len(chunk)
+            return num_bytes
+
+        with (
+            _mapped_file(f) as mapped_archive,
+            _open_decompressed_stream(
+                f,
+                compression=compression,
+                backend=backend,
+                jobs=jobs,
+                mapped_archive=mapped_archive,
+            ) as decompressed,
+        ):
+            while chunk := decompressed.read(_COPY_CHUNK_SIZE_BYTES):
+                num_bytes += len(chunk)
+    return num_bytes
+
+
+def _benchmark_decompression(
+    filename: str, *, jobs: int = 1, num_runs: int = 3
+) -> tuple[str, list[_BenchmarkResult]]:
+    """
+    Time decompressing ``filename`` (a local file) with every backend that supports its
+    compression format. Returns that format and one result per backend, in the order
+    ``'auto'`` would prefer them.
+    """
+    if _is_url(filename) or _is_stream(filename):
+        msg = f"Only local files can be benchmarked, not '{filename}'."
+        raise ValueError(msg)
+    archive_format = _guess_archive_format(filename)
+    compression = _COMPRESSION_BY_ARCHIVE_FORMAT.get(archive_format)
+    if compression is None:
+        msg = (
+            f"Members of '{archive_format}' files are compressed individually, "
+            "so there's no stream to benchmark decompressing."
+        )
+        raise ValueError(msg)
+
+    results = []
+    for backend in _BACKENDS_BY_COMPRESSION[compression]:
+        if not _backend_is_available(backend, compression=compression):
+            results.append(_BenchmarkResult(backend=backend, seconds=None))
+            continue
+        timings = []
+        for _ in range(num_runs):
+            start = time.perf_counter()
+            num_bytes = _decompress_and_discard(
+                filename, archive_format=archive_format, backend=backend, jobs=jobs
+            )
+            timings.append(time.perf_counter() - start)
+        results.append(
+            _BenchmarkResult(
+                backend=backend,
+                seconds=min(timings),
+                uncompressed_size_bytes=num_bytes,
+            )
+        )
+    return compression, results
@@ -7,121 +7,262 @@ import os
 import tarfile
 import zipfile
 from collections import OrderedDict, defaultdict
-from dataclasses import dataclass
+from contextlib import suppress
+from dataclasses import dataclass, field
 from functools import cached_property
-from tempfile import TemporaryDirectory
+from typing import Any, Callable, Optional, Union
 
+from . import __version__
+from ._cache import _DirectoryCache, _sha256_of_distribution, _sha256_of_json
 from ._file_utils import (
     _ArchiveFormat,
-    _decompress_zstd_archive,
+    _CapturedFiles,
     _DirectoryInfo,
+    _distribution_size,
     _FileInfo,
     _guess_archive_format,
+    _is_stream,
+    _mapped_file,
+    _open_distribution,
 )
+from ._decompression import (
+    _COMPRESSION_BY_ARCHIVE_FORMAT,
+    _Compression,
+    _DecompressionBackend,
+    _open_decompressed_stream,
+)
+from ._manifest import _read_manifest
+from ._remote import _is_url
+
+
+class _DataTier:
+    """
+    How much of a distribution has to be read to build a summary that's good enough
+    for some consumer (a check, ``--inspect``, etc.). Each tier includes all of the
+    information from the tiers below it, so tiers can be compared with ``<`` / ``>``.
+    """
+
+    # only the distribution file itself (e.g. its size on disk)
+    NONE = 0
+    # names of all files and directories
+    NAMES = 1
+    # names, plus the uncompressed size of each file
+    SIZES = 2
+    # sizes, plus the first few bytes of each file (used to detect file formats)
+    HEADERS = 3
+    # the full contents of files
+    CONTENT = 4
+
+
+# called with each file or directory as it's read from a distribution... raising an
+# exception stops reading
+_MemberObserver = Callable[[Union[_FileInfo, _DirectoryInfo]], None]
+
+
+def _summarize_tarfile_members(  # noqa: PLR0913
+    *,
+    archive_file: tarfile.TarFile,
+    directories: list[_DirectoryInfo],
+    files: list[_FileInfo],
+    read_headers: bool = True,
+    captured_files: Optional[_CapturedFiles] = None,
+    member_observer: Optional[_MemberObserver] = None,
+) -> None:
+    """
+    Walk a tarfile exactly once, from front to back, appending to ``directories``
+    and ``files`` as members are encountered.
+
+    Each file's header (and, if ``captured_files`` is provided, the full content of each
+    compiled object) is read while that file is the current member of the stream.
+    For compressed tarfiles, calling ``TarFile.getmembers()`` and then reading members
+    by name is roughly quadratic... every lookup scans the member list and every read
+    seeks backwards, which re-decompresses the stream from the beginning.
+    """
+    tar_info = archive_file.next()
+    while tar_info is not None:
+        member: Union[_FileInfo, _DirectoryInfo]
+        if tar_info.isfile():
+            member = _FileInfo.from_tarfile_member(
+                archive_file=archive_file,
+                tar_info=tar_info,
+                read_header=read_headers,
+                captured_files=captured_files,
+            )
+            files.append(member)
+        else:
+            member = _DirectoryInfo(name=tar_info.name)
+            directories.append(member)
+        if member_observer is not None:
+            member_observer(member)
+        tar_info = archive_file.next()
 
 
 @dataclass
 class _DistributionSummary:
     archive_format: str
-    compressed_size_bytes: int
+    # None if unknown (e.g. for summaries built from some manifests)
+    compressed_size_bytes: Optional[int]
     directories: list[_DirectoryInfo]
     files: list[_FileInfo]
     original_file: str
+    data_tier: int = _DataTier.CONTENT
+    compiled_object_contents: _CapturedFiles = field(
+        default_factory=_CapturedFiles, compare=False, repr=False
+    )
+    # sha256 of the content of compiled objects, where known
+    compiled_object_digests: dict[str, str] = field(default_factory=dict, repr=False)
 
     @classmethod
-    def from_file(cls, filename: str) -> "_DistributionSummary":
-        archive_format = _guess_archive_format(filename)
-        compressed_size_bytes = os.path.getsize(filename)
+    def from_file(
+        cls,
+        filename: str,
+        *,
+        data_tier: int = _DataTier.CONTENT,
+        jobs: int = 1,
+        decompression_backend: str = _DecompressionBackend.AUTO,
+        member_observer: Optional[_MemberObserver] = None,
+    ) -> "_DistributionSummary":
+        """
+        Summarize the distribution in ``filename``, doing only as much work as
+        ``data_tier`` requires.
+
+        * ``_DataTier.NONE``: only the size of the archive is read
+        * ``_DataTier.NAMES`` and ``_DataTier.SIZES``: only archive metadata is read (for
+          zip files, that's just the central directory... no decompression at all)
+        * ``_DataTier.HEADERS``: also read the first few bytes of every file, to
+          figure out which ones are compiled objects
+        * ``_DataTier.CONTENT``: also capture the full contents of compiled objects in
+          ``compiled_object_contents``, read during the same pass over the archive
+
+        Below ``_DataTier.HEADERS``, every file has format ``_FileFormat.UNKNOWN``.
+
+        ``filename`` can also be an http(s) URL, ``'-'`` for standard input, or a named pipe.
+        Gzip, bzip2, and zstd-compressed tar files are read from streams as they arrive,
+        without ever seeking backwards.
+
+        With ``jobs > 1``, blocks of bzip2-compressed tar files on disk are decompressed
+        in parallel. ``decompression_backend`` picks the decompressor used for gzip, bzip2,
+        and zstd (see ``_open_decompressed_stream()``).
+
+        If ``member_observer`` is provided, it's called with each file and directory
+        right after that member is read. Any exception it raises stops reading and is
+        passed on to the caller... that's how ``--fail-fast`` gives up on distributions
+        that are certain to fail a check.
+        """
         directories: list[_DirectoryInfo] = []
         files: list[_FileInfo] = []
-        if archive_format == _ArchiveFormat.GZIP_TAR:
-            with tarfile.open(filename, mode="r:gz") as tf:
-                for tar_info in tf.getmembers():
-                    if tar_info.isfile():
-                        files.append(
-                            _FileInfo.from_tarfile_member(
-                                archive_file=tf, tar_info=tar_info
-                            )
-                        )
-                    else:
-                        directories.append(_DirectoryInfo(name=tar_info.name))
-        elif archive_format == _ArchiveFormat.BZIP2_TAR:
-            with tarfile.open(filename, mode="r:bz2") as tf:
-                for tar_info in tf.getmembers():
-                    if tar_info.isfile():
-                        files.append(
-                            _FileInfo.from_tarfile_member(
-                                archive_file=tf, tar_info=tar_info
-                            )
-                        )
-                    else:
-                        directories.append(_DirectoryInfo(name=tar_info.name))
-        elif archive_format == _ArchiveFormat.CONDA:
-            # as of Jan 2023, .conda files are a zip archive containing:
-            #   - an uncompressed file 'metadata.json' describing the contents
-            #   - 2 zstd-compressed tarfiles with the package contents
-            #      - 'info-*.tar.zst'
-            #      - 'pkg-*.tar.zst'
-            #
-            # ref: https://docs.conda.io/projects/conda/en/latest/user-guide/concepts/packages.html#conda-file-format
-            with (
-                zipfile.ZipFile(filename, mode="r") as f,
-                TemporaryDirectory() as tmp_dir,
-            ):
-                for zip_info in f.infolist():
-                    # case 1 - is a directory
-                    if zip_info.is_dir():
-                        directories.append(_DirectoryInfo(name=zip_info.filename))
-                    # case 2 - is a file but not one of the zstandard-compressed ones
-                    elif not zip_info.filename.lower().endswith("tar.zst"):
-                        files.append(
-                            _FileInfo.from_zipfile_member(
-                                archive_file=f, zip_info=zip_info
-                            )
+        read_headers = data_tier >= _DataTier.HEADERS
+        compiled_object_contents = _CapturedFiles()
+        captured_files = (
+            compiled_object_contents if data_tier >= _DataTier.CONTENT else None
+        )
+        try:
+            with _open_distribution(filename) as (archive_format, distro_file):
+                if data_tier == _DataTier.NONE:
+                    pass
+                elif archive_format in _COMPRESSION_BY_ARCHIVE_FORMAT and (
+                    archive_format != _ArchiveFormat.CONDA
+                ):
+                    with (
+                        _mapped_file(distro_file) as mapped_archive,
+                        _open_decompressed_stream(
+                            distro_file,
+                            compression=_COMPRESSION_BY_ARCHIVE_FORMAT[archive_format],
+                            backend=decompression_backend,
+                            jobs=jobs,
+                            mapped_archive=mapped_archive,
+                        ) as decompressed,
+                        tarfile.open(fileobj=decompressed, mode="r|") as tf,
+                    ):
+                        _summarize_tarfile_members(
+                            archive_file=tf,
+                            directories=directories,
+                            files=files,
+                            read_headers=read_headers,
+                            captured_files=captured_files,
+                            member_observer=member_observer,
                         )
-                    # case 3 - one of the zstandard-compressed archives
-                    else:
-                        full_path = os.path.join(tmp_dir, zip_info.filename)
-                        # ref: https://stackoverflow.com/a/55260983/3986677
-                        #
-                        # decompress and write to a regular tarfile
-                        with zipfile.ZipFile(filename, mode="r") as zf:
-                            zf.extractall(path=tmp_dir, members=[zip_info.filename])
-
-                            # decompress the .tar.zst to just .tar
-                            decompressed_tar_path = full_path.lower().replace(
-                                ".tar.zst", ".tar"
-                            )
-                            _decompress_zstd_archive(
-                                tar_zst_file=full_path,
-                                decompressed_tar_path=decompressed_tar_path,
-                            )
-
-                        # do tarfile things
-                        with tarfile.open(decompressed_tar_path, mode="r") as tf:
-                            for tar_info in tf.getmembers():
-                                if tar_info.isfile():
-                                    files.append(
-                                        _FileInfo.from_tarfile_member(
-                                            archive_file=tf, tar_info=tar_info
-                                        )
-                                    )
-                                else:
-                                    directories.append(
-                                        _DirectoryInfo(name=tar_info.name)
+                elif archive_format == _ArchiveFormat.CONDA:
+                    # as of Jan 2023, .conda files are a zip archive containing:
+                    #   - an uncompressed file 'metadata.json' describing the contents
+                    #   - 2 zstd-compressed tarfiles with the package contents
+                    #      - 'info-*.tar.zst'
+                    #      - 'pkg-*.tar.zst'
+                    #
+                    # ref: https://docs.conda.io/projects/conda/en/latest/user-guide/concepts/packages.html#conda-file-format
+                    with (
+                        zipfile.ZipFile(distro_file, mode="r") as f,
+                        _mapped_file(distro_file) as mapped_archive,
+                    ):
+                        for zip_info in f.infolist():
+                            member: Union[_FileInfo, _DirectoryInfo]
+                            # case 1 - is a directory
+                            if zip_info.is_dir():
+                                member = _DirectoryInfo(name=zip_info.filename)
+                                directories.append(member)
+                                if member_observer is not None:
+                                    member_observer(member)
+                            # case 2 - is a file but not one of the zstandard-compressed ones
+                            elif not zip_info.filename.lower().endswith("tar.zst"):
+                                member = _FileInfo.from_zipfile_member(
+                                    archive_file=f,
+                                    zip_info=zip_info,
+                                    read_header=read_headers,
+                                    captured_files=captured_files,
+                                    mapped_archive=mapped_archive,
+                                )
+                                files.append(member)
+                                if member_observer is not None:
+                                    member_observer(member)
+                            # case 3 - one of the zstandard-compressed archives
+                            #
+                            # stream it straight from the zip, through a zstd decompressor, and into
+                            # a forward-only tarfile... no intermediate files on disk, and only a
+                            # small buffer of the decompressed payload held in memory at a time
+                            else:
+                                with (
+                                    f.open(zip_info, mode="r") as compressed,
+                                    _open_decompressed_stream(
+                                        compressed,
+                                        compression=_Compression.ZSTD,
+                                        backend=decompression_backend,
+                                    ) as decompressed,
+                                    tarfile.open(fileobj=decompressed, mode="r|") as tf,
+                                ):
+                                    _summarize_tarfile_members(
+                                        archive_file=tf,
+                                        directories=directories,
+                                        files=files,
+                                        read_headers=read_headers,
+                                        captured_files=captured_files,
+                                        member_observer=member_observer,
                                     )
-        elif archive_format == _ArchiveFormat.ZIP:
-            # assume anything else can be opened with zipfile
-            with zipfile.ZipFile(filename, mode="r") as f:
-                for zip_info in f.infolist():
-                    if not zip_info.is_dir():
-                        files.append(
-                            _FileInfo.from_zipfile_member(
-                                archive_file=f, zip_info=zip_info
-                            )
-                        )
-                    else:
-                        directories.append(_DirectoryInfo(name=zip_info.filename))
+                elif archive_format == _ArchiveFormat.ZIP:
+                    # assume anything else can be opened with zipfile
+                    with (
+                        zipfile.ZipFile(distro_file, mode="r") as f,
+                        _mapped_file(distro_file) as mapped_archive,
+                    ):
+                        for zip_info in f.infolist():
+                            if not zip_info.is_dir():
+                                member = _FileInfo.from_zipfile_member(
+                                    archive_file=f,
+                                    zip_info=zip_info,
+                                    read_header=read_headers,
+                                    captured_files=captured_files,
+                                    mapped_archive=mapped_archive,
+                                )
+                                files.append(member)
+                            else:
+                                member = _DirectoryInfo(name=zip_info.filename)
+                                directories.append(member)
+                            if member_observer is not None:
+                                member_observer(member)
+                compressed_size_bytes = _distribution_size(distro_file)
+        except BaseException:
+            # e.g. 'member_observer' stopped reading partway through
+            compiled_object_contents.cleanup()
+            raise
 
         return cls(
             archive_format=archive_format,
@@ -129,9 +270,93 @@ class _DistributionSummary:
             directories=directories,
             files=files,
             original_file=filename,
+            data_tier=data_tier,
+            compiled_object_contents=compiled_object_contents,
+            compiled_object_digests=dict(compiled_object_contents.digests),
         )
 
-    @property
+    @classmethod
+    def from_manifest(cls, filename: str) -> "_DistributionSummary":
+        """
+        Summarize a distribution based on a listing of its contents in ``filename``,
+        without access to the distribution itself. See ``_manifest.py`` for supported formats.
+
+        Manifests only contain names and sizes, so the summary has ``_DataTier.SIZES``.
+        """
+        manifest = _read_manifest(filename)
+        archive_format = _ArchiveFormat.UNKNOWN
+        for name in (manifest.archive_name, os.path.splitext(filename)[0]):
+            if name is not None:
+                with suppress(ValueError):
+                    archive_format = _guess_archive_format(name)
+                    break
+        return cls(
+            archive_format=archive_format,
+            compressed_size_bytes=manifest.compressed_size_bytes,
+            directories=manifest.directories,
+            files=manifest.files,
+            original_file=filename,
+            data_tier=_DataTier.SIZES,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert to a JSON-serializable dictionary, which ``from_dict()`` can turn back into
+        a ``_DistributionSummary``. Captured file contents are not included.
+        """
+        return {
+            "archive_format": self.archive_format,
+            "compressed_size_bytes": self.compressed_size_bytes,
+            "data_tier": self.data_tier,
+            "directories": self.directory_paths,
+            # lists instead of dictionaries, to avoid repeating field names for every file
+            "files": [
+                [
+                    f.name,
+                    f.file_format,
+                    f.file_extension,
+                    f.is_compiled,
+                    f.uncompressed_size_bytes,
+                ]
+                for f in self.files
+            ],
+            "compiled_object_digests": self.compiled_object_digests,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, summary_dict: dict[str, Any], *, original_file: str
+    ) -> "_DistributionSummary":
+        return cls(
+            archive_format=summary_dict["archive_format"],
+            compressed_size_bytes=summary_dict["compressed_size_bytes"],
+            directories=[
+                _DirectoryInfo(name=name) for name in summary_dict["directories"]
+            ],
+            files=[
+                _FileInfo(
+                    name=name,
+                    file_format=file_format,
+                    file_extension=file_extension,
+                    is_compiled=is_compiled,
+                    uncompressed_size_bytes=uncompressed_size_bytes,
+                )
+                for (
+                    name,
+                    file_format,
+                    file_extension,
+                    is_compiled,
+                    uncompressed_size_bytes,
+                ) in summary_dict["files"]
+            ],
+            original_file=original_file,
+            data_tier=summary_dict["data_tier"],
+            compiled_object_digests=summary_dict["compiled_object_digests"],
+        )
+
+    # summaries aren't modified after they're built, so lists derived
+    # from 'files' and 'directories' only need to be built once
+    @cached_property
     def all_paths(self) -> list[str]:
         return self.file_paths + self.directory_paths
 
@@ -146,7 +371,7 @@ class _DistributionSummary:
             for file_extension, file_list in self.files_by_extension.items()
         }
 
-    @property
+    @cached_property
     def directory_paths(self) -> list[str]:
         return [d.name for d in self.directories]
 
@@ -157,7 +382,7 @@ class _DistributionSummary:
             out[f.file_extension].append(f)
         return out
 
-    @property
+    @cached_property
     def file_paths(self) -> list[str]:
         return [f.name for f in self.files]
 
@@ -197,3 +422,73 @@ class _DistributionSummary:
         for file_extension, size_in_bytes in sorted_sizes:
             out[file_extension] = size_in_bytes
         return out
+
+
+# summaries of distributions, stored so later runs can skip reading the archive
+_SUMMARIES_CACHE_NAMESPACE = "summaries"
+
+
+def _load_or_build_summary(  # noqa: PLR0913
+    filename: str,
+    *,
+    data_tier: int,
+    cache: Optional[_DirectoryCache],
+    jobs: int = 1,
+    decompression_backend: str = _DecompressionBackend.AUTO,
+    member_observer: Optional[_MemberObserver] = None,
+) -> _DistributionSummary:
+    """
+    Like ``_DistributionSummary.from_file()``, but reusing a summary stored in ``cache``
+    by a previous run if possible. ``member_observer`` isn't called for stored summaries.
+
+    A stored summary is only reused if the distribution's size, modification time,
+    and sha256 digest all still match, if it was built with at least ``data_tier``, and
+    if it was built by the same version of ``pydistcheck``.
+    """
+    # validating a stored summary requires a digest of the whole distribution, which
+    # would defeat the purpose of reading only parts of remote ones... and streams can
+    # only be read once
+    if cache is None or _is_url(filename) or _is_stream(filename):
+        return _DistributionSummary.from_file(
+            filename,
+            data_tier=data_tier,
+            jobs=jobs,
+            decompression_backend=decompression_backend,
+            member_observer=member_observer,
+        )
+
+    # raise the same error as from_file() would for unsupported files
+    _guess_archive_format(filename)
+
+    key = _sha256_of_json({"path": os.path.abspath(filename)})
+    stat_result = os.stat(filename)
+    entry = cache.get(namespace=_SUMMARIES_CACHE_NAMESPACE, key=key)
+    if (
+        entry is not None
+        and entry.get("pydistcheck_version") == __version__
+        and entry.get("size_bytes") == stat_result.st_size
+        and entry.get("mtime_ns") == stat_result.st_mtime_ns
+        and entry["summary"]["data_tier"] >= data_tier
+        and entry.get("sha256") == _sha256_of_distribution(filename)
+    ):
+        return _DistributionSummary.from_dict(entry["summary"], original_file=filename)
+
+    summary = _DistributionSummary.from_file(
+        filename,
+        data_tier=data_tier,
+        jobs=jobs,
+        decompression_backend=decompression_backend,
+        member_observer=member_observer,
+    )
+    cache.put(
+        namespace=_SUMMARIES_CACHE_NAMESPACE,
+        key=key,
+        value={
+            "pydistcheck_version": __version__,
+            "size_bytes": stat_result.st_size,
+            "mtime_ns": stat_result.st_mtime_ns,
+            "sha256": _sha256_of_distribution(filename),
+            "summary": summary.to_dict(),
+        },
+    )
+    return summary
@@ -1,11 +1,29 @@
+import bz2
+import hashlib
+import io
+import mmap
 import os
 import pathlib
+import stat
+import struct
+import sys
 import tarfile
+import urllib.parse
 import zipfile
+import zlib
+from contextlib import ExitStack, contextmanager, suppress
 from dataclasses import dataclass
-from typing import Union
+from tempfile import SpooledTemporaryFile, TemporaryDirectory
+from typing import IO, TYPE_CHECKING, Optional, Union, cast
 
 from ._compat import _import_zstandard, _tf_extractall_has_filter
+from ._bzip2_blocks import _ParallelBzip2Reader
+from ._remote import _is_url, _open_url
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from _typeshed import WriteableBuffer
 
 
 @dataclass
@@ -17,29 +35,304 @@ class _ArchiveFormat:
     BZIP2_TAR = ".tar.bz2"
     CONDA = ".conda"
     GZIP_TAR = ".tar.gz"
+    UNKNOWN = "unknown"
     ZIP = ".zip"
+    ZSTD_TAR = ".tar.zst"
+
+
+# first few bytes of each supported type of archive, used to detect the format of
+# distributions read from streams (which don't have a file extension)
+_ARCHIVE_FORMAT_MAGIC_BYTES = {
+    b"\x1f\x8b": _ArchiveFormat.GZIP_TAR,
+    b"BZh": _ArchiveFormat.BZIP2_TAR,
+    b"PK\x03\x04": _ArchiveFormat.ZIP,
+    # empty zip files
+    b"PK\x05\x06": _ArchiveFormat.ZIP,
+    b"\x28\xb5\x2f\xfd": _ArchiveFormat.ZSTD_TAR,
+}
+_NUM_MAGIC_BYTES = max(len(magic) for magic in _ARCHIVE_FORMAT_MAGIC_BYTES)
+
+_SUPPORTED_FORMATS_STR = (
+    "Supported formats: .conda, .tar.bz2, .tar.gz, .tar.zst, .whl, .zip"
+)
 
 
 def _guess_archive_format(filename: str) -> str:
-    if filename.lower().endswith("gz"):
+    # for URLs, ignore things like '?token=...' or '#sha256=...'
+    name = urllib.parse.urlsplit(filename).path if _is_url(filename) else filename
+    if name.lower().endswith("gz"):
         return _ArchiveFormat.GZIP_TAR
-    if filename.lower().endswith("bz2"):
+    if name.lower().endswith("bz2"):
         return _ArchiveFormat.BZIP2_TAR
-    if filename.lower().endswith(".conda"):
+    if name.lower().endswith(".conda"):
         return _ArchiveFormat.CONDA
-    if filename.lower().endswith(".zip"):
+    if name.lower().endswith(".zip"):
         return _ArchiveFormat.ZIP
-    if filename.lower().endswith(".whl"):
+    if name.lower().endswith(".whl"):
         return _ArchiveFormat.ZIP
+    if name.lower().endswith((".tar.zst", ".tzst")):
+        return _ArchiveFormat.ZSTD_TAR
 
     msg = (
         f"File '{filename}' does not appear to be a Python package distribution in "
-        "one of the formats supported by 'pydistcheck'. "
-        "Supported formats: .conda, .tar.bz2, .tar.gz, .whl, .zip"
+        f"one of the formats supported by 'pydistcheck'. {_SUPPORTED_FORMATS_STR}"
     )
     raise ValueError(msg)
 
 
+def _is_stream(filename: str) -> bool:
+    """
+    ``True`` for standard input (``'-'``) and named pipes, which can only be read
+    once, from start to end.
+    """
+    if filename == "-":
+        return True
+    try:
+        return stat.S_ISFIFO(os.stat(filename).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
+# above this many bytes, distributions spooled from streams are written to a temporary file
+# instead of being held in memory
+_MAX_IN_MEMORY_SPOOL_BYTES = 64 * 1024 * 1024
+
+# above this many bytes in total, captured files are written to a temporary directory
+# instead of being held in memory
+_MAX_IN_MEMORY_CAPTURE_BYTES = 64 * 1024 * 1024
+_COPY_CHUNK_SIZE_BYTES = 1024 * 1024
+
+
+class _StreamReader(io.RawIOBase):
+    """
+    Forward-only reader for a stream, which first replays ``prefix`` (bytes already read
+    from the stream, e.g. to detect its format) and counts how many bytes have been read.
+    """
+
+    def __init__(self, stream: IO[bytes], *, prefix: bytes):
+        super().__init__()
+        self.num_bytes_read = 0
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        view = memoryview(buffer).cast("B")
+        if self._prefix:
+            data = self._prefix[: len(view)]
+            self._prefix = self._prefix[len(data) :]
+        else:
+            data = self._stream.read(len(view))
+        view[: len(data)] = data
+        self.num_bytes_read += len(data)
+        return len(data)
+
+
+def _read_exactly(stream: IO[bytes], num_bytes: int) -> bytes:
+    # reads from pipes can return fewer bytes than requested before the end of the stream
+    out = b""
+    while len(out) < num_bytes:
+        chunk = stream.read(num_bytes - len(out))
+        if not chunk:
+            break
+        out += chunk
+    return out
+
+
+def _open_stream(stream: IO[bytes], *, filename: str) -> tuple[str, IO[bytes]]:
+    """
+    Detect the format of the distribution in ``stream`` from its first few bytes, and
+    return that format and a file-like object for reading the whole distribution.
+
+    A zip file's index is at its end, so zip files are spooled into memory (or a temporary
+    file, if they're larger than ``_MAX_IN_MEMORY_SPOOL_BYTES``). For every other format,
+    the returned object is forward-only and nothing is spooled.
+    """
+    magic = _read_exactly(stream, _NUM_MAGIC_BYTES)
+    archive_format = next(
+        (
+            archive_format
+            for prefix, archive_format in _ARCHIVE_FORMAT_MAGIC_BYTES.items()
+            if magic.startswith(prefix)
+        ),
+        None,
+    )
+    if archive_format is None:
+        msg = (
+            f"Contents of '{filename}' do not appear to be a Python package distribution in "
+            f"one of the formats supported by 'pydistcheck'. {_SUPPORTED_FORMATS_STR}"
+        )
+        raise ValueError(msg)
+
+    if archive_format != _ArchiveFormat.ZIP:
+        return archive_format, cast("IO[bytes]", _StreamReader(stream, prefix=magic))
+
+    spool = SpooledTemporaryFile(  # noqa: SIM115
+        max_size=_MAX_IN_MEMORY_SPOOL_BYTES, prefix="pydistcheck-"
+    )
+    try:
+        spool.write(magic)
+        for chunk in iter(lambda: stream.read(_COPY_CHUNK_SIZE_BYTES), b""):
+            spool.write(chunk)
+        spool.seek(0)
+        # .conda files are zip files too... tell them apart by their contents
+        with zipfile.ZipFile(spool, mode="r") as zf:
+            names = zf.namelist()
+        if "metadata.json" in names and any(n.endswith(".tar.zst") for n in names):
+            archive_format = _ArchiveFormat.CONDA
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return archive_format, cast("IO[bytes]", spool)
+
+
+@contextmanager
+def _open_distribution(filename: str) -> "Iterator[tuple[str, IO[bytes]]]":
+    """
+    Open a distribution for reading, from a local path, an http(s) URL, or a stream
+    (see ``_is_stream()``). Yields the distribution's format and a file-like object.
+
+    For streams, the format is detected from the content (see ``_open_stream()``).
+    Otherwise, it's guessed from the file extension.
+    """
+    with ExitStack() as stack:
+        if _is_stream(filename):
+            stream = (
+                sys.stdin.buffer
+                if filename == "-"
+                else stack.enter_context(open(filename, "rb"))
+            )
+            archive_format, f = _open_stream(stream, filename=filename)
+        else:
+            archive_format = _guess_archive_format(filename)
+            f = _open_url(filename) if _is_url(filename) else open(filename, "rb")  # noqa: SIM115
+        stack.enter_context(f)
+        yield archive_format, f
+
+
+@contextmanager
+def _mapped_file(f: IO[bytes]) -> "Iterator[Optional[mmap.mmap]]":
+    """
+    Memory-map the file behind ``f`` (read-only), if it has one. Yields ``None`` for
+    anything that can't be mapped, like files read over HTTP or empty files.
+    """
+    mapped = None
+    # calling fileno() on a SpooledTemporaryFile would write it to disk
+    if not isinstance(f, SpooledTemporaryFile):
+        with suppress(OSError, ValueError):
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped is None:
+        yield None
+        return
+    with mapped:
+        yield mapped
+
+
+def _distribution_size(f: IO[bytes]) -> int:
+    """
+    Size in bytes of the distribution read from ``f``. For forward-only streams,
+    this reads (and discards) whatever's left of the stream.
+    """
+    if isinstance(f, _StreamReader):
+        while f.read(_COPY_CHUNK_SIZE_BYTES):
+            pass
+        return f.num_bytes_read
+    return f.seek(0, os.SEEK_END)
+
+
+class _CapturedFiles:
+    """
+    Contents of some archive members, captured while the archive is being read for
+    some other reason (e.g. building a summary of it).
+
+    This exists so that code needing the full contents of a few members (like compiled
+    objects) doesn't have to decompress the archive a second time. Contents are held
+    in memory until their total size exceeds ``max_in_memory_bytes``, and after that
+    are written to a temporary directory.
+
+    Files on disk are stored under generated names, never under the member's name
+    from the archive, so a malicious archive can't use this to write outside of
+    that directory.
+    """
+
+    def __init__(self, *, max_in_memory_bytes: int = _MAX_IN_MEMORY_CAPTURE_BYTES):
+        self.max_in_memory_bytes = max_in_memory_bytes
+        self._in_memory: dict[str, bytes] = {}
+        self._in_memory_bytes = 0
+        self._on_disk: dict[str, str] = {}
+        self._spill_dir: Optional[TemporaryDirectory[str]] = None
+        # file name used for each member on disk, assigned when it's captured... unique
+        # even for members with the same basename (e.g. 'a/lib.so' and 'b/lib.so')
+        self._file_names: dict[str, str] = {}
+        # sha256 of each captured member's content (kept after cleanup())
+        self.digests: dict[str, str] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._in_memory or name in self._on_disk
+
+    def __len__(self) -> int:
+        return len(self._in_memory) + len(self._on_disk)
+
+    @property
+    def num_on_disk(self) -> int:
+        return len(self._on_disk)
+
+    def add(self, *, name: str, header: bytes, fileobj: IO[bytes]) -> None:
+        """
+        Capture a member whose first bytes (``header``) have already been read from ``fileobj``.
+        """
+        # read just past the limit... that's enough to know whether it fits
+        remaining_budget = (
+            self.max_in_memory_bytes - self._in_memory_bytes - len(header)
+        )
+        content = header + fileobj.read(max(remaining_budget, 0) + 1)
+        digest = hashlib.sha256(content)
+        file_name = self._file_names.setdefault(
+            name, f"{len(self._file_names)}-{pathlib.PurePosixPath(name).name}"
+        )
+        if len(content) + self._in_memory_bytes <= self.max_in_memory_bytes:
+            self._in_memory[name] = content
+            self._in_memory_bytes += len(content)
+            self.digests[name] = digest.hexdigest()
+            return
+
+        if self._spill_dir is None:
+            self._spill_dir = TemporaryDirectory(prefix="pydistcheck-")
+        out_path = os.path.join(self._spill_dir.name, file_name)
+        with open(out_path, "wb") as out:
+            out.write(content)
+            for chunk in iter(lambda: fileobj.read(_COPY_CHUNK_SIZE_BYTES), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        self._on_disk[name] = out_path
+        self.digests[name] = digest.hexdigest()
+
+    def materialize(self, name: str, *, out_dir: str) -> str:
+        """
+        Return the path to a file on disk with the contents of member ``name``.
+
+        Members held in memory are written to ``out_dir``.
+        """
+        if name in self._on_disk:
+            return self._on_disk[name]
+        out_path = os.path.join(out_dir, self._file_names[name])
+        with open(out_path, "wb") as out:
+            out.write(self._in_memory[name])
+        return out_path
+
+    def cleanup(self) -> None:
+        self._in_memory.clear()
+        self._in_memory_bytes = 0
+        self._on_disk.clear()
+        self._file_names.clear()
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+
 @dataclass
 class _FileInfo:
     name: str
@@ -50,12 +343,22 @@ class _FileInfo:
 
     @classmethod
     def from_tarfile_member(
-        cls, *, archive_file: tarfile.TarFile, tar_info: tarfile.TarInfo
+        cls,
+        *,
+        archive_file: tarfile.TarFile,
+        tar_info: tarfile.TarInfo,
+        read_header: bool = True,
+        captured_files: Optional["_CapturedFiles"] = None,
     ) -> "_FileInfo":
         member_name = tar_info.name
-        file_format, is_compiled = _guess_archive_member_file_format(
-            archive_file=archive_file, member_name=member_name
-        )
+        if read_header:
+            file_format, is_compiled = _guess_archive_member_file_format(
+                archive_file=archive_file,
+                member=tar_info,
+                captured_files=captured_files,
+            )
+        else:
+            file_format, is_compiled = _FileFormat.UNKNOWN, False
         return cls(
             name=member_name,
             file_format=file_format,
@@ -66,12 +369,24 @@ class _FileInfo:
 
     @classmethod
     def from_zipfile_member(
-        cls, *, archive_file: zipfile.ZipFile, zip_info: zipfile.ZipInfo
+        cls,
+        *,
+        archive_file: zipfile.ZipFile,
+        zip_info: zipfile.ZipInfo,
+        read_header: bool = True,
+        captured_files: Optional["_CapturedFiles"] = None,
+        mapped_archive: Optional["mmap.mmap"] = None,
     ) -> "_FileInfo":
         member_name = zip_info.filename
-        file_format, is_compiled = _guess_archive_member_file_format(
-            archive_file=archive_file, member_name=member_name
-        )
+        if read_header:
+            file_format, is_compiled = _guess_archive_member_file_format(
+                archive_file=archive_file,
+                member=zip_info,
+                captured_files=captured_files,
+                mapped_archive=mapped_archive,
+            )
+        else:
+            file_format, is_compiled = _FileFormat.UNKNOWN, False
         return cls(
             name=member_name,
             file_format=file_format,
@@ -115,32 +430,144 @@ class _FileFormat:
     ELF = "ELF"
     MACH_O = "Mach-O"
     OTHER = "Other"
+    UNKNOWN = "Unknown"
     WINDOWS_PE = "Windows PE"
 
 
+# fixed-size part of a zip file's local file header, which is followed by the member's name
+# and an "extra" field... see section 4.3.7 of https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_ZIP_LOCAL_HEADER_SIZE_BYTES = 30
+_ZIP_LOCAL_HEADER_NAME_LENGTHS = struct.Struct("<HH")
+_ZIP_LOCAL_HEADER_NAME_LENGTHS_OFFSET = 26
+_ZIP_FLAG_ENCRYPTED = 0x1
+
+# compressed bytes fed to the decompressor at a time when reading the first few bytes of
+# a deflated member... usually the first chunk is enough
+_DEFLATE_SNIFF_CHUNK_BYTES = 1024
+
+
+def _read_zip_member_header_from_memory(
+    *, mapped_archive: "mmap.mmap", zip_info: zipfile.ZipInfo, num_bytes: int = 4
+) -> Optional[bytes]:
+    """
+    Read the first ``num_bytes`` bytes of a zip member straight from a memory-mapped archive.
+
+    ``ZipFile.open()`` re-reads the member's local header through buffered I/O and sets up a
+    decompressor for the whole member, which dominates the cost of sniffing file formats in
+    archives with many small members. This instead finds the member's data using the offset
+    from the central directory (already parsed by ``zipfile``), slices it out of the mapped
+    archive without copying, and inflates only as much of it as needed.
+
+    Returns ``None`` if that isn't possible (e.g. for encrypted members or compression methods
+    other than deflate), in which case callers should fall back to ``ZipFile.open()``.
+    """
+    offset = zip_info.header_offset
+    if (
+        zip_info.flag_bits & _ZIP_FLAG_ENCRYPTED
+        or zip_info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+        or offset + _ZIP_LOCAL_HEADER_SIZE_BYTES > len(mapped_archive)
+        or mapped_archive[offset : offset + len(_ZIP_LOCAL_HEADER_SIGNATURE)]
+        != _ZIP_LOCAL_HEADER_SIGNATURE
+    ):
+        return None
+
+    name_length, extra_length = _ZIP_LOCAL_HEADER_NAME_LENGTHS.unpack_from(
+        mapped_archive, offset + _ZIP_LOCAL_HEADER_NAME_LENGTHS_OFFSET
+    )
+    data_start = offset + _ZIP_LOCAL_HEADER_SIZE_BYTES + name_length + extra_length
+    data_end = data_start + zip_info.compress_size
+    if data_end > len(mapped_archive):
+        return None
+
+    with memoryview(mapped_archive) as archive_view:
+        data = archive_view[data_start:data_end]
+        try:
+            if zip_info.compress_type == zipfile.ZIP_STORED:
+                return bytes(data[:num_bytes])
+
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            header = b""
+            for chunk_start in range(0, len(data), _DEFLATE_SNIFF_CHUNK_BYTES):
+                header += decompressor.decompress(
+                    data[chunk_start : chunk_start + _DEFLATE_SNIFF_CHUNK_BYTES],
+                    num_bytes - len(header),
+                )
+                if len(header) >= num_bytes:
+                    break
+            return header
+        except zlib.error:
+            # let zipfile raise a more informative error
+            return None
+        finally:
+            data.release()
+
+
 def _guess_archive_member_file_format(
-    *, archive_file: Union[tarfile.TarFile, zipfile.ZipFile], member_name: str
+    *,
+    archive_file: Union[tarfile.TarFile, zipfile.ZipFile],
+    member: Union[tarfile.TarInfo, zipfile.ZipInfo],
+    captured_files: Optional["_CapturedFiles"] = None,
+    mapped_archive: Optional["mmap.mmap"] = None,
 ) -> tuple[str, bool]:
     """
     The approach in this function was inspired by similar code in
     https://github.com/matthew-brett/delocate, so that project's license is included
     in distributions of ``pydistcheck`` as file ``DELOCATE_LICENSE``.
 
+    ``member`` is passed as an ``Info`` object instead of a name so that looking it up doesn't
+    require scanning the whole archive. For tarfiles, call this while ``member`` is the member
+    most recently returned by ``TarFile.next()``... that way, reading its header never requires
+    seeking backwards in a compressed stream.
+
+    If ``captured_files`` is provided and ``member`` is a compiled object, the rest of its
+    content is read into ``captured_files`` through the same file handle.
+
+    For zip files, if ``mapped_archive`` (the whole archive, memory-mapped) is provided,
+    headers are read directly from it (see ``_read_zip_member_header_from_memory()``).
+
     Returns a two-item tuple of the form ``(file_format, is_compiled)``.
     """
     if isinstance(archive_file, zipfile.ZipFile):
-        with archive_file.open(name=member_name, mode="r") as f:
-            header = f.read(4)
+        zip_info = cast("zipfile.ZipInfo", member)
+        if mapped_archive is not None:
+            header = _read_zip_member_header_from_memory(
+                mapped_archive=mapped_archive, zip_info=zip_info
+            )
+            if header is not None:
+                file_format, is_compiled = _guess_file_format_from_header(header)
+                # capturing needs the full contents, so go through zipfile for that
+                if not (is_compiled and captured_files is not None):
+                    return file_format, is_compiled
+        member_name = zip_info.filename
+        f = archive_file.open(name=zip_info, mode="r")
     else:
-        fileobj = archive_file.extractfile(member_name)
+        tar_info = cast("tarfile.TarInfo", member)
+        member_name = tar_info.name
+        fileobj = archive_file.extractfile(tar_info)
         if fileobj is None:  # pragma: no cover
             error_msg = (
-                f"'{member_name}' not found. This is a bug in pydistcheck."
+                f"'{member}' could not be read. This is a bug in pydistcheck."
                 "Report it at https://github.com/jameslamb/pydistcheck/issues."
             )
             raise RuntimeError(error_msg)
-        header = fileobj.read(4)
+        f = fileobj
+
+    with f:
+        header = f.read(4)
+        file_format, is_compiled = _guess_file_format_from_header(header)
+        if is_compiled and captured_files is not None:
+            captured_files.add(name=member_name, header=header, fileobj=f)
 
+    return file_format, is_compiled
+
+
+def _guess_file_format_from_header(header: bytes) -> tuple[str, bool]:
+    """
+    Given the first 4 bytes of a file, guess its format.
+
+    Returns a two-item tuple of the form ``(file_format, is_compiled)``.
+    """
     if header in _ELF_MAGIC_FIRST_4_BYTES:
         return _FileFormat.ELF, True
     if header in _MACH_O_MAGIC_FIRST_4_BYTES:
@@ -151,27 +578,72 @@ def _guess_archive_member_file_format(
     return _FileFormat.OTHER, False
 
 
-def _decompress_zstd_archive(
-    *, tar_zst_file: str, decompressed_tar_path: str
-) -> None:  # pragma: no cover
-    """Given a path to a .tar.zst file, decompress its contents to a .tar file"""
+def _open_bzip2_stream(
+    fileobj: IO[bytes], *, mapped_archive: Optional[mmap.mmap], jobs: int
+) -> IO[bytes]:
+    """
+    Given a file-like object with bzip2-compressed contents, return a read-only,
+    forward-only file-like object with the decompressed contents.
+
+    If ``mapped_archive`` (a memory-mapping of ``fileobj``) is provided and ``jobs > 1``,
+    blocks are decompressed in parallel. Closing the returned object does not close ``fileobj``.
+    """
+    # decompressing more blocks at once than there are CPUs is slower than decompressing
+    # them one at a time... the decompressors just evict each other's tables from the cache
+    jobs = min(jobs, os.cpu_count() or 1)
+    if mapped_archive is not None and jobs > 1:
+        return io.BufferedReader(_ParallelBzip2Reader(mapped_archive, jobs=jobs))
+    return cast("IO[bytes]", bz2.BZ2File(fileobj))
+
+
+def _open_zstd_stream(fileobj: IO[bytes]) -> IO[bytes]:  # pragma: no cover
+    """
+    Given a file-like object with zstd-compressed contents, return a read-only,
+    forward-only file-like object with the decompressed contents.
+
+    Decompression happens incrementally as the returned object is read, so nothing
+    is written to disk and the full decompressed payload is never held in memory.
+    Closing the returned object does not close ``fileobj``.
+    """
     # from Python 3.14 onwards, use the zstd support from the standard library
     try:
         import compression.zstd  # noqa: PLC0415
-
-        with compression.zstd.open(tar_zst_file, "rb") as decompressed:  # noqa: SIM117
-            with open(decompressed_tar_path, "wb") as destination:
-                destination.write(decompressed.read())
     except ImportError:
         # if 'compression.zstd' isn't available or importing it fails for some other reason, use 'zstandard' library
         zstandard = _import_zstandard()
-        with open(tar_zst_file, "rb") as compressed:
-            decompressor = zstandard.ZstdDecompressor()
-            with open(decompressed_tar_path, "wb") as destination:
-                decompressor.copy_stream(compressed, destination)
+        decompressor = zstandard.ZstdDecompressor()
+        return cast(
+            "IO[bytes]",
+            decompressor.stream_reader(fileobj, read_across_frames=True, closefd=False),
+        )
+
+    return cast("IO[bytes]", compression.zstd.ZstdFile(fileobj, mode="rb"))
+
+
+def _extract_members_from_tar_stream(
+    *, archive_file: tarfile.TarFile, paths_to_extract: set[str], out_dir: str
+) -> None:
+    """
+    Extract the members of a forward-only tarfile (opened with ``mode="r|"``) whose
+    names are in ``paths_to_extract``.
 
+    Stops reading as soon as all of them have been found, so extracting files near the
+    start of a large archive doesn't require decompressing the rest of it.
+    """
+    remaining = set(paths_to_extract)
+    while remaining:
+        tar_info = archive_file.next()
+        if tar_info is None:
+            return
+        if tar_info.name in remaining:
+            if _tf_extractall_has_filter():
+                archive_file.extract(tar_info, path=out_dir, filter="data")
+            else:
+                archive_file.extract(tar_info, path=out_dir)
+            remaining.discard(tar_info.name)
 
-def _extract_subset_of_files_from_archive(  # noqa: PLR0912
+
+def _extract_subset_of_files_from_archive(
     *,
     archive_file: str,
     archive_format: str,
@@ -183,6 +655,7 @@ def _extract_subset_of_files_from_archive(  # noqa: PLR0912
 
     Extracts AT LEAST those files... might in some cases extract all files.
     """
+    paths_to_extract = set(relative_paths)
     if archive_format == _ArchiveFormat.ZIP:
         with zipfile.ZipFile(archive_file, mode="r") as zf:
             zf.extractall(path=out_dir, members=relative_paths)
@@ -191,31 +664,20 @@ def _extract_subset_of_files_from_archive(  # noqa: PLR0912
             if _tf_extractall_has_filter():
                 tf.extractall(
                     path=out_dir,
-                    members=[tf.getmember(p) for p in relative_paths],
+                    members=[m for m in tf.getmembers() if m.name in paths_to_extract],
                     filter="data",
                 )
             else:
                 tf.extractall(
                     path=out_dir,
-                    members=[tf.getmember(p) for p in relative_paths],
+                    members=[m for m in tf.getmembers() if m.name in paths_to_extract],
                 )
     elif archive_format == _ArchiveFormat.GZIP_TAR:
-        with tarfile.open(archive_file, mode="r:gz") as tf:
-            if _tf_extractall_has_filter():
-                tf.extractall(
-                    path=out_dir,
-                    members=[tf.getmember(p) for p in relative_paths],
-                    filter="data",
-                )
-            else:
-                tf.extractall(
-                    path=out_dir,
-                    members=[tf.getmember(p) for p in relative_paths],
-                )
+        with tarfile.open(archive_file, mode="r|gz") as tf:
+            _extract_members_from_tar_stream(
+                archive_file=tf, paths_to_extract=paths_to_extract, out_dir=out_dir
+            )
     elif archive_format == _ArchiveFormat.CONDA:
-        inner_tar_zst_files = []
-        # extract any files at the outer ZIP level,
-        # and pull out the .tar.zst files
         with zipfile.ZipFile(archive_file, mode="r") as zf:
             for zip_info in zf.infolist():
                 # case 1 - skip directories
@@ -224,37 +686,28 @@ def _extract_subset_of_files_from_archive(  # noqa: PLR0912
 
                 # case 2 - if file is in the outer ZIP archive, extract it
                 if not zip_info.filename.endswith("tar.zst"):  # pragma: no cover
-                    if zip_info.filename in relative_paths:
+                    if zip_info.filename in paths_to_extract:
                         zf.extractall(path=out_dir, members=[zip_info.filename])
                     continue
 
-                # case 3 - one of the zstandard-compressed archives
-                inner_tar_zst_files.append(os.path.join(out_dir, zip_info.filename))
-                zf.extractall(path=out_dir, members=[zip_info.filename])
-
-        # extract any of these files found in those .tar.zst files
-        for tar_zst_file in inner_tar_zst_files:
-            # decompress the .tar.zst to just .tar
-            decompressed_tar_path = tar_zst_file.replace(".tar.zst", ".tar")
-            _decompress_zstd_archive(
-                tar_zst_file=tar_zst_file, decompressed_tar_path=decompressed_tar_path
-            )
-
-            # do tarfile things
-            with tarfile.open(decompressed_tar_path, mode="r") as tf:
-                files_to_extract = [
-                    tar_info
-                    for tar_info in tf.getmembers()
-                    if tar_info.name in relative_paths
-                ]
-                if _tf_extractall_has_filter():
-                    tf.extractall(
-                        path=out_dir,
-                        members=files_to_extract,
-                        filter="data",
-                    )
-                else:
-                    tf.extractall(
-                        path=out_dir,
-                        members=files_to_extract,
+                # case 3 - one of the zstandard-compressed archives...
+                # extract any of these files found in it, decompressing as the stream is read
+                with (
+                    zf.open(zip_info, mode="r") as compressed,
+                    _open_zstd_stream(compressed) as decompressed,
+                    tarfile.open(fileobj=decompressed, mode="r|") as tf,
+                ):
+                    _extract_members_from_tar_stream(
+                        archive_file=tf,
+                        paths_to_extract=paths_to_extract,
+                        out_dir=out_dir,
                     )
+    elif archive_format == _ArchiveFormat.ZSTD_TAR:
+        with (
+            open(archive_file, "rb") as compressed_file,
+            _open_zstd_stream(compressed_file) as decompressed,
+            tarfile.open(fileobj=decompressed, mode="r|") as tf,
+        ):
+            _extract_members_from_tar_stream(
+                archive_file=tf, paths_to_extract=paths_to_extract, out_dir=out_dir
+            )
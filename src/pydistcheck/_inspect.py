@@ -2,26 +2,31 @@
 Code that prints diagnostic information about a distribution.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from ._distribution_summary import _DataTier
 from ._utils import _FileSize
 
 if TYPE_CHECKING:
     from ._config import _Config
     from .distribution_summary import _DistributionSummary
 
+# sizes and the number of compiled objects are reported, which requires reading file headers
+INSPECT_DATA_TIER = _DataTier.HEADERS
 
-def inspect_distribution(*, summary: "_DistributionSummary", config: "_Config") -> None:
+
+def inspect_distribution(
+    *,
+    summary: "_DistributionSummary",
+    config: "_Config",
+    debug_symbols_detected_by: Optional[dict[str, str]] = None,
+) -> None:
+    """
+    ``debug_symbols_detected_by`` maps the name of each compiled object to what decided whether
+    it has debug symbols (see ``_CompiledObjectsDebugSymbolCheck.detected_by``), if that check ran.
+    """
     print("file size")
     unit_str = config.output_file_size_unit
-    compressed_size = _FileSize(
-        num=summary.compressed_size_bytes,
-        unit_str="B",
-    )
-    compressed_size_str = compressed_size.to_string(
-        precision=config.output_file_size_precision,
-        unit_str=unit_str,
-    )
     uncompressed_size = _FileSize(
         num=summary.uncompressed_size_bytes,
         unit_str="B",
@@ -30,16 +35,34 @@ def inspect_distribution(*, summary: "_DistributionSummary", config: "_Config")
         precision=config.output_file_size_precision,
         unit_str=unit_str,
     )
-    print(f"  * compressed size: {compressed_size_str}")
-    print(f"  * uncompressed size: {uncompressed_size_str}")
-    space_saving = 1.0 - (
-        compressed_size.total_size_bytes / uncompressed_size.total_size_bytes
-    )
-    print(f"  * compression space saving: {round(100 * space_saving, 1)}%")
+    # compressed size isn't known for summaries built from some manifests
+    if summary.compressed_size_bytes is None:
+        print("  * compressed size: unknown")
+        print(f"  * uncompressed size: {uncompressed_size_str}")
+    else:
+        compressed_size = _FileSize(
+            num=summary.compressed_size_bytes,
+            unit_str="B",
+        )
+        compressed_size_str = compressed_size.to_string(
+            precision=config.output_file_size_precision,
+            unit_str=unit_str,
+        )
+        print(f"  * compressed size: {compressed_size_str}")
+        print(f"  * uncompressed size: {uncompressed_size_str}")
+        space_saving = 1.0 - (
+            compressed_size.total_size_bytes / uncompressed_size.total_size_bytes
+        )
+        print(f"  * compression space saving: {round(100 * space_saving, 1)}%")
 
     print("contents")
     print(f"  * directories: {summary.num_directories}")
-    print(f"  * files: {summary.num_files} ({len(summary.compiled_objects)} compiled)")
+    # file formats aren't known for summaries built without reading file headers (e.g. from manifests)
+    if summary.data_tier >= _DataTier.HEADERS:
+        compiled_str = f"{len(summary.compiled_objects)} compiled"
+    else:
+        compiled_str = "unknown number compiled"
+    print(f"  * files: {summary.num_files} ({compiled_str})")
 
     print("size by extension")
     for extension, size in summary.size_by_file_extension.items():
@@ -58,3 +81,13 @@ def inspect_distribution(*, summary: "_DistributionSummary", config: "_Config")
             unit_str="B",
         ).to_string(precision=config.output_file_size_precision, unit_str=unit_str)
         print(f"  * ({size_str}) {file_info.name}")
+
+    # for each compiled object, what decided whether or not it has debug symbols
+    if summary.compiled_objects:
+        print("debug symbol detection")
+        if debug_symbols_detected_by is None:
+            print("  * unknown (debug symbols weren't checked in this run)")
+        else:
+            for file_info in summary.compiled_objects:
+                detected_by = debug_symbols_detected_by.get(file_info.name, "unknown")
+                print(f"  * {file_info.name}: {detected_by}")
@@ -0,0 +1,229 @@
+"""
+Code for reading listings of a distribution's contents ("manifests"),
+so some checks can be run without access to the distribution itself.
+
+Supported formats:
+
+* NDJSON, one object per member, like ``{"name": "pkg/__init__.py", "size": 10, "compressed_size": 8}``.
+  Directories are members whose name ends in ``/``, or which have ``"type": "directory"``.
+  An optional object like ``{"archive_name": "pkg-0.1.0.tar.gz", "archive_size": 1234}``
+  describes the distribution itself.
+* output of ``unzip -Z`` / ``zipinfo`` (including ``-l``, which adds compressed sizes)
+* output of ``tar -tv``, from GNU tar or bsdtar
+"""
+
+import json
+import pathlib
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ._file_utils import _DirectoryInfo, _FileFormat, _FileInfo
+
+# fields in 'unzip -Z' lines: permissions, version, OS, size, flags, (with '-l') compressed size,
+# compression method, date, time, name
+_ZIPINFO_MEMBER_PATTERN = re.compile(
+    r"^(?P<permissions>[-a-zA-Z?]{10})\s+\S+\s+\S+\s+(?P<size>\d+)\s+\S+\s+"
+    r"(?:(?P<compressed_size>\d+)\s+)?\S+\s+\S+\s+\d\d:\d\d\s(?P<name>.+)$"
+)
+_ZIPINFO_ARCHIVE_NAME_PATTERN = re.compile(r"^Archive:\s+(?P<archive_name>.+)$")
+_ZIPINFO_ARCHIVE_SIZE_PATTERN = re.compile(
+    r"^Zip file size: (?P<archive_size>\d+) bytes"
+)
+_ZIPINFO_TRAILER_PATTERN = re.compile(r"^\d+ files?, \d+ bytes? uncompressed")
+
+# fields in GNU 'tar -tv' lines: permissions, owner/group, size, date, time, name
+_GNU_TAR_MEMBER_PATTERN = re.compile(
+    r"^(?P<permissions>[-a-zA-Z][-a-zA-Z]{9})\s+\S+/\S+\s+(?P<size>\d+)\s+"
+    r"\d{4}-\d\d-\d\d\s+\d\d:\d\d(?::\d\d)?\s(?P<name>.+)$"
+)
+
+# fields in bsdtar 'tar -tv' lines (same layout as 'ls -l'): permissions, link count, owner,
+# group, size, month, day, year or time, name
+_BSD_TAR_MEMBER_PATTERN = re.compile(
+    r"^(?P<permissions>[-a-zA-Z][-a-zA-Z]{9})\s+\d+\s+\S+\s+\S+\s+(?P<size>\d+)\s+"
+    r"[A-Z][a-z]{2}\s+\d+\s+(?:\d{4}|\d\d:\d\d)\s(?P<name>.+)$"
+)
+
+# GNU tar escapes non-printable bytes in names, e.g. '\342\202\254' for '€'
+_GNU_TAR_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{3}|\\)")
+
+
+@dataclass
+class _Manifest:
+    archive_name: Optional[str] = None
+    archive_size_bytes: Optional[int] = None
+    directories: list[_DirectoryInfo] = field(default_factory=list)
+    files: list[_FileInfo] = field(default_factory=list)
+    # compressed size of each file in 'files', where known
+    file_compressed_sizes: list[Optional[int]] = field(default_factory=list)
+
+    @property
+    def compressed_size_bytes(self) -> Optional[int]:
+        """
+        Size of the distribution, or if that's not known, the sum of the compressed
+        sizes of all its files (if those are all known).
+        """
+        if self.archive_size_bytes is not None:
+            return self.archive_size_bytes
+        known_sizes = [s for s in self.file_compressed_sizes if s is not None]
+        if len(known_sizes) == len(self.files):
+            return sum(known_sizes)
+        return None
+
+
+def _file_info_from_manifest(*, name: str, size: int) -> _FileInfo:
+    return _FileInfo(
+        name=name,
+        file_format=_FileFormat.UNKNOWN,
+        file_extension=pathlib.Path(name).suffix or "no-extension",
+        is_compiled=False,
+        uncompressed_size_bytes=size,
+    )
+
+
+def _unescape_gnu_tar_name(name: str) -> str:
+    def _replace(match: "re.Match[bytes]") -> bytes:
+        escaped = match.group(1)
+        if escaped == b"\\":
+            return b"\\"
+        return bytes([int(escaped, 8)])
+
+    raw = _GNU_TAR_ESCAPE_PATTERN.sub(_replace, name.encode("utf-8"))
+    return raw.decode("utf-8", errors="replace")
+
+
+def _strip_link_target(*, name: str, permissions: str) -> str:
+    if permissions.startswith("l"):
+        return name.split(" -> ", 1)[0]
+    if permissions.startswith("h"):
+        return name.split(" link to ", 1)[0]
+    return name
+
+
+def _read_ndjson_manifest(lines: list[str]) -> _Manifest:
+    manifest = _Manifest()
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record: dict[str, Any] = json.loads(line)
+            if "name" not in record:
+                manifest.archive_name = record.get(
+                    "archive_name", manifest.archive_name
+                )
+                manifest.archive_size_bytes = record.get(
+                    "archive_size", manifest.archive_size_bytes
+                )
+                continue
+            name = str(record["name"])
+            is_dir = record.get("type") == "directory" or name.endswith("/")
+            if is_dir:
+                manifest.directories.append(_DirectoryInfo(name=name))
+                continue
+            manifest.files.append(
+                _file_info_from_manifest(name=name, size=int(record["size"]))
+            )
+            compressed_size = record.get("compressed_size")
+            manifest.file_compressed_sizes.append(
+                None if compressed_size is None else int(compressed_size)
+            )
+        except (KeyError, TypeError, ValueError) as err:
+            msg = f"Could not parse line {line_num} of NDJSON manifest: {err}"
+            raise ValueError(msg) from err
+    return manifest
+
+
+def _read_zipinfo_manifest(lines: list[str]) -> _Manifest:
+    manifest = _Manifest()
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip() or _ZIPINFO_TRAILER_PATTERN.match(line):
+            continue
+        if archive_name_match := _ZIPINFO_ARCHIVE_NAME_PATTERN.match(line):
+            manifest.archive_name = archive_name_match.group("archive_name").strip()
+            continue
+        if archive_size_match := _ZIPINFO_ARCHIVE_SIZE_PATTERN.match(line):
+            manifest.archive_size_bytes = int(archive_size_match.group("archive_size"))
+            continue
+        member_match = _ZIPINFO_MEMBER_PATTERN.match(line)
+        if member_match is None:
+            msg = f"Could not parse line {line_num} of 'unzip -Z' manifest: '{line}'"
+            raise ValueError(msg)
+        name = member_match.group("name")
+        if name.endswith("/"):
+            manifest.directories.append(_DirectoryInfo(name=name))
+            continue
+        manifest.files.append(
+            _file_info_from_manifest(name=name, size=int(member_match.group("size")))
+        )
+        compressed_size = member_match.group("compressed_size")
+        manifest.file_compressed_sizes.append(
+            None if compressed_size is None else int(compressed_size)
+        )
+    return manifest
+
+
+def _read_tar_manifest(lines: list[str]) -> _Manifest:
+    manifest = _Manifest()
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        member_match = _GNU_TAR_MEMBER_PATTERN.match(line)
+        if member_match is not None:
+            name = _unescape_gnu_tar_name(member_match.group("name"))
+        else:
+            member_match = _BSD_TAR_MEMBER_PATTERN.match(line)
+            if member_match is None:
+                msg = f"Could not parse line {line_num} of 'tar -tv' manifest: '{line}'"
+                raise ValueError(msg)
+            name = member_match.group("name")
+        permissions = member_match.group("permissions")
+        name = _strip_link_target(name=name, permissions=permissions)
+
+        # match what tarfile reports... only regular files are files, and names never
+        # have a trailing '/'
+        if permissions.startswith("-"):
+            manifest.files.append(
+                _file_info_from_manifest(
+                    name=name, size=int(member_match.group("size"))
+                )
+            )
+            # members of a tarfile are not compressed individually
+            manifest.file_compressed_sizes.append(None)
+        else:
+            manifest.directories.append(_DirectoryInfo(name=name.rstrip("/")))
+    return manifest
+
+
+def _read_manifest(filename: str) -> _Manifest:
+    """
+    Read the manifest in ``filename``, or from standard input if ``filename`` is ``'-'``.
+    """
+    unsupported_msg = (
+        f"File '{filename}' does not appear to be a manifest in one of the formats "
+        "supported by 'pydistcheck'. Supported formats: NDJSON, output of 'unzip -Z', "
+        "output of 'tar -tv'"
+    )
+    try:
+        if filename == "-":
+            lines = sys.stdin.buffer.read().decode("utf-8").splitlines()
+        else:
+            with open(filename, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+    except UnicodeDecodeError as err:
+        raise ValueError(unsupported_msg) from err
+
+    first_line = next((line for line in lines if line.strip()), "")
+    if first_line.lstrip().startswith("{"):
+        return _read_ndjson_manifest(lines)
+    if _ZIPINFO_ARCHIVE_NAME_PATTERN.match(first_line) or _ZIPINFO_MEMBER_PATTERN.match(
+        first_line
+    ):
+        return _read_zipinfo_manifest(lines)
+    if _GNU_TAR_MEMBER_PATTERN.match(first_line) or _BSD_TAR_MEMBER_PATTERN.match(
+        first_line
+    ):
+        return _read_tar_manifest(lines)
+
+    raise ValueError(unsupported_msg)
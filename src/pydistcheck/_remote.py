@@ -0,0 +1,302 @@
+"""
+Code for reading distributions directly from http(s) URLs, without
+downloading all of them.
+"""
+
+import http.client
+import io
+import re
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from typing import IO, TYPE_CHECKING, Optional
+
+from . import __version__
+
+if TYPE_CHECKING:
+    from _typeshed import WriteableBuffer
+
+# ranges are fetched in blocks of this size... large enough that reading a zip file's
+# central directory or a few small neighbouring members only takes 1 request
+_BLOCK_SIZE_BYTES = 64 * 1024
+
+# at most this many blocks are held in memory at once (i.e. a 2 MiB read-ahead cache)
+_MAX_CACHED_BLOCKS = 32
+
+_COPY_CHUNK_SIZE_BYTES = 1024 * 1024
+_REQUEST_TIMEOUT_SECONDS = 60
+
+_CONTENT_RANGE_PATTERN = re.compile(
+    r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<size>\d+)$"
+)
+
+
+class _RemoteFileError(Exception):
+    """
+    Raised when a distribution at an http(s) URL can't be read, e.g. because the host
+    couldn't be reached, the request timed out, or the server responded with an error.
+    """
+
+
+def _is_url(filename: str) -> bool:
+    return filename.lower().startswith(("http://", "https://"))
+
+
+def _request(url: str, *, byte_range: Optional[str] = None) -> urllib.request.Request:
+    # only http(s) URLs are ever opened, never 'file:' or other schemes
+    if not _is_url(url):
+        msg = f"Only http:// and https:// URLs are supported, got '{url}'."
+        raise ValueError(msg)
+    headers = {"User-Agent": f"pydistcheck/{__version__}"}
+    if byte_range is not None:
+        headers["Range"] = f"bytes={byte_range}"
+    return urllib.request.Request(url, headers=headers)  # noqa: S310
+
+
+def _parse_content_range(
+    content_range: Optional[str],
+) -> Optional[tuple[int, int, int]]:
+    """
+    Parse a header like ``Content-Range: bytes 100-199/1000`` into ``(start, end, size)``.
+    Returns ``None`` if the header is missing or has an unknown size.
+    """
+    if content_range is None:
+        return None
+    match = _CONTENT_RANGE_PATTERN.match(content_range.strip())
+    if match is None:
+        return None
+    return int(match.group("start")), int(match.group("end")), int(match.group("size"))
+
+
+class _HTTPRangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file whose contents are fetched with HTTP range requests
+    as they're read.
+
+    Reads are rounded out to whole blocks of ``block_size_bytes``, and the most recently-used
+    ``max_cached_blocks`` blocks are kept in memory. When reads are sequential (e.g. when
+    decompressing a large member), each request fetches twice as many blocks as the last,
+    up to half of the cache.
+
+    Tools like ``zipfile`` only need to seek to the end of the file and read the central
+    directory there, so for zip files this avoids downloading almost all of the file.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        url: str,
+        size_bytes: int,
+        block_size_bytes: int = _BLOCK_SIZE_BYTES,
+        max_cached_blocks: int = _MAX_CACHED_BLOCKS,
+        prefetched_start: int = 0,
+        prefetched_data: bytes = b"",
+    ):
+        super().__init__()
+        self.url = url
+        self.size_bytes = size_bytes
+        self.block_size_bytes = block_size_bytes
+        self.max_cached_blocks = max_cached_blocks
+        self.num_requests = 0
+        self.num_bytes_downloaded = 0
+        self._position = 0
+        self._blocks: OrderedDict[int, bytes] = OrderedDict()
+        self._num_blocks_to_fetch = 1
+        self._next_sequential_block = -1
+        if prefetched_data:
+            self._store_range(start=prefetched_start, data=prefetched_data)
+
+    @property
+    def _num_blocks(self) -> int:
+        return -(-self.size_bytes // self.block_size_bytes)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size_bytes + offset
+        else:
+            msg = f"Invalid value for 'whence': {whence}"
+            raise ValueError(msg)
+        if position < 0:
+            msg = f"Negative seek position {position}"
+            raise OSError(msg)
+        self._position = position
+        return self._position
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        view = memoryview(buffer).cast("B")
+        num_bytes = min(len(view), self.size_bytes - self._position)
+        if num_bytes <= 0:
+            return 0
+
+        first_block = self._position // self.block_size_bytes
+        last_block = (self._position + num_bytes - 1) // self.block_size_bytes
+        blocks = self._get_blocks(first_block=first_block, last_block=last_block)
+        data = b"".join(blocks[i] for i in range(first_block, last_block + 1))
+
+        start = self._position - first_block * self.block_size_bytes
+        view[:num_bytes] = data[start : start + num_bytes]
+        self._position += num_bytes
+        return num_bytes
+
+    def _store_block(self, index: int, block: bytes) -> None:
+        self._blocks[index] = block
+        self._blocks.move_to_end(index)
+        while len(self._blocks) > self.max_cached_blocks:
+            self._blocks.popitem(last=False)
+
+    def _store_range(self, *, start: int, data: bytes) -> None:
+        """
+        Cache every whole block in ``data``, which starts at offset ``start``
+        (the last block of the file counts as whole even if it's short).
+        """
+        first_block = -(-start // self.block_size_bytes)
+        for index in range(first_block, self._num_blocks):
+            block_start = index * self.block_size_bytes
+            block_end = min(block_start + self.block_size_bytes, self.size_bytes)
+            if block_end > start + len(data):
+                break
+            self._store_block(index, data[block_start - start : block_end - start])
+
+    def _get_blocks(self, *, first_block: int, last_block: int) -> dict[int, bytes]:
+        # blocks are collected here before being cached, so that reads larger than
+        # the cache still work
+        out = {}
+        missing = []
+        for index in range(first_block, last_block + 1):
+            if index in self._blocks:
+                self._blocks.move_to_end(index)
+                out[index] = self._blocks[index]
+            else:
+                missing.append(index)
+
+        if missing:
+            if missing[0] == self._next_sequential_block:
+                self._num_blocks_to_fetch = min(
+                    self._num_blocks_to_fetch * 2, max(1, self.max_cached_blocks // 2)
+                )
+            else:
+                self._num_blocks_to_fetch = 1
+            fetch_last_block = min(
+                max(missing[-1], missing[0] + self._num_blocks_to_fetch - 1),
+                self._num_blocks - 1,
+            )
+            fetched = self._fetch_blocks(
+                first_block=missing[0], last_block=fetch_last_block
+            )
+            self._next_sequential_block = fetch_last_block + 1
+            for index, block in fetched.items():
+                if index in missing:
+                    out[index] = block
+                self._store_block(index, block)
+        return out
+
+    def _fetch_blocks(self, *, first_block: int, last_block: int) -> dict[int, bytes]:
+        start = first_block * self.block_size_bytes
+        end = min((last_block + 1) * self.block_size_bytes, self.size_bytes) - 1
+        try:
+            with urllib.request.urlopen(  # noqa: S310
+                _request(self.url, byte_range=f"{start}-{end}"),
+                timeout=_REQUEST_TIMEOUT_SECONDS,
+            ) as response:
+                content_range = _parse_content_range(
+                    response.headers.get("Content-Range")
+                )
+                data = response.read()
+        # 'URLError' and timeouts are both 'OSError's
+        except (OSError, http.client.HTTPException) as err:
+            msg = f"Could not read bytes {start}-{end} of '{self.url}': {err}"
+            raise _RemoteFileError(msg) from err
+
+        self.num_requests += 1
+        self.num_bytes_downloaded += len(data)
+        if (
+            response.status != 206
+            or content_range != (start, end, self.size_bytes)
+            or len(data) != end - start + 1
+        ):
+            msg = (
+                f"Unexpected response to request for bytes {start}-{end} of '{self.url}'. "
+                "Did the file change while it was being read?"
+            )
+            raise _RemoteFileError(msg)
+
+        return {
+            index: data[
+                (index - first_block) * self.block_size_bytes : (
+                    index - first_block + 1
+                )
+                * self.block_size_bytes
+            ]
+            for index in range(first_block, last_block + 1)
+        }
+
+
+def _download_to_temporary_file(response: IO[bytes]) -> IO[bytes]:
+    out = tempfile.TemporaryFile(prefix="pydistcheck-")  # noqa: SIM115
+    try:
+        shutil.copyfileobj(response, out, _COPY_CHUNK_SIZE_BYTES)
+    except BaseException:
+        out.close()
+        raise
+    out.seek(0)
+    return out
+
+
+def _open_url(url: str) -> IO[bytes]:
+    """
+    Open the file at an http(s) URL for reading.
+
+    The first request asks for just the last block of the file. If the server honors that,
+    the rest of the file is read lazily with range requests (see ``_HTTPRangeFile``).
+    Otherwise, the whole file is downloaded to a temporary file.
+    """
+    try:
+        try:
+            with urllib.request.urlopen(  # noqa: S310
+                _request(url, byte_range=f"-{_BLOCK_SIZE_BYTES}"),
+                timeout=_REQUEST_TIMEOUT_SECONDS,
+            ) as response:
+                if response.status != 206:
+                    # server ignored the 'Range' header and is sending the whole file
+                    return _download_to_temporary_file(response)
+                content_range = _parse_content_range(
+                    response.headers.get("Content-Range")
+                )
+                tail = response.read()
+        except urllib.error.HTTPError as err:
+            # 416 (Range Not Satisfiable) is returned for empty files by some servers
+            if err.code != 416:
+                raise
+            content_range = None
+
+        if content_range is None:
+            with urllib.request.urlopen(  # noqa: S310
+                _request(url), timeout=_REQUEST_TIMEOUT_SECONDS
+            ) as response:
+                return _download_to_temporary_file(response)
+    except (OSError, http.client.HTTPException) as err:
+        msg = f"Could not download '{url}': {err}"
+        raise _RemoteFileError(msg) from err
+
+    start, _, size_bytes = content_range
+    range_file = _HTTPRangeFile(
+        url=url, size_bytes=size_bytes, prefetched_start=start, prefetched_data=tail
+    )
+    range_file.num_requests = 1
+    range_file.num_bytes_downloaded = len(tail)
+    return io.BufferedReader(range_file)
@@ -2,8 +2,21 @@
 functions used to analyze compiled objects
 """
 
+import io
 import re
+import shutil
+import struct
 import subprocess
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import BinaryIO, Optional, cast
+
+from ._file_utils import (
+    _DOS_MZ_MAGIC_FIRST_2_BYTES,
+    _ELF_MAGIC_FIRST_4_BYTES,
+    _MACH_O_MAGIC_FIRST_4_BYTES,
+    _FileFormat,
+)
 
 _COMMAND_FAILED = "__command_failed__"
 _NO_DEBUG_SYMBOLS = "__no_debug_symbols_found__"
@@ -27,35 +40,133 @@ def _run_command(args: list[str]) -> str:
         return _TOOL_NOT_AVAILABLE
 
 
-# commands to dump symbol information, and regular expressions which, if they match
-# any lines in the output, indicate that debug symbols have been found
+# file formats that each command understands
+_ANY_FORMAT = frozenset({_FileFormat.ELF, _FileFormat.MACH_O, _FileFormat.WINDOWS_PE})
+_ELF_ONLY = frozenset({_FileFormat.ELF})
+_MACH_O_ONLY = frozenset({_FileFormat.MACH_O})
+
+# commands to dump symbol information, regular expressions which, if they match
+# any lines in the output, indicate that debug symbols have been found, and
+# the file formats those commands are useful for
 # fmt: off
 _COMMANDS_TO_PATTERNS = [
-    (["dsymutil", "-s"],                           r"\(N_OSO[\t ]+\)"),
-    (["objdump", "--all-headers"],                 r"[\t ]+\.debug_line[\t ]+"),
-    (["objdump", "--macho", "--all-headers"],      r"[\t ]+\.debug_line[\t ]+"),
-    (["objdump", "-W"],                            r"^Contents of the \.debug"),
-    (["objdump", "--macho", "-W"],                 r"^Contents of the \.debug"),
-    (["objdump", "-g"],                            r"^Contents of the \.debug"),
-    (["objdump", "--macho", "-g"],                 r"^Contents of the \.debug"),
-    (["llvm-objdump", "--all-headers"],            r"[\t ]+\.debug_line[\t ]+"),
-    (["llvm-objdump", "--macho", "--all-headers"], r"[\t ]+\.debug_line[\t ]+"),
-    (["llvm-objdump", "-W"],                       r"^Contents of the \.debug"),
-    (["llvm-objdump", "--macho", "-W"],            r"^Contents of the \.debug"),
-    (["llvm-objdump", "-g"],                       r"^Contents of the \.debug"),
-    (["llvm-objdump", "--macho", "-g"],            r"^Contents of the \.debug"),
-    (["readelf", "-S"],                            r"[\t ]+\.debug_[a-z]+[\t ]+")
+    (["dsymutil", "-s"],                           r"\(N_OSO[\t ]+\)",            _MACH_O_ONLY),
+    (["objdump", "--all-headers"],                 r"[\t ]+\.debug_line[\t ]+",     _ANY_FORMAT),
+    (["objdump", "--macho", "--all-headers"],      r"[\t ]+\.debug_line[\t ]+",     _MACH_O_ONLY),
+    (["objdump", "-W"],                            r"^Contents of the \.debug",     _ANY_FORMAT),
+    (["objdump", "--macho", "-W"],                 r"^Contents of the \.debug",     _MACH_O_ONLY),
+    (["objdump", "-g"],                            r"^Contents of the \.debug",     _ANY_FORMAT),
+    (["objdump", "--macho", "-g"],                 r"^Contents of the \.debug",     _MACH_O_ONLY),
+    (["llvm-objdump", "--all-headers"],            r"[\t ]+\.debug_line[\t ]+",     _ANY_FORMAT),
+    (["llvm-objdump", "--macho", "--all-headers"], r"[\t ]+\.debug_line[\t ]+",     _MACH_O_ONLY),
+    (["llvm-objdump", "-W"],                       r"^Contents of the \.debug",     _ANY_FORMAT),
+    (["llvm-objdump", "--macho", "-W"],            r"^Contents of the \.debug",     _MACH_O_ONLY),
+    (["llvm-objdump", "-g"],                       r"^Contents of the \.debug",     _ANY_FORMAT),
+    (["llvm-objdump", "--macho", "-g"],            r"^Contents of the \.debug",     _MACH_O_ONLY),
+    (["readelf", "-S"],                            r"[\t ]+\.debug_[a-z]+[\t ]+",   _ELF_ONLY)
 ]
 # fmt: on
 
+# tools whose output is compared with and without '-a', see _nm_reports_debug_symbols()
+_NM_TOOLS = ["nm", "llvm-nm"]
 
-def _look_for_debug_symbols(lib_file: str) -> tuple[bool, str]:
-    for cmd_args, pattern in _COMMANDS_TO_PATTERNS:
-        stdout = _run_command(args=[*cmd_args, lib_file])
-        contains_debug_symbols = any(
-            bool(re.search(pattern, x)) for x in stdout.split("\n")
-        )
-        if contains_debug_symbols:
+
+@lru_cache
+def _tool_is_available(tool_name: str) -> bool:
+    """
+    Check whether a tool can be found on ``PATH``. Cached, so each tool is
+    only looked for once per process.
+    """
+    return shutil.which(tool_name) is not None
+
+
+def _commands_for_file_format(
+    file_format: Optional[str],
+) -> list[tuple[list[str], "re.Pattern[bytes]"]]:
+    """
+    Return only those commands that are installed and that understand ``file_format``.
+
+    If ``file_format`` is ``None`` or not a compiled-object format, no commands are
+    excluded based on format.
+    """
+    return [
+        (cmd_args, pattern)
+        for cmd_args, pattern, file_formats in _COMPILED_COMMANDS_TO_PATTERNS
+        if _tool_is_available(cmd_args[0])
+        and (file_format not in _ANY_FORMAT or file_format in file_formats)
+    ]
+
+
+def _debug_symbol_tools(file_format: Optional[str]) -> list[str]:
+    """
+    Names of the external tools (in the order they're tried) that are used to look
+    for debug symbols in a file of format ``file_format``, if it can't be parsed directly.
+    """
+    out: list[str] = []
+    for cmd_args, _ in _commands_for_file_format(file_format):
+        if cmd_args[0] not in out:
+            out.append(cmd_args[0])
+    out += [tool for tool in _NM_TOOLS if _tool_is_available(tool)]
+    return out
+
+
+# compiled once, as bytes patterns... output is searched as it's produced,
+# without decoding it (equivalent to decoding with 'latin1', see _run_command())
+_COMPILED_COMMANDS_TO_PATTERNS = [
+    (cmd_args, re.compile(pattern.encode("latin1"), flags=re.MULTILINE), file_formats)
+    for cmd_args, pattern, file_formats in _COMMANDS_TO_PATTERNS
+]
+
+# how much output to read from a command at once
+_OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# most output is line-oriented, but in case any command produces extremely long lines,
+# only hold onto this many bytes of an incomplete line
+_MAX_PARTIAL_LINE_SIZE = 64 * 1024
+
+
+def _command_output_matches(args: list[str], pattern: "re.Pattern[bytes]") -> bool:
+    """
+    Run a command and search its output for ``pattern``, line by line, as that output
+    is produced.
+
+    As soon as a match is found, the command is terminated... so memory usage is bounded
+    by a small buffer, and commands that produce a lot of output (e.g. 'objdump -W' on
+    a large library with debug symbols) don't have to run to completion.
+
+    Returns ``False`` if the tool isn't available or none of its output matches.
+    """
+    try:
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        return False
+
+    with proc:
+        stdout = cast("io.BufferedReader", proc.stdout)
+        partial_line = b""
+        while True:
+            chunk = stdout.read1(_OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+            data = partial_line + chunk
+            # only search complete lines, and carry the rest over to the next chunk
+            last_newline = data.rfind(b"\n")
+            if last_newline == -1:
+                partial_line = data[-_MAX_PARTIAL_LINE_SIZE:]
+                continue
+            partial_line = data[last_newline + 1 :][-_MAX_PARTIAL_LINE_SIZE:]
+            if pattern.search(data, 0, last_newline + 1):
+                proc.kill()
+                return True
+
+        return bool(pattern.search(partial_line))
+
+
+def _look_for_debug_symbols(
+    lib_file: str, file_format: Optional[str] = None
+) -> tuple[bool, str]:
+    for cmd_args, pattern in _commands_for_file_format(file_format):
+        if _command_output_matches(args=[*cmd_args, lib_file], pattern=pattern):
             return True, " ".join(cmd_args)
     # if you get here, no debug symbols were found by any tools
     return False, _NO_DEBUG_SYMBOLS
@@ -74,22 +185,658 @@ def _nm_reports_debug_symbols(tool_name: str, lib_file: str) -> tuple[bool, str]
     return exported_symbols != all_symbols, f"{tool_name} -a"
 
 
-def _file_has_debug_symbols(file_absolute_path: str) -> tuple[bool, str]:
+# references:
+#   * https://refspecs.linuxfoundation.org/elf/gabi4+/ch4.eheader.html
+#   * https://refspecs.linuxfoundation.org/elf/gabi4+/ch4.sheader.html
+#   * https://refspecs.linuxfoundation.org/elf/gabi4+/ch4.symtab.html
+_ELF_CLASS_32 = 1
+_ELF_CLASS_64 = 2
+_ELF_DATA_LITTLE_ENDIAN = 1
+_ELF_DATA_BIG_ENDIAN = 2
+_ELF_SHN_XINDEX = 0xFFFF
+_ELF_SHT_SYMTAB = 2
+_ELF_STT_SECTION = 3
+_ELF_STT_FILE = 4
+
+
+@dataclass(frozen=True)
+class _ElfLayout:
+    """Offsets and struct formats for the pieces of an ELF file that pydistcheck reads"""
+
+    # offset and format of e_shoff in the ELF header
+    shoff_offset: int
+    shoff_format: str
+    # offset of e_shentsize, e_shnum, and e_shstrndx (3 consecutive uint16s)
+    shentsize_offset: int
+    # format of one entry in the section header table
+    section_header_format: str
+    # offset of st_info in one entry in a symbol table
+    st_info_offset: int
+
+
+_ELF_LAYOUTS = {
+    _ELF_CLASS_32: _ElfLayout(
+        shoff_offset=0x20,
+        shoff_format="I",
+        shentsize_offset=0x2E,
+        section_header_format="IIIIIIIIII",
+        st_info_offset=12,
+    ),
+    _ELF_CLASS_64: _ElfLayout(
+        shoff_offset=0x28,
+        shoff_format="Q",
+        shentsize_offset=0x3A,
+        section_header_format="IIQQQQIIQQ",
+        st_info_offset=4,
+    ),
+}
+
+
+@dataclass
+class _ElfSection:
+    name: str
+    section_type: int
+    offset: int
+    size: int
+    entsize: int
+
+
+def _read_exactly(f: BinaryIO, *, offset: int, num_bytes: int) -> bytes:
+    f.seek(offset)
+    data = f.read(num_bytes)
+    if len(data) != num_bytes:
+        msg = f"Expected to read {num_bytes} bytes at offset {offset}, got {len(data)}."
+        raise ValueError(msg)
+    return data
+
+
+def _read_elf_sections(f: BinaryIO) -> tuple[list[_ElfSection], _ElfLayout]:
+    """
+    Read the section header table of an ELF file, without reading any of the
+    sections' contents (other than the table of section names).
+
+    Handles 32-bit and 64-bit files, in either byte order.
+
+    Returns a tuple of the form ``(sections, layout)``, where ``layout`` is the entry
+    from ``_ELF_LAYOUTS`` describing this file. Raises ``ValueError`` if the file can't be parsed.
+    """
+    e_ident = _read_exactly(f, offset=0, num_bytes=16)
+    if e_ident[:4] not in _ELF_MAGIC_FIRST_4_BYTES:
+        msg = "Not an ELF file."
+        raise ValueError(msg)
+
+    ei_class, ei_data = e_ident[4], e_ident[5]
+    if ei_class not in _ELF_LAYOUTS or ei_data not in {
+        _ELF_DATA_LITTLE_ENDIAN,
+        _ELF_DATA_BIG_ENDIAN,
+    }:
+        msg = f"Unrecognized ELF class ({ei_class}) or data encoding ({ei_data})."
+        raise ValueError(msg)
+    byte_order = "<" if ei_data == _ELF_DATA_LITTLE_ENDIAN else ">"
+    layout = _ELF_LAYOUTS[ei_class]
+
+    (e_shoff,) = struct.unpack(
+        byte_order + layout.shoff_format,
+        _read_exactly(
+            f,
+            offset=layout.shoff_offset,
+            num_bytes=struct.calcsize(layout.shoff_format),
+        ),
+    )
+    e_shentsize, e_shnum, e_shstrndx = struct.unpack(
+        byte_order + "HHH",
+        _read_exactly(f, offset=layout.shentsize_offset, num_bytes=6),
+    )
+    if e_shoff == 0:
+        # no section header table at all
+        return [], layout
+
+    section_header_format = byte_order + layout.section_header_format
+    if e_shentsize < struct.calcsize(section_header_format):
+        msg = f"ELF section header entries are too small ({e_shentsize} bytes)."
+        raise ValueError(msg)
+
+    def _read_section_header(index: int) -> tuple[int, ...]:
+        return struct.unpack_from(
+            section_header_format,
+            _read_exactly(
+                f, offset=e_shoff + index * e_shentsize, num_bytes=e_shentsize
+            ),
+        )
+
+    # files with a very large number of sections store the real counts in section 0
+    if e_shnum == 0 or e_shstrndx == _ELF_SHN_XINDEX:
+        _, _, _, _, _, section_0_size, section_0_link, *_ = _read_section_header(0)
+        if e_shnum == 0:
+            e_shnum = section_0_size
+        if e_shstrndx == _ELF_SHN_XINDEX:
+            e_shstrndx = section_0_link
+
+    raw_headers = _read_exactly(f, offset=e_shoff, num_bytes=e_shnum * e_shentsize)
+    headers = [
+        struct.unpack_from(section_header_format, raw_headers, i * e_shentsize)
+        for i in range(e_shnum)
+    ]
+    if e_shstrndx >= e_shnum:
+        msg = f"ELF section name table index ({e_shstrndx}) is out of range."
+        raise ValueError(msg)
+
+    _, _, _, _, names_offset, names_size, *_ = headers[e_shstrndx]
+    section_names = _read_exactly(f, offset=names_offset, num_bytes=names_size)
+
+    sections = []
+    for sh_name, sh_type, _, _, sh_offset, sh_size, _, _, _, sh_entsize in headers:
+        name_end = section_names.find(b"\x00", sh_name)
+        if name_end == -1:
+            name_end = len(section_names)
+        sections.append(
+            _ElfSection(
+                name=section_names[sh_name:name_end].decode("latin1"),
+                section_type=sh_type,
+                offset=sh_offset,
+                size=sh_size,
+                entsize=sh_entsize,
+            )
+        )
+    return sections, layout
+
+
+def _elf_symtab_has_debugging_symbols(
+    f: BinaryIO, *, symtab: _ElfSection, st_info_offset: int
+) -> bool:
+    """
+    ``nm`` hides file and section symbols unless ``-a`` is passed. This looks for
+    those symbols in an ELF ``.symtab``, in chunks, stopping at the first one found
+    (usually within the first few entries).
+    """
+    if symtab.entsize == 0:
+        return False
+    entries_per_chunk = 4096
+    num_entries = symtab.size // symtab.entsize
+    for first_entry in range(0, num_entries, entries_per_chunk):
+        chunk_entries = min(entries_per_chunk, num_entries - first_entry)
+        chunk = _read_exactly(
+            f,
+            offset=symtab.offset + first_entry * symtab.entsize,
+            num_bytes=chunk_entries * symtab.entsize,
+        )
+        for i in range(chunk_entries):
+            symbol_type = chunk[i * symtab.entsize + st_info_offset] & 0xF
+            if symbol_type in {_ELF_STT_FILE, _ELF_STT_SECTION}:
+                return True
+    return False
+
+
+def _elf_has_debug_symbols(f: BinaryIO) -> tuple[bool, str]:
+    """
+    Look for debug symbols in an ELF file by parsing it directly, instead of by running
+    external tools.
+
+    Returns results in the same form as ``_file_has_debug_symbols()``, where the command
+    is one that, if run on the file, shows the debug symbols found here.
+    """
+    sections, layout = _read_elf_sections(f)
+    section_names = {s.name for s in sections}
+
+    if ".debug_line" in section_names:
+        return True, "objdump --all-headers"
+    if any(name.startswith(".debug_") for name in section_names):
+        return True, "objdump -W"
+    if any(name.startswith(".zdebug_") for name in section_names):
+        return True, "readelf -S"
+
+    # stripped files only have a '.dynsym'... a '.symtab' with file or section symbols in it
+    # means that 'nm -a' shows symbols that 'nm' doesn't
+    for section in sections:
+        if (
+            section.section_type == _ELF_SHT_SYMTAB
+            and _elf_symtab_has_debugging_symbols(
+                f,
+                symtab=section,
+                st_info_offset=layout.st_info_offset,
+            )
+        ):
+            return True, "nm -a"
+
+    return False, _NO_DEBUG_SYMBOLS
+
+
+# references:
+#   * https://github.com/apple-oss-distributions/xnu/blob/main/EXTERNAL_HEADERS/mach-o/loader.h
+#   * https://github.com/apple-oss-distributions/cctools/blob/main/include/mach-o/fat.h
+#   * https://github.com/apple-oss-distributions/cctools/blob/main/include/mach-o/nlist.h
+#   * https://github.com/apple-oss-distributions/cctools/blob/main/include/mach-o/stab.h
+_MACH_O_MAGIC_32 = 0xFEEDFACE
+_MACH_O_MAGIC_64 = 0xFEEDFACF
+_MACH_O_FAT_MAGIC = 0xCAFEBABE
+_MACH_O_FAT_MAGIC_64 = 0xCAFEBABF
+# 0xCAFEBABE is also the magic for Java class files... where a fat binary has its
+# number of architectures, those have a version number (always 45 or greater)
+_MACH_O_MAX_FAT_ARCHES = 30
+_MACH_O_LC_SEGMENT = 0x1
+_MACH_O_LC_SYMTAB = 0x2
+_MACH_O_LC_SEGMENT_64 = 0x19
+_MACH_O_N_STAB = 0xE0
+_MACH_O_N_OSO = 0x66
+
+
+@dataclass(frozen=True)
+class _MachOLayout:
+    """Sizes and struct formats for the pieces of a Mach-O file that pydistcheck reads"""
+
+    header_size: int
+    segment_command: int
+    # format of a 'segment_command' (or 'segment_command_64'), after 'cmd' and 'cmdsize'
+    segment_command_format: str
+    # format of a 'section' (or 'section_64')
+    section_format: str
+    nlist_size: int
+
+
+_MACH_O_LAYOUTS = {
+    _MACH_O_MAGIC_32: _MachOLayout(
+        header_size=28,
+        segment_command=_MACH_O_LC_SEGMENT,
+        segment_command_format="16sIIIIiiII",
+        section_format="16s16sIIIIIIIII",
+        nlist_size=12,
+    ),
+    _MACH_O_MAGIC_64: _MachOLayout(
+        header_size=32,
+        segment_command=_MACH_O_LC_SEGMENT_64,
+        segment_command_format="16sQQQQiiII",
+        section_format="16s16sQQIIIIIIII",
+        nlist_size=16,
+    ),
+}
+
+
+@dataclass
+class _MachOSymbolInfo:
+    # symbolic debugging ('stab') entries in the symbol table, other than the one left
+    # behind by Apple's 'strip'
+    num_stabs: int
+    has_n_oso: bool
+
+
+def _macho_slice_offsets(f: BinaryIO) -> list[int]:
+    """
+    Return the offset of each single-architecture Mach-O image in a file.
+    That's just ``[0]`` for thin binaries, or one offset per architecture for fat binaries.
+    """
+    (magic,) = struct.unpack(">I", _read_exactly(f, offset=0, num_bytes=4))
+    if magic not in {_MACH_O_FAT_MAGIC, _MACH_O_FAT_MAGIC_64}:
+        return [0]
+
+    # fat headers are always big-endian
+    (nfat_arch,) = struct.unpack(">I", _read_exactly(f, offset=4, num_bytes=4))
+    if nfat_arch > _MACH_O_MAX_FAT_ARCHES:
+        msg = f"Too many architectures ({nfat_arch}) for a Mach-O fat binary."
+        raise ValueError(msg)
+    # fields in 'fat_arch': cputype, cpusubtype, offset, size, align
+    # ('fat_arch_64' has 64-bit offset and size, and then 4 reserved bytes)
+    fat_arch_format = ">iiIII" if magic == _MACH_O_FAT_MAGIC else ">iiQQII"
+    fat_arch_size = struct.calcsize(fat_arch_format)
+    raw_arches = _read_exactly(f, offset=8, num_bytes=nfat_arch * fat_arch_size)
+    return [
+        struct.unpack_from(fat_arch_format, raw_arches, i * fat_arch_size)[2]
+        for i in range(nfat_arch)
+    ]
+
+
+def _read_macho_string(f: BinaryIO, *, offset: int, max_length: int = 256) -> bytes:
+    f.seek(offset)
+    raw = f.read(max_length)
+    return raw.split(b"\x00", 1)[0]
+
+
+def _read_macho_slice(
+    f: BinaryIO, *, slice_offset: int
+) -> tuple[list[tuple[str, str]], _MachOSymbolInfo]:
+    """
+    Walk the load commands of a single-architecture Mach-O image.
+
+    Returns a tuple of the form ``(sections, symbol_info)``, where ``sections`` is a list of
+    ``(segment_name, section_name)`` pairs. Raises ``ValueError`` if the image can't be parsed.
+    """
+    raw_magic = _read_exactly(f, offset=slice_offset, num_bytes=4)
+    for byte_order in ("<", ">"):
+        (magic,) = struct.unpack(byte_order + "I", raw_magic)
+        if magic in _MACH_O_LAYOUTS:
+            break
+    else:
+        msg = f"Unrecognized Mach-O magic: {raw_magic!r}"
+        raise ValueError(msg)
+    layout = _MACH_O_LAYOUTS[magic]
+
+    # fields in 'mach_header': magic, cputype, cpusubtype, filetype, ncmds, sizeofcmds, flags
+    _, _, _, _, ncmds, sizeofcmds, _ = struct.unpack(
+        byte_order + "IiiIIII", _read_exactly(f, offset=slice_offset, num_bytes=28)
+    )
+    load_commands = _read_exactly(
+        f, offset=slice_offset + layout.header_size, num_bytes=sizeofcmds
+    )
+
+    segment_command_format = byte_order + layout.segment_command_format
+    section_format = byte_order + layout.section_format
+    section_size = struct.calcsize(section_format)
+    sections: list[tuple[str, str]] = []
+    symtab_commands: list[tuple[int, int, int]] = []
+    cmd_offset = 0
+    for _ in range(ncmds):
+        cmd, cmdsize = struct.unpack_from(byte_order + "II", load_commands, cmd_offset)
+        if cmdsize < 8 or cmd_offset + cmdsize > sizeofcmds:
+            msg = f"Invalid Mach-O load command size ({cmdsize})."
+            raise ValueError(msg)
+        if cmd == layout.segment_command:
+            *_, nsects, _ = struct.unpack_from(
+                segment_command_format, load_commands, cmd_offset + 8
+            )
+            section_offset = cmd_offset + 8 + struct.calcsize(segment_command_format)
+            if section_offset + nsects * section_size > cmd_offset + cmdsize:
+                msg = f"Mach-O segment has more sections ({nsects}) than fit in it."
+                raise ValueError(msg)
+            for i in range(nsects):
+                sectname, segname, *_ = struct.unpack_from(
+                    section_format, load_commands, section_offset + i * section_size
+                )
+                sections.append(
+                    (
+                        segname.rstrip(b"\x00").decode("latin1"),
+                        sectname.rstrip(b"\x00").decode("latin1"),
+                    )
+                )
+        elif cmd == _MACH_O_LC_SYMTAB:
+            # fields in 'symtab_command' after 'cmdsize': symoff, nsyms, stroff, strsize
+            symoff, nsyms, stroff, _ = struct.unpack_from(
+                byte_order + "IIII", load_commands, cmd_offset + 8
+            )
+            symtab_commands.append((symoff, nsyms, stroff))
+        cmd_offset += cmdsize
+
+    symbol_info = _read_macho_symbols(
+        f,
+        slice_offset=slice_offset,
+        byte_order=byte_order,
+        nlist_size=layout.nlist_size,
+        symtab_commands=symtab_commands,
+    )
+    return sections, symbol_info
+
+
+def _read_macho_symbols(
+    f: BinaryIO,
+    *,
+    slice_offset: int,
+    byte_order: str,
+    nlist_size: int,
+    symtab_commands: list[tuple[int, int, int]],
+) -> _MachOSymbolInfo:
+    """
+    Look at the type of every symbol in a Mach-O image's symbol tables,
+    only looking up the names of symbolic debugging ('stab') entries.
+    """
+    num_stabs = 0
+    has_n_oso = False
+    for symoff, nsyms, stroff in symtab_commands:
+        symbols = _read_exactly(
+            f, offset=slice_offset + symoff, num_bytes=nsyms * nlist_size
+        )
+        for i in range(nsyms):
+            # first 2 fields in 'nlist' / 'nlist_64': n_strx, n_type
+            n_strx, n_type = struct.unpack_from(
+                byte_order + "IB", symbols, i * nlist_size
+            )
+            if not n_type & _MACH_O_N_STAB:
+                continue
+            symbol_name = _read_macho_string(f, offset=slice_offset + stroff + n_strx)
+            if symbol_name == _MACHO_STRIP_SYMBOL.encode("ascii"):
+                continue
+            num_stabs += 1
+            has_n_oso = has_n_oso or n_type == _MACH_O_N_OSO
+
+    return _MachOSymbolInfo(num_stabs=num_stabs, has_n_oso=has_n_oso)
+
+
+def _macho_has_debug_symbols(f: BinaryIO) -> tuple[bool, str]:
+    """
+    Look for debug symbols in a Mach-O file (thin or fat) by parsing it directly,
+    instead of by running external tools.
+
+    Returns results in the same form as ``_file_has_debug_symbols()``, where the command
+    is one that, if run on the file, shows the debug symbols found here.
+    """
+    has_dwarf_sections = False
+    num_stabs = 0
+    for slice_offset in _macho_slice_offsets(f):
+        sections, symbol_info = _read_macho_slice(f, slice_offset=slice_offset)
+        # references to object files with debug information, which 'dsymutil' follows
+        if symbol_info.has_n_oso:
+            return True, "dsymutil -s"
+        has_dwarf_sections = has_dwarf_sections or any(
+            segname == "__DWARF" or sectname.startswith("__debug_")
+            for segname, sectname in sections
+        )
+        num_stabs += symbol_info.num_stabs
+
+    if has_dwarf_sections:
+        return True, "llvm-objdump --macho --all-headers"
+    if num_stabs > 0:
+        return True, "nm -a"
+    return False, _NO_DEBUG_SYMBOLS
+
+
+# references:
+#   * https://learn.microsoft.com/en-us/windows/win32/debug/pe-format
+_PE_SIGNATURE = b"PE\x00\x00"
+_PE_SYMBOL_SIZE = 18
+
+
+@dataclass
+class _PESection:
+    name: str
+    virtual_size: int
+    virtual_address: int
+    size_of_raw_data: int
+    pointer_to_raw_data: int
+
+
+@dataclass
+class _PEInfo:
+    sections: list[_PESection]
+    num_coff_symbols: int
+
+
+def _resolve_pe_section_name(
+    raw_name: bytes, *, f: BinaryIO, string_table_offset: Optional[int]
+) -> str:
+    """
+    Section names longer than 8 characters (like MinGW's '.debug_info') are stored
+    as '/<offset into the COFF string table>'.
+    """
+    name = raw_name.rstrip(b"\x00").decode("latin1")
+    if name.startswith("/") and name[1:].isdigit() and string_table_offset is not None:
+        f.seek(string_table_offset + int(name[1:]))
+        return f.read(256).split(b"\x00", 1)[0].decode("latin1")
+    return name
+
+
+def _read_pe_file(f: BinaryIO) -> _PEInfo:
+    """
+    Read the COFF header and section table of a PE file
+    (``.dll``, ``.exe``, ``.pyd``). Raises ``ValueError`` if the file can't be parsed.
+    """
+    dos_header = _read_exactly(f, offset=0, num_bytes=64)
+    if dos_header[:2] not in _DOS_MZ_MAGIC_FIRST_2_BYTES:
+        msg = "Not a PE file."
+        raise ValueError(msg)
+    (e_lfanew,) = struct.unpack_from("<I", dos_header, 0x3C)
+    if _read_exactly(f, offset=e_lfanew, num_bytes=4) != _PE_SIGNATURE:
+        msg = "DOS executable without a PE header."
+        raise ValueError(msg)
+
+    # fields in the COFF file header: Machine, NumberOfSections, TimeDateStamp,
+    # PointerToSymbolTable, NumberOfSymbols, SizeOfOptionalHeader, Characteristics
+    coff_header_offset = e_lfanew + 4
+    (
+        _,
+        num_sections,
+        _,
+        pointer_to_symbol_table,
+        num_symbols,
+        size_of_optional_header,
+        _,
+    ) = struct.unpack(
+        "<HHIIIHH", _read_exactly(f, offset=coff_header_offset, num_bytes=20)
+    )
+    optional_header_offset = coff_header_offset + 20
+
+    # the COFF string table immediately follows the symbol table
+    string_table_offset = None
+    if pointer_to_symbol_table != 0:
+        string_table_offset = pointer_to_symbol_table + num_symbols * _PE_SYMBOL_SIZE
+
+    raw_sections = _read_exactly(
+        f,
+        offset=optional_header_offset + size_of_optional_header,
+        num_bytes=num_sections * 40,
+    )
+    sections = []
+    for i in range(num_sections):
+        # first 5 fields in a section header: Name, VirtualSize, VirtualAddress,
+        # SizeOfRawData, PointerToRawData
+        (
+            raw_name,
+            virtual_size,
+            virtual_address,
+            size_of_raw_data,
+            pointer_to_raw_data,
+        ) = struct.unpack_from("<8sIIII", raw_sections, i * 40)
+        sections.append(
+            _PESection(
+                name=_resolve_pe_section_name(
+                    raw_name, f=f, string_table_offset=string_table_offset
+                ),
+                virtual_size=virtual_size,
+                virtual_address=virtual_address,
+                size_of_raw_data=size_of_raw_data,
+                pointer_to_raw_data=pointer_to_raw_data,
+            )
+        )
+
+    return _PEInfo(
+        sections=sections,
+        num_coff_symbols=num_symbols if pointer_to_symbol_table != 0 else 0,
+    )
+
+
+def _pe_has_debug_symbols(f: BinaryIO) -> tuple[bool, str]:
+    """
+    Look for debug symbols in a PE file by parsing it directly, instead of by running
+    external tools.
+
+    Returns results in the same form as ``_file_has_debug_symbols()``, where the command
+    is one that, if run on the file, shows the debug symbols found here.
+    """
+    pe_info = _read_pe_file(f)
+    section_names = {s.name for s in pe_info.sections}
+
+    # only debug information embedded in the file counts... MSVC's '/DEBUG' also adds a
+    # CodeView entry to the debug directory, but that just points to a separate '.pdb' file
+    # (which usually isn't distributed alongside it)
+    #
+    # DWARF sections (e.g. from MinGW)
+    if ".debug_line" in section_names:
+        return True, "objdump --all-headers"
+    if any(name.startswith(".debug_") for name in section_names):
+        return True, "objdump -W"
+    if pe_info.num_coff_symbols > 0:
+        return True, "nm -a"
+    return False, _NO_DEBUG_SYMBOLS
+
+
+def _native_debug_symbols_check(file_absolute_path: str) -> Optional[tuple[bool, str]]:
+    """
+    Look for debug symbols by parsing a compiled object directly.
+
+    Returns ``None`` if the file is in a format that can't be parsed this way, or if parsing
+    fails for any reason... in those cases, callers should fall back to external tools.
+    """
+    with open(file_absolute_path, "rb") as f:
+        header = f.read(4)
+        try:
+            if header in _ELF_MAGIC_FIRST_4_BYTES:
+                return _elf_has_debug_symbols(f)
+            if header in _MACH_O_MAGIC_FIRST_4_BYTES:
+                return _macho_has_debug_symbols(f)
+            if header[:2] in _DOS_MZ_MAGIC_FIRST_2_BYTES:
+                return _pe_has_debug_symbols(f)
+        except (ValueError, struct.error):
+            return None
+    return None
+
+
+@dataclass(frozen=True)
+class _DebugSymbolsResult:
+    has_debug_symbols: bool
+    # a command that, if run on the file, shows the debug symbols found
+    # (or '_NO_DEBUG_SYMBOLS')
+    command: str
+    # what decided the result... e.g. "built-in ELF parser", the command that found
+    # debug symbols, or the tools that didn't
+    detected_by: str
+
+
+def _detect_debug_symbols(
+    file_absolute_path: str, file_format: Optional[str] = None
+) -> _DebugSymbolsResult:
+    """
+    Like ``_file_has_debug_symbols()``, but also recording how the result was decided.
+    """
+    # parse the file directly if possible... that's much faster than spawning
+    # processes, and works on systems where the tools below aren't installed
+    native_result = _native_debug_symbols_check(file_absolute_path)
+    if native_result is not None:
+        parser_name = (
+            f"built-in {file_format} parser"
+            if file_format in _ANY_FORMAT
+            else "built-in parser"
+        )
+        return _DebugSymbolsResult(*native_result, detected_by=parser_name)
+
     # test with tools that produce debug symbols that can be matched with a regex
-    has_debug_symbols, cmd_str = _look_for_debug_symbols(lib_file=file_absolute_path)
+    has_debug_symbols, cmd_str = _look_for_debug_symbols(
+        lib_file=file_absolute_path, file_format=file_format
+    )
     if has_debug_symbols:
-        return True, cmd_str
+        return _DebugSymbolsResult(True, cmd_str, detected_by=cmd_str)
 
     # "nm"'s test is like "check if the output is different when a flag is supplied",
     # instead of "test if this tool produces output matching this regex",
     # so it runs separately here
-    for nm_tool in ["nm", "llvm-nm"]:
+    for nm_tool in _NM_TOOLS:
+        if not _tool_is_available(nm_tool):
+            continue
         has_debug_symbols, cmd_str = _nm_reports_debug_symbols(
             tool_name=nm_tool,
             lib_file=file_absolute_path,
         )
         if has_debug_symbols:  # pragma: no cover
-            return True, cmd_str
+            return _DebugSymbolsResult(True, cmd_str, detected_by=cmd_str)
 
     # at this point, none of the checks found debug symbols
-    return False, cmd_str
+    tools_str = ", ".join(_debug_symbol_tools(file_format=file_format))
+    return _DebugSymbolsResult(
+        False, _NO_DEBUG_SYMBOLS, detected_by=tools_str or "no tools available"
+    )
+
+
+def _file_has_debug_symbols(
+    file_absolute_path: str, file_format: Optional[str] = None
+) -> tuple[bool, str]:
+    """
+    ``file_format`` should be one of the values in ``_FileFormat``. If provided,
+    only tools that understand that format are tried.
+    """
+    result = _detect_debug_symbols(file_absolute_path, file_format=file_format)
+    return result.has_debug_symbols, result.command
@@ -0,0 +1,275 @@
+"""
+Estimating the total uncompressed size of a distribution's files from metadata stored
+alongside them, without decompressing the files themselves.
+"""
+
+import json
+import os
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Any, Optional
+
+from ._decompression import (
+    _Compression,
+    _DecompressionBackend,
+    _open_decompressed_stream,
+)
+from ._file_utils import _ArchiveFormat, _is_stream, _open_distribution
+
+_GZIP_MAGIC = b"\x1f\x8b"
+# fixed-size part of a gzip member header: magic, compression method, flags,
+# modification time, extra flags, OS
+_GZIP_HEADER_BYTES = 10
+_GZIP_FLAG_FHCRC = 0x02
+_GZIP_FLAG_FEXTRA = 0x04
+_GZIP_FLAG_FNAME = 0x08
+_GZIP_FLAG_FCOMMENT = 0x10
+# 'extra' subfield written by BGZF ('bgzip', 'htslib'), which splits files into
+# many small gzip members
+_BGZF_SUBFIELD_ID = b"BC"
+# the last 8 bytes of a gzip member are CRC32 and ISIZE, the length of the
+# uncompressed data modulo 2^32 (little-endian)
+_GZIP_TRAILER_BYTES = 8
+_ISIZE_BYTES = 4
+_ISIZE_MODULUS = 2**32
+
+# deflate can't shrink data by more than a factor of about 1032 (a 258-byte match
+# coded in as little as 2 bits)... and can't grow it by more than 5 bytes per
+# 65535-byte stored block
+_MAX_DEFLATE_RATIO = 1032
+_STORED_BLOCK_BYTES = 65535
+_STORED_BLOCK_OVERHEAD_BYTES = 5
+
+# ISIZE wraps around for tar files of 4 GiB or more. Source distributions rarely compress
+# by more than about 10x... so a wrap is only treated as plausible if it would need
+# less than this ratio. Anything past it would need most of the archive to be long runs
+# of repeated bytes.
+_MAX_PLAUSIBLE_COMPRESSION_RATIO = 100
+
+# tar files are made of 512-byte blocks
+_TAR_BLOCK_BYTES = 512
+
+_CONDA_INFO_DIR = "info/"
+_CONDA_PATHS_JSON = "info/paths.json"
+
+
+@dataclass
+class _SizeEstimate:
+    size_bytes: int
+    # where the estimate came from, e.g. "the gzip trailer"
+    source: str
+    # if True, the total size of files is at most 'size_bytes' (but might be much less)...
+    # otherwise, it's expected to be exactly 'size_bytes'
+    is_upper_bound: bool
+
+
+def _gzip_header_size(f: IO[bytes]) -> Optional[int]:
+    """
+    Size of the header of the gzip member at the start of ``f``... or ``None`` if it
+    isn't a gzip member, or is a BGZF block (the first of many members).
+    """
+    header = f.read(_GZIP_HEADER_BYTES)
+    if len(header) < _GZIP_HEADER_BYTES or not header.startswith(_GZIP_MAGIC):
+        return None
+    flags = header[3]
+    if flags & _GZIP_FLAG_FEXTRA:
+        extra_length = int.from_bytes(f.read(2), "little")
+        extra = f.read(extra_length)
+        # subfields are a 2-byte ID, a 2-byte length, and then the data
+        offset = 0
+        while offset + 4 <= len(extra):
+            if extra[offset : offset + 2] == _BGZF_SUBFIELD_ID:
+                return None
+            offset += 4 + int.from_bytes(extra[offset + 2 : offset + 4], "little")
+    for flag in (_GZIP_FLAG_FNAME, _GZIP_FLAG_FCOMMENT):
+        if flags & flag:
+            # zero-terminated
+            while f.read(1) not in (b"\x00", b""):
+                pass
+    if flags & _GZIP_FLAG_FHCRC:
+        f.read(2)
+    return f.tell()
+
+
+def _estimate_from_gzip_trailer(f: IO[bytes]) -> Optional[_SizeEstimate]:
+    """
+    The uncompressed length of a gzip-compressed tar file, from its ISIZE trailer.
+
+    That's an upper bound on the total size of its files (it also includes tar
+    headers and padding). It assumes the file has only one gzip member, which is what
+    ``tar``, ``gzip``, ``pigz``, and Python's ``tarfile`` all write.
+
+    ISIZE only describes the last member, so ``None`` is returned if it doesn't look like
+    the length of the whole file: BGZF files, lengths that aren't a whole number of tar
+    blocks, and lengths too small for the compressed size (e.g. ``cat``-ed gzip files).
+    ``None`` is also returned if the length could plausibly have wrapped around 2^32
+    (see ``_MAX_PLAUSIBLE_COMPRESSION_RATIO``), since there's then no way to know how
+    many times it did.
+    """
+    header_size = _gzip_header_size(f)
+    if header_size is None:
+        return None
+    compressed_size = f.seek(0, os.SEEK_END)
+    deflate_size = compressed_size - header_size - _GZIP_TRAILER_BYTES
+    if deflate_size <= 0:
+        return None
+    f.seek(-_ISIZE_BYTES, os.SEEK_END)
+    isize = int.from_bytes(f.read(_ISIZE_BYTES), "little")
+
+    # 2^32 is a multiple of 512, so this holds even if ISIZE wrapped around
+    if isize == 0 or isize % _TAR_BLOCK_BYTES != 0:
+        return None
+    max_stored_size = isize + _STORED_BLOCK_OVERHEAD_BYTES * (
+        isize // _STORED_BLOCK_BYTES + 1
+    )
+    if not max_stored_size >= deflate_size >= isize / _MAX_DEFLATE_RATIO:
+        return None
+    if deflate_size * _MAX_PLAUSIBLE_COMPRESSION_RATIO >= isize + _ISIZE_MODULUS:
+        return None
+    return _SizeEstimate(
+        size_bytes=isize, source="the gzip trailer", is_upper_bound=True
+    )
+
+
+def _estimate_from_zip_central_directory(f: IO[bytes]) -> _SizeEstimate:
+    with zipfile.ZipFile(f, mode="r") as zf:
+        size_bytes = sum(
+            zip_info.file_size for zip_info in zf.infolist() if not zip_info.is_dir()
+        )
+    return _SizeEstimate(
+        size_bytes=size_bytes,
+        source="the zip central directory",
+        is_upper_bound=False,
+    )
+
+
+def _size_of_conda_package_files(paths_json: bytes) -> Optional[int]:
+    """
+    Total size of the regular files listed in a conda package's ``info/paths.json``.
+    ``None`` if any of them doesn't have ``size_in_bytes`` (it's optional).
+    """
+    try:
+        paths: list[dict[str, Any]] = json.loads(paths_json)["paths"]
+    except (KeyError, TypeError, ValueError):
+        return None
+    size_bytes = 0
+    for path in paths:
+        # symbolic links and directories aren't files in the package's tarballs
+        if path.get("path_type", "hardlink") != "hardlink":
+            continue
+        if not isinstance(path.get("size_in_bytes"), int):
+            return None
+        size_bytes += path["size_in_bytes"]
+    return size_bytes
+
+
+def _size_of_conda_info_files(tf: tarfile.TarFile) -> Optional[int]:
+    """
+    Read a streaming tarfile up to the end of the ``info/`` directory, and return
+    the total size of files in it plus the size of the files listed in ``info/paths.json``.
+    """
+    size_bytes = 0
+    package_files_size_bytes = None
+    for tar_info in tf:
+        if not tar_info.name.startswith(_CONDA_INFO_DIR):
+            break
+        if not tar_info.isfile():
+            continue
+        size_bytes += tar_info.size
+        if tar_info.name == _CONDA_PATHS_JSON:
+            paths_json = tf.extractfile(tar_info)
+            if paths_json is not None:
+                package_files_size_bytes = _size_of_conda_package_files(
+                    paths_json.read()
+                )
+    if package_files_size_bytes is None:
+        return None
+    return size_bytes + package_files_size_bytes
+
+
+def _estimate_from_conda_paths_json(
+    f: IO[bytes], *, archive_format: str, decompression_backend: str
+) -> Optional[_SizeEstimate]:
+    """
+    The size of a conda package's files, from ``info/paths.json``.
+
+    For ``.conda`` files, only the small ``info-*.tar.zst`` member is decompressed.
+    ``.tar.bz2`` conda packages put ``info/`` first, so only the start of the tarball is
+    decompressed... anything else that's compressed with bzip2 stops at its first file.
+    """
+    if archive_format == _ArchiveFormat.BZIP2_TAR:
+        with (
+            _open_decompressed_stream(
+                f, compression=_Compression.BZIP2, backend=decompression_backend
+            ) as decompressed,
+            tarfile.open(fileobj=decompressed, mode="r|") as tf,
+        ):
+            size_bytes = _size_of_conda_info_files(tf)
+    else:
+        size_bytes = None
+        with zipfile.ZipFile(f, mode="r") as zf:
+            other_files_size_bytes = 0
+            for zip_info in zf.infolist():
+                name = os.path.basename(zip_info.filename).lower()
+                if zip_info.is_dir():
+                    continue
+                if not name.endswith("tar.zst"):
+                    other_files_size_bytes += zip_info.file_size
+                    continue
+                # the contents of 'pkg-*.tar.zst' are what 'info/paths.json' describes
+                if not name.startswith("info-"):
+                    continue
+                with (
+                    zf.open(zip_info, mode="r") as compressed,
+                    _open_decompressed_stream(
+                        compressed,
+                        compression=_Compression.ZSTD,
+                        backend=decompression_backend,
+                    ) as decompressed,
+                    tarfile.open(fileobj=decompressed, mode="r|") as tf,
+                ):
+                    size_bytes = _size_of_conda_info_files(tf)
+        if size_bytes is not None:
+            size_bytes += other_files_size_bytes
+    if size_bytes is None:
+        return None
+    return _SizeEstimate(
+        size_bytes=size_bytes,
+        source=_CONDA_PATHS_JSON,
+        is_upper_bound=False,
+    )
+
+
+def _estimate_uncompressed_size(
+    filename: str,
+    *,
+    decompression_backend: str = _DecompressionBackend.AUTO,
+) -> Optional[_SizeEstimate]:
+    """
+    Estimate the total uncompressed size of files in the distribution ``filename``,
+    reading only metadata... a few bytes at the end of gzip files, the central directory
+    of zip files, or the ``info/`` directory of conda packages.
+
+    Returns ``None`` if there's no way to do that cheaply (e.g. for ``.tar.zst`` files,
+    or for streams like standard input, which can only be read once). Raises ``ValueError``
+    for files that aren't in a supported format, like ``_DistributionSummary.from_file()``.
+    """
+    if _is_stream(filename):
+        return None
+    with _open_distribution(filename) as (archive_format, distro_file):
+        try:
+            if archive_format == _ArchiveFormat.GZIP_TAR:
+                return _estimate_from_gzip_trailer(distro_file)
+            if archive_format == _ArchiveFormat.ZIP:
+                return _estimate_from_zip_central_directory(distro_file)
+            if archive_format in (_ArchiveFormat.BZIP2_TAR, _ArchiveFormat.CONDA):
+                return _estimate_from_conda_paths_json(
+                    distro_file,
+                    archive_format=archive_format,
+                    decompression_backend=decompression_backend,
+                )
+        # corrupt or truncated files are left for the full read to report
+        except (EOFError, OSError, tarfile.TarError, zipfile.BadZipFile):
+            return None
+    return None
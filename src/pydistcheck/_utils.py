@@ -3,7 +3,10 @@ miscellaneous helper classes and functions that are
 not specific to package distributions
 """
 
+import fnmatch
 import re
+from collections import defaultdict
+from collections.abc import Sequence
 
 # references:
 #
@@ -99,3 +102,80 @@ class _FileSize:
 
     def __str__(self) -> str:
         return self.to_string(precision=3, unit_str="auto")
+
+
+# characters with special meaning in 'fnmatch' patterns
+_WILDCARD_CHARS = frozenset("*?[")
+
+
+class _PatternIndex:
+    """
+    Match paths against many ``fnmatch``-style patterns at once, with the same results
+    as calling ``fnmatch.fnmatchcase()`` with each of them.
+
+    Patterns are compiled once, and sorted by kind:
+
+    * no wildcards (e.g. ``pkg/setup.py``): looked up by the whole path
+    * ``*/{name}`` (e.g. ``*/.DS_Store``): looked up by the path's last component
+    * ``*{suffix}`` (e.g. ``*.pyc``): looked up by the path's last few characters,
+      once per distinct suffix length
+    * everything else: combined into 1 regex, which rules out most paths in a single
+      match... only paths it matches are checked against each pattern's own regex
+
+    Matches are reported by position in ``patterns``, so a pattern that appears more
+    than once matches once for each time it appears.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._exact: defaultdict[str, list[int]] = defaultdict(list)
+        self._basenames: defaultdict[str, list[int]] = defaultdict(list)
+        self._suffixes_by_length: dict[int, defaultdict[str, list[int]]] = {}
+        self._regexes: list[tuple[int, re.Pattern[str]]] = []
+        for i, pattern in enumerate(self.patterns):
+            suffix = pattern[1:]
+            if not _WILDCARD_CHARS.intersection(pattern):
+                self._exact[pattern].append(i)
+            elif (
+                pattern.startswith("*")
+                and suffix
+                and not _WILDCARD_CHARS.intersection(suffix)
+            ):
+                if suffix.startswith("/") and "/" not in suffix[1:]:
+                    self._basenames[suffix[1:]].append(i)
+                else:
+                    self._suffixes_by_length.setdefault(len(suffix), defaultdict(list))[
+                        suffix
+                    ].append(i)
+            else:
+                self._regexes.append((i, re.compile(fnmatch.translate(pattern))))
+        self._combined_regex = None
+        if self._regexes:
+            self._combined_regex = re.compile(
+                "|".join(f"(?:{regex.pattern})" for _, regex in self._regexes)
+            )
+
+    def match(self, path: str) -> list[int]:
+        """
+        Positions in ``patterns`` of every pattern that matches ``path``, in order.
+        """
+        out = list(self._exact.get(path, ()))
+        _, slash, basename = path.rpartition("/")
+        if slash:
+            out += self._basenames.get(basename, ())
+        for length, suffixes in self._suffixes_by_length.items():
+            out += suffixes.get(path[-length:], ())
+        if self._combined_regex is not None and self._combined_regex.match(path):
+            out += [i for i, regex in self._regexes if regex.match(path)]
+        return sorted(out)
+
+    def match_directory(self, path: str) -> list[int]:
+        """
+        Like ``match()``, but for directories. Some archive formats have a trailing "/"
+        on directory names and some do not, so a pattern also matches a directory
+        if it matches the name without that "/".
+        """
+        out = self.match(path)
+        if path.endswith("/"):
+            out = sorted(set(out).union(self.match(path[:-1])))
+        return out
@@ -2,16 +2,25 @@
 CLI entrypoints
 """
 
+import io
+import os
 import sys
-from typing import TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Optional, Union
 
 import click
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterator, Sequence
 
+from . import __version__
+from ._cache import _DirectoryCache, _sha256_of_distribution, _sha256_of_json
 from ._checks import (
     ALL_CHECKS,
+    _CheckProtocol,
     _CompiledObjectsDebugSymbolCheck,
     _DistroTooLargeCompressedCheck,
     _DistroTooLargeUnCompressedCheck,
@@ -22,10 +31,27 @@ from ._checks import (
     _NonAsciiCharacterCheck,
     _PathTooLongCheck,
     _SpacesInPathCheck,
+    _LimitExceededError,
+    _StreamingChecksObserver,
     _UnexpectedFilesCheck,
+    _reason_check_cannot_run,
 )
 from ._config import _Config
-from ._distribution_summary import _DistributionSummary
+from ._decompression import (
+    _ALL_DECOMPRESSION_BACKENDS,
+    _archive_read_errors,
+    _benchmark_decompression,
+    _choose_backend,
+    _raise_if_backend_is_unavailable,
+)
+from ._distribution_summary import (
+    _DataTier,
+    _DistributionSummary,
+    _load_or_build_summary,
+)
+from ._file_utils import _guess_archive_format, _is_stream
+from ._remote import _is_url, _RemoteFileError
+from ._size_estimate import _estimate_uncompressed_size, _SizeEstimate
 from ._utils import _FileSize
 
 
@@ -33,12 +59,437 @@ class ExitCodes:
     OK = 0
     CHECK_ERRORS = 1
     UNSUPPORTED_FILE_TYPE = 2
+    REMOTE_FILE_ERROR = 3
+
+
+class _DistributionPathType(click.Path):
+    """
+    Like ``click.Path(exists=True, allow_dash=True)``, but also accepting http(s) URLs.
+    """
+
+    name = "distribution"
+
+    def __init__(self) -> None:
+        super().__init__(exists=True, allow_dash=True)
+
+    def convert(
+        self,
+        value: "Union[str, os.PathLike[str]]",
+        param: Optional[click.Parameter],
+        ctx: Optional[click.Context],
+    ) -> str:
+        if isinstance(value, str) and _is_url(value):
+            return value
+        return str(super().convert(value, param, ctx))
+
+
+@dataclass
+class _DistributionCheckResult:
+    output: str
+    num_errors: int
+    unsupported_file_type: bool
+    # a distribution at an http(s) URL couldn't be downloaded
+    remote_file_error: bool
+
+
+# cached lists of check failures for whole distributions
+_CHECK_RESULTS_CACHE_NAMESPACE = "check-results"
+
+
+def _check_results_cache_key(*, filepath: str, conf: _Config) -> str:
+    """
+    Key identifying everything that can change the results of checking ``filepath``...
+    its format and exact contents, the effective configuration, and the version of ``pydistcheck``.
+    """
+    return _sha256_of_json(
+        {
+            "archive_format": _guess_archive_format(filepath),
+            "config": conf.check_result_settings(),
+            "file_sha256": _sha256_of_distribution(filepath),
+            "pydistcheck_version": __version__,
+        }
+    )
+
+
+def _required_data_tier(*, checks: "Sequence[_CheckProtocol]", conf: _Config) -> int:
+    """
+    How much of a distribution has to be read for the selected checks (and ``--inspect``).
+    """
+    data_tier = max(
+        (this_check.data_tier for this_check in checks), default=_DataTier.NONE
+    )
+    if conf.inspect:
+        from ._inspect import INSPECT_DATA_TIER
+
+        data_tier = max(data_tier, INSPECT_DATA_TIER)
+    return data_tier
+
+
+def _check_size_estimate(
+    filepath: str, *, checks: "Sequence[_CheckProtocol]", conf: _Config
+) -> Optional[tuple[_SizeEstimate, _DistroTooLargeUnCompressedCheck, list[str]]]:
+    """
+    Try to run ``distro-too-large-uncompressed`` against an estimate of the uncompressed
+    size (see ``_estimate_uncompressed_size()``), instead of reading every file.
+
+    Returns the estimate, the check it answered, and that check's errors... or ``None`` if
+    that isn't possible or wouldn't save any work (e.g. because another selected check
+    needs the size of every file anyway).
+    """
+    size_checks = [c for c in checks if isinstance(c, _DistroTooLargeUnCompressedCheck)]
+    if not size_checks:
+        return None
+    other_checks = [c for c in checks if c not in size_checks]
+    if _required_data_tier(checks=other_checks, conf=conf) >= _DataTier.SIZES:
+        return None
+    estimate = _estimate_uncompressed_size(
+        filepath, decompression_backend=conf.decompression_backend
+    )
+    if estimate is None:
+        return None
+    errors = size_checks[0].check_estimate(estimate)
+    if errors is None:
+        return None
+    return estimate, size_checks[0], errors
+
+
+def _check_before_reading(
+    filepath: str, *, checks: "Sequence[_CheckProtocol]"
+) -> list[str]:
+    """
+    For ``--fail-fast``... run the checks that only need the distribution file itself
+    (like ``distro-too-large-compressed``), without opening it. Streams are skipped,
+    since their size isn't known until all of them have been read.
+    """
+    checks = [c for c in checks if c.data_tier == _DataTier.NONE]
+    if not checks or _is_stream(filepath):
+        return []
+    summary = _DistributionSummary.from_file(filepath, data_tier=_DataTier.NONE)
+    errors: list[str] = []
+    for this_check in checks:
+        errors += this_check(distro_summary=summary)
+    return errors
+
+
+def _print_size_estimate(
+    estimate: _SizeEstimate, *, check_name: str, conf: _Config
+) -> None:
+    size_str = _FileSize(num=estimate.size_bytes, unit_str="B").to_string(
+        precision=conf.output_file_size_precision,
+        unit_str=conf.output_file_size_unit,
+    )
+    bound = "at most " if estimate.is_upper_bound else ""
+    print(
+        f"estimated uncompressed size for '{check_name}': "
+        f"{bound}{size_str} (from {estimate.source})"
+    )
+
+
+def _debug_symbols_detected_by(
+    checks: "Sequence[_CheckProtocol]",
+    *,
+    checks_run: "Sequence[_CheckProtocol]",
+    summary: _DistributionSummary,
+) -> Optional[dict[str, str]]:
+    """
+    How debug symbols were detected in each compiled object, for ``--inspect``... from
+    ``compiled-objects-have-debug-symbols`` if it ran, otherwise (e.g. if check results came
+    from the cache) from the results for each compiled object cached by previous runs.
+    """
+    for this_check in checks:
+        if not isinstance(this_check, _CompiledObjectsDebugSymbolCheck):
+            continue
+        if this_check in checks_run:
+            return this_check.detected_by
+        return this_check.cached_detected_by(summary)
+    return None
+
+
+def _check_distribution(  # noqa: PLR0913
+    filepath: str,
+    *,
+    checks: "Sequence[_CheckProtocol]",
+    conf: _Config,
+    cache: Optional[_DirectoryCache],
+    manifest: bool = False,
+    jobs: int = 1,
+    estimate_sizes: bool = False,
+    fail_fast: bool = False,
+) -> _DistributionCheckResult:
+    """
+    Summarize and check one distribution, capturing everything it would
+    print so results from different distributions can't interleave.
+
+    If ``cache`` is provided, check results from a previous run with identical file contents
+    and configuration are reused... and if ``--inspect`` wasn't passed, the distribution
+    isn't even opened. Results for distributions at http(s) URLs aren't cached, since that
+    would require downloading all of them to compute a digest... and neither are results
+    for streams like standard input, which can only be read once.
+
+    If ``manifest`` is ``True``, ``filepath`` is a listing of the distribution's contents
+    instead of the distribution itself. Checks which need information that listing doesn't
+    have are skipped, and nothing is cached.
+
+    ``jobs`` is the number of threads available for reading this one distribution.
+
+    If ``estimate_sizes`` is ``True``, ``distro-too-large-uncompressed`` is checked against an
+    estimate of the uncompressed size when that's enough to decide the result (see
+    ``_check_size_estimate()``). Those results aren't cached.
+
+    If ``fail_fast`` is ``True``, reading stops as soon as any check is certain to fail...
+    checks that only need the size of the distribution file run before it's opened, and
+    limits on the number and total size of files are checked as each file is read (see
+    ``_FailFastObserver``). Only the errors found up to that point are reported, and
+    they aren't cached.
+    """
+    num_errors = 0
+    unsupported_file_type = False
+    remote_file_error = False
+    with io.StringIO() as buf, redirect_stdout(buf):
+        print(f"\nchecking '{filepath}'")
+
+        # only read as much of the distribution as the selected checks need
+        data_tier = _required_data_tier(checks=checks, conf=conf)
+
+        cache_key: Optional[str] = None
+        cached_errors: Optional[list[str]] = None
+        summary: Optional[_DistributionSummary] = None
+        estimated = None
+        # '--fail-fast' stopped before reading all of the distribution, because of
+        # 'fail_fast_errors' (or errors from the size estimate)
+        stopped_early = False
+        fail_fast_errors: list[str] = []
+        try:
+            try:
+                if estimate_sizes and not manifest:
+                    estimated = _check_size_estimate(filepath, checks=checks, conf=conf)
+                if estimated is not None:
+                    checks = [c for c in checks if c is not estimated[1]]
+                    data_tier = _required_data_tier(checks=checks, conf=conf)
+                elif manifest:
+                    summary = _DistributionSummary.from_manifest(filepath)
+                elif (
+                    cache is not None
+                    and not _is_url(filepath)
+                    and not _is_stream(filepath)
+                ):
+                    cache_key = _check_results_cache_key(filepath=filepath, conf=conf)
+                    cached = cache.get(
+                        namespace=_CHECK_RESULTS_CACHE_NAMESPACE, key=cache_key
+                    )
+                    if cached is not None:
+                        cached_errors = [str(e) for e in cached["errors"]]
+                if fail_fast and summary is None and cached_errors is None:
+                    estimate_failed = estimated is not None and bool(estimated[2])
+                    if not estimate_failed:
+                        fail_fast_errors = _check_before_reading(
+                            filepath, checks=checks
+                        )
+                    stopped_early = estimate_failed or bool(fail_fast_errors)
+                # checks that look at one file at a time run on each one as it's read
+                observer = _StreamingChecksObserver(checks, fail_fast=fail_fast)
+                if (
+                    summary is None
+                    and not stopped_early
+                    and (cached_errors is None or conf.inspect)
+                ):
+                    try:
+                        summary = _load_or_build_summary(
+                            filepath,
+                            data_tier=data_tier,
+                            cache=cache,
+                            jobs=jobs,
+                            decompression_backend=conf.decompression_backend,
+                            member_observer=observer,
+                        )
+                    except _LimitExceededError as err:
+                        fail_fast_errors = err.errors
+                        stopped_early = True
+            except _RemoteFileError as err:
+                print(f"error: failed to read remote distribution. {err}")
+                remote_file_error = True
+            except ValueError as err:
+                print(f"error: {err}")
+                unsupported_file_type = True
+            except _archive_read_errors() as err:
+                # e.g. a truncated .tar.gz, which only fails once decompression reaches the end
+                print(f"error: {filepath}: could not read archive ({err})")
+                unsupported_file_type = True
+            else:
+                errors: list[str] = []
+                if estimated is not None:
+                    errors += estimated[2]
+                if cached_errors is not None:
+                    errors = cached_errors
+                elif stopped_early:
+                    errors += fail_fast_errors
+                # checks run before anything is printed, so '--inspect' can report
+                # how debug symbols were detected in each compiled object
+                skipped_checks: list[str] = []
+                checks_run: list[_CheckProtocol] = []
+                if cached_errors is None and not stopped_early and summary is not None:
+                    for this_check in checks:
+                        reason = _reason_check_cannot_run(
+                            check=this_check, distro_summary=summary
+                        )
+                        if reason is not None:
+                            skipped_checks.append(
+                                f"skipped '{this_check.check_name}' ({reason})"
+                            )
+                            continue
+                        errors += observer.run_check(this_check, distro_summary=summary)
+                        checks_run.append(this_check)
+                    if cache is not None and cache_key is not None:
+                        cache.put(
+                            namespace=_CHECK_RESULTS_CACHE_NAMESPACE,
+                            key=cache_key,
+                            value={"errors": errors},
+                        )
+
+                if summary is not None and conf.inspect:
+                    from ._inspect import inspect_distribution
+
+                    print("----- package inspection summary -----")
+                    if summary.data_tier < data_tier:
+                        print(
+                            "(based on a listing of the distribution's contents, "
+                            "so some details are unknown)"
+                        )
+                    inspect_distribution(
+                        summary=summary,
+                        config=conf,
+                        debug_symbols_detected_by=_debug_symbols_detected_by(
+                            checks, checks_run=checks_run, summary=summary
+                        ),
+                    )
+
+                print("------------ check results -----------")
+                if estimated is not None:
+                    estimate, size_check, _ = estimated
+                    _print_size_estimate(
+                        estimate, check_name=size_check.check_name, conf=conf
+                    )
+                if cached_errors is not None:
+                    print(
+                        "(using cached results from a previous run with identical "
+                        "file contents and configuration)"
+                    )
+                elif stopped_early:
+                    print(
+                        "(stopped early because of '--fail-fast'... "
+                        "other checks might also have failed)"
+                    )
+                for skipped_msg in skipped_checks:
+                    print(skipped_msg)
+
+                for i, error_msg in enumerate(sorted(errors)):
+                    print(f"{i + 1}. {error_msg}")
+
+                num_errors = len(errors)
+                print(f"errors found while checking: {num_errors}")
+        finally:
+            # files captured while building the summary (e.g. compiled objects that didn't
+            # fit in memory) are removed whichever way it was used... including for --inspect
+            # when check results came from the cache
+            if summary is not None:
+                summary.compiled_object_contents.cleanup()
+
+        output = buf.getvalue()
+
+    return _DistributionCheckResult(
+        output=output,
+        num_errors=num_errors,
+        unsupported_file_type=unsupported_file_type,
+        remote_file_error=remote_file_error,
+    )
+
+
+def _check_distributions(  # noqa: PLR0913
+    *,
+    filepaths: "Sequence[str]",
+    checks: "Sequence[_CheckProtocol]",
+    conf: _Config,
+    cache: Optional[_DirectoryCache],
+    manifest: bool,
+    num_workers: int,
+    jobs_per_distribution: int = 1,
+    estimate_sizes: bool = False,
+    fail_fast: bool = False,
+) -> "Iterator[_DistributionCheckResult]":
+    """
+    Yield results in the same order as ``filepaths``.
+
+    With more than 1 worker, distributions are checked in separate processes...
+    decompressing gzip archives is CPU-bound, so threads would just contend
+    for the GIL.
+    """
+    if num_workers == 1:
+        for filepath in filepaths:
+            yield _check_distribution(
+                filepath,
+                checks=checks,
+                conf=conf,
+                cache=cache,
+                manifest=manifest,
+                jobs=jobs_per_distribution,
+                estimate_sizes=estimate_sizes,
+                fail_fast=fail_fast,
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        try:
+            yield from executor.map(
+                partial(
+                    _check_distribution,
+                    checks=checks,
+                    conf=conf,
+                    cache=cache,
+                    manifest=manifest,
+                    jobs=jobs_per_distribution,
+                    estimate_sizes=estimate_sizes,
+                    fail_fast=fail_fast,
+                ),
+                filepaths,
+            )
+        finally:
+            # don't keep checking other distributions if the caller stopped early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _print_decompression_benchmark(filepath: str, *, jobs: int) -> None:
+    num_runs = 3
+    print(f"\nbenchmarking decompression of '{filepath}'")
+    try:
+        compression, results = _benchmark_decompression(
+            filepath, jobs=jobs, num_runs=num_runs
+        )
+    except _RemoteFileError as err:
+        print(f"error: failed to read remote distribution. {err}")
+        sys.exit(ExitCodes.REMOTE_FILE_ERROR)
+    except ValueError as err:
+        print(f"error: {err}")
+        sys.exit(ExitCodes.UNSUPPORTED_FILE_TYPE)
+
+    print(f"compression: {compression} (fastest of {num_runs} runs)")
+    width = max(len(b) for b in _ALL_DECOMPRESSION_BACKENDS)
+    for result in results:
+        if result.seconds is None:
+            print(f"  {result.backend:<{width}}  not available")
+            continue
+        mib_per_second = result.uncompressed_size_bytes / result.seconds / 1024**2
+        print(
+            f"  {result.backend:<{width}}  {result.seconds:.3f}s"
+            f"  ({mib_per_second:.1f} MiB/s decompressed)"
+        )
+    auto_backend = _choose_backend(compression=compression, backend="auto")
+    print(f"'auto' uses: {auto_backend}")
 
 
 @click.command()
 @click.argument(
     "filepaths",
-    type=click.Path(exists=True),
+    type=_DistributionPathType(),
     nargs=-1,
 )
 @click.option(
@@ -87,6 +538,111 @@ class ExitCodes:
         "Print a summary of the distribution, like its total size and largest files."
     ),
 )
+@click.option(
+    "--jobs",
+    default=_Config.jobs,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help=(
+        "Maximum amount of work to do at the same time. "
+        "Multiple distributions are checked in parallel processes, compiled objects "
+        "in each distribution are checked for debug symbols in parallel, and blocks of "
+        ".tar.bz2 files are decompressed in parallel."
+    ),
+)
+@click.option(
+    "--decompression-backend",
+    default=_Config.decompression_backend,
+    show_default=True,
+    type=str,
+    help=(
+        "Decompressor to use for gzip, bzip2, and zstd-compressed distributions. "
+        "'auto' uses the fastest one available. Backends only apply to the formats they "
+        "support, everything else is decompressed with 'python'. Supported values:\n"
+        "  - auto\n"
+        "  - isal = 'isal' library (gzip)\n"
+        "  - lbzip2 = 'lbzip2' program (bzip2)\n"
+        "  - pigz = 'pigz' program (gzip)\n"
+        "  - python = modules that come with Python, or 'zstandard' for zstd\n"
+        "  - zlib-ng = 'zlib-ng' library (gzip)\n"
+        "  - zstd = 'zstd' program (zstd)"
+    ),
+)
+@click.option(
+    "--benchmark-decompression",
+    is_flag=True,
+    show_default=False,
+    default=False,
+    help=(
+        "Instead of running checks, time decompressing each FILEPATH with every "
+        "decompression backend that supports its format, and exit."
+    ),
+)
+@click.option(
+    "--cache-dir",
+    default=_Config.cache_dir,
+    show_default=False,
+    type=str,
+    help=(
+        "Directory to cache results in, so work can be skipped on later runs "
+        "(for example, checking the same compiled object for debug symbols). "
+        "If not provided, nothing is cached."
+    ),
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    show_default=False,
+    default=False,
+    help="Don't read from or write to the cache for this run, even if a cache directory is configured.",
+)
+@click.option(
+    "--cache-max-size",
+    default=_Config.cache_max_size,
+    show_default=True,
+    type=str,
+    help=(
+        "If the cache grows larger than this size, the least-recently-used entries are removed. "
+        "See the list of valid units for '--max-allowed-size-compressed'."
+    ),
+)
+@click.option(
+    "--manifest",
+    is_flag=True,
+    show_default=False,
+    default=False,
+    help=(
+        "Treat each FILEPATH as a listing of a distribution's contents, instead of the "
+        "distribution itself. Supported formats: NDJSON with one object per member "
+        '(like \'{"name": "pkg/__init__.py", "size": 10}\'), output of \'unzip -Z\', '
+        "and output of 'tar -tv'. Checks which need file contents are skipped. "
+        "Pass '-' to read a manifest from standard input."
+    ),
+)
+@click.option(
+    "--estimate-sizes",
+    is_flag=True,
+    show_default=False,
+    default=False,
+    help=(
+        "Check 'distro-too-large-uncompressed' against the uncompressed size recorded in "
+        "archive metadata (the gzip trailer, the zip central directory, or conda's "
+        "'info/paths.json') instead of reading every file, whenever that's enough to decide "
+        "the result. Only has an effect if no other selected check needs file sizes."
+    ),
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    show_default=False,
+    default=False,
+    help=(
+        "Stop reading a distribution as soon as any check is certain to fail, and report "
+        "only the errors found up to that point. 'distro-too-large-compressed' is checked "
+        "before the distribution is opened, and 'too-many-files' and "
+        "'distro-too-large-uncompressed' are checked as each file is read."
+    ),
+)
 @click.option(
     "--expected-directories",
     multiple=True,
@@ -192,10 +748,19 @@ def check(  # noqa: PLR0913
     filepaths: str,
     version: bool,
     config: str,
+    benchmark_decompression: bool,
+    cache_dir: str,
+    no_cache: bool,
+    cache_max_size: str,
+    decompression_backend: str,
+    estimate_sizes: bool,
+    fail_fast: bool,
+    manifest: bool,
     expected_directories: "Sequence[str]",
     expected_files: "Sequence[str]",
     ignore: "Sequence[str]",
     inspect: bool,
+    jobs: int,
     max_allowed_files: int,
     max_allowed_size_compressed: str,
     max_allowed_size_uncompressed: str,
@@ -208,6 +773,13 @@ def check(  # noqa: PLR0913
     Run the contents of a distribution through a set of checks, and warn about
     any problematic characteristics that are detected.
 
+    FILEPATHS can also be http:// or https:// URLs. For wheels and other zip files,
+    only the parts of the file needed by the selected checks are downloaded.
+
+    Pass '-' to read a distribution from standard input (e.g. 'curl ... | pydistcheck -').
+    The format of distributions read from standard input or other pipes is detected
+    from their contents.
+
     Exit codes:
 
       0 = no issues detected\n
@@ -223,8 +795,12 @@ def check(  # noqa: PLR0913
     filepaths_to_check = [click.format_filename(f) for f in filepaths]
     conf = _Config()
     kwargs = {
+        "cache_dir": cache_dir,
+        "cache_max_size": cache_max_size,
+        "decompression_backend": decompression_backend,
         "ignore": ignore,
         "inspect": inspect,
+        "jobs": jobs,
         "max_allowed_files": max_allowed_files,
         "max_allowed_size_compressed": max_allowed_size_compressed,
         "max_allowed_size_uncompressed": max_allowed_size_uncompressed,
@@ -238,11 +814,15 @@ def check(  # noqa: PLR0913
     kwargs_that_differ_from_defaults = {
         k: v for k, v in kwargs.items() if v != getattr(conf, k)
     }
-    if config is not None:
-        conf.update_from_toml(toml_file=click.format_filename(config))
-    else:
-        conf.update_from_toml(toml_file="pyproject.toml")
-    conf.update_from_dict(input_dict=kwargs_that_differ_from_defaults)
+    try:
+        if config is not None:
+            conf.update_from_toml(toml_file=click.format_filename(config))
+        else:
+            conf.update_from_toml(toml_file="pyproject.toml")
+        conf.update_from_dict(input_dict=kwargs_that_differ_from_defaults)
+    except ValueError as err:
+        print(f"ERROR: {err}")
+        sys.exit(1)
 
     checks_to_ignore = {x for x in conf.ignore if x.strip()}
     unrecognized_checks = checks_to_ignore - ALL_CHECKS
@@ -266,8 +846,54 @@ def check(  # noqa: PLR0913
         )
         sys.exit(1)
 
+    try:
+        _raise_if_backend_is_unavailable(conf.decompression_backend)
+    except ValueError as err:
+        print(f"ERROR: {err}")
+        sys.exit(1)
+
+    if benchmark_decompression:
+        for filepath in filepaths_to_check:
+            _print_decompression_benchmark(filepath, jobs=conf.jobs)
+        sys.exit(ExitCodes.OK)
+
+    # manifests are small, and listing a remote distribution's contents means
+    # reading most of it anyway... so they're only read from files and standard input
+    if manifest and any(_is_url(filepath) for filepath in filepaths_to_check):
+        print(
+            "ERROR: '--manifest' can't be used with URLs. Download the manifest, "
+            "or pass it on standard input with '-'."
+        )
+        sys.exit(1)
+
+    # standard input can only be read once
+    if filepaths_to_check.count("-") > 1:
+        print("ERROR: '-' (standard input) can only be passed once")
+        sys.exit(1)
+
+    # with multiple distributions, 'jobs' is split between checking distributions
+    # in separate processes and reading each one (decompressing .tar.bz2 blocks,
+    # checking compiled objects) in threads
+    num_workers = max(1, min(conf.jobs, len(filepaths_to_check)))
+    # ... but processes started by 'multiprocessing' can't read this one's standard input
+    if "-" in filepaths_to_check:
+        num_workers = 1
+    if num_workers == 1:
+        jobs_per_distribution = conf.jobs
+    else:
+        jobs_per_distribution = conf.jobs // num_workers
+
+    cache = None
+    if conf.cache_dir and not no_cache:
+        cache = _DirectoryCache(
+            cache_dir=conf.cache_dir,
+            max_size_bytes=_FileSize.from_string(
+                size_str=conf.cache_max_size
+            ).total_size_bytes,
+        )
+
     checks = [
-        _CompiledObjectsDebugSymbolCheck(),
+        _CompiledObjectsDebugSymbolCheck(jobs=jobs_per_distribution, cache=cache),
         _DistroTooLargeCompressedCheck(
             max_allowed_size_bytes=_FileSize.from_string(
                 size_str=conf.max_allowed_size_compressed
@@ -283,8 +909,8 @@ def check(  # noqa: PLR0913
             output_file_size_unit=conf.output_file_size_unit,
         ),
         _ExpectedFilesCheck(
-            directory_patterns=expected_directories,
-            file_patterns=expected_files,
+            directory_patterns=conf.expected_directories,
+            file_patterns=conf.expected_files,
         ),
         _FileCountCheck(max_allowed_files=conf.max_allowed_files),
         _FilesOnlyDifferByCaseCheck(),
@@ -292,8 +918,8 @@ def check(  # noqa: PLR0913
         _PathTooLongCheck(max_path_length=conf.max_path_length),
         _SpacesInPathCheck(),
         _UnexpectedFilesCheck(
-            directory_patterns=expected_directories,
-            file_patterns=expected_files,
+            directory_patterns=conf.expected_directories,
+            file_patterns=conf.expected_files,
         ),
         _NonAsciiCharacterCheck(),
     ]
@@ -306,37 +932,27 @@ def check(  # noqa: PLR0913
         checks = [c for c in checks if c.check_name not in checks_to_ignore]
 
     any_errors_found = False
-    for filepath in filepaths_to_check:
-        print(f"\nchecking '{filepath}'")
-
-        try:
-            summary = _DistributionSummary.from_file(filename=filepath)
-        except ValueError as err:
-            print(f"error: {err}")
+    for result in _check_distributions(
+        filepaths=filepaths_to_check,
+        checks=checks,
+        conf=conf,
+        cache=cache,
+        manifest=manifest,
+        num_workers=num_workers,
+        jobs_per_distribution=jobs_per_distribution,
+        estimate_sizes=estimate_sizes,
+        fail_fast=fail_fast,
+    ):
+        print(result.output, end="")
+        if result.unsupported_file_type:
             sys.exit(ExitCodes.UNSUPPORTED_FILE_TYPE)
-
-        if conf.inspect:
-            from ._inspect import inspect_distribution
-
-            print("----- package inspection summary -----")
-            inspect_distribution(
-                summary=summary,
-                config=conf,
-            )
-
-        print("------------ check results -----------")
-        errors: list[str] = []
-        for this_check in checks:
-            errors += this_check(distro_summary=summary)
-
-        for i, error_msg in enumerate(sorted(errors)):
-            print(f"{i + 1}. {error_msg}")
-
-        num_errors_for_this_file = len(errors)
-        if num_errors_for_this_file:
+        if result.remote_file_error:
+            sys.exit(ExitCodes.REMOTE_FILE_ERROR)
+        if result.num_errors:
             any_errors_found = True
 
-        print(f"errors found while checking: {num_errors_for_this_file}")
+    if cache is not None:
+        cache.prune()
 
     print("\n==================== done running pydistcheck ===============")
 
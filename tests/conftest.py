@@ -0,0 +1,92 @@
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import pytest
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class _DistributionServer(ThreadingHTTPServer):
+    """
+    Serves files from ``tests/data``, optionally supporting range requests,
+    and records what was requested.
+    """
+
+    def __init__(self, *, supports_ranges: bool):
+        handler = partial(_DistributionRequestHandler, directory=TEST_DATA_DIR)
+        super().__init__(("127.0.0.1", 0), handler)
+        self.supports_ranges = supports_ranges
+        self.range_headers: list[Optional[str]] = []
+        self.num_bytes_sent = 0
+
+    def url_for(self, file_name: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{file_name}"
+
+
+class _DistributionRequestHandler(SimpleHTTPRequestHandler):
+    server: _DistributionServer
+
+    def do_GET(self) -> None:
+        range_header = self.headers.get("Range")
+        self.server.range_headers.append(range_header)
+        path = self.translate_path(self.path)
+        if not (
+            self.server.supports_ranges
+            and range_header is not None
+            and os.path.isfile(path)
+        ):
+            self.server.num_bytes_sent += (
+                os.path.getsize(path) if os.path.isfile(path) else 0
+            )
+            super().do_GET()
+            return
+
+        with open(path, "rb") as f:
+            data = f.read()
+        match = re.match(r"^bytes=(\d*)-(\d*)$", range_header)
+        assert match is not None, f"unsupported Range header: {range_header}"
+        if match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+        else:
+            start = max(0, len(data) - int(match.group(2)))
+            end = len(data) - 1
+
+        body = data[start : end + 1]
+        self.send_response(206)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.num_bytes_sent += len(body)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def distribution_server():
+    """
+    Returns a function that starts a local HTTP server for the files in ``tests/data``.
+    Servers are shut down when the test finishes.
+    """
+    servers = []
+
+    def _start(*, supports_ranges: bool) -> _DistributionServer:
+        server = _DistributionServer(supports_ranges=supports_ranges)
+        threading.Thread(
+            target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+        servers.append(server)
+        return server
+
+    yield _start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
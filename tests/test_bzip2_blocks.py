@@ -0,0 +1,125 @@
+import bz2
+import io
+import mmap
+import os
+import random
+
+import pytest
+
+from pydistcheck import _bzip2_blocks
+from pydistcheck._bzip2_blocks import _iter_blocks, _ParallelBzip2Reader
+from pydistcheck._distribution_summary import _DistributionSummary
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@pytest.fixture
+def uncompressed_data():
+    rng = random.Random(708)  # noqa: S311
+    words = [rng.randbytes(rng.randrange(2, 8)) for _ in range(1_000)]
+    return b" ".join(rng.choices(words, k=100_000))
+
+
+@pytest.fixture
+def mapped_bzip2_file(tmp_path):
+    mapped_files = []
+
+    def _map(compressed: bytes) -> mmap.mmap:
+        path = tmp_path / f"{len(mapped_files)}.bz2"
+        path.write_bytes(compressed)
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mapped_files.append(mapped)
+        return mapped
+
+    yield _map
+
+    for mapped in mapped_files:
+        mapped.close()
+
+
+def _read_all(
+    mapped: mmap.mmap, *, jobs: int = 4
+) -> tuple[bytes, _ParallelBzip2Reader]:
+    reader = _ParallelBzip2Reader(mapped, jobs=jobs)
+    return io.BufferedReader(reader).read(), reader
+
+
+def test_iter_blocks_finds_every_block(uncompressed_data, mapped_bzip2_file):
+    # level 1 means blocks of (at most) 100k
+    mapped = mapped_bzip2_file(bz2.compress(uncompressed_data, compresslevel=1))
+    blocks = list(_iter_blocks(mapped))
+    assert len(blocks) == len(uncompressed_data) // 100_000 + 1
+    assert all(b.stream_crc is None for b in blocks[:-1])
+    assert blocks[-1].stream_crc is not None
+
+
+@pytest.mark.parametrize("jobs", [1, 2, 4])
+def test_parallel_bzip2_reader_matches_bz2_decompress(
+    uncompressed_data, mapped_bzip2_file, jobs
+):
+    mapped = mapped_bzip2_file(bz2.compress(uncompressed_data, compresslevel=1))
+    decompressed, reader = _read_all(mapped, jobs=jobs)
+    assert decompressed == uncompressed_data
+    assert reader._sequential_reader is None
+
+
+def test_parallel_bzip2_reader_handles_multiple_streams(
+    uncompressed_data, mapped_bzip2_file
+):
+    half = len(uncompressed_data) // 2
+    compressed = (
+        bz2.compress(uncompressed_data[:half], compresslevel=1)
+        # empty streams are allowed too
+        + bz2.compress(b"")
+        + bz2.compress(uncompressed_data[half:], compresslevel=3)
+        # trailing data that isn't a bzip2 stream is ignored, like 'bz2.decompress()' does
+        + b"\x00" * 100
+    )
+    mapped = mapped_bzip2_file(compressed)
+    decompressed, reader = _read_all(mapped)
+    assert decompressed == bz2.decompress(compressed) == uncompressed_data
+    assert reader._sequential_reader is None
+
+
+def test_parallel_bzip2_reader_falls_back_to_sequential_reader_for_unexpected_layouts(
+    uncompressed_data, mapped_bzip2_file, monkeypatch
+):
+    mapped = mapped_bzip2_file(bz2.compress(uncompressed_data, compresslevel=1))
+    real_markers = list(_bzip2_blocks._iter_markers(mapped))
+    # pretend some data in the middle of the 3rd block looked like a block marker
+    fake_marker = ((real_markers[2][0] + real_markers[3][0]) // 2, _bzip2_blocks._BLOCK)
+    monkeypatch.setattr(
+        _bzip2_blocks,
+        "_iter_markers",
+        lambda data: iter(sorted([*real_markers, fake_marker])),
+    )
+    decompressed, reader = _read_all(mapped)
+    assert decompressed == uncompressed_data
+    assert reader._sequential_reader is not None
+
+
+def test_parallel_bzip2_reader_raises_same_error_as_bz2_for_corrupt_files(
+    uncompressed_data, mapped_bzip2_file
+):
+    compressed = bytearray(bz2.compress(uncompressed_data, compresslevel=1))
+    compressed[len(compressed) // 2] ^= 0xFF
+    with pytest.raises(OSError, match=r"Invalid data stream") as expected_err:
+        bz2.decompress(compressed)
+    mapped = mapped_bzip2_file(bytes(compressed))
+    with pytest.raises(type(expected_err.value), match=r"Invalid data stream"):
+        _read_all(mapped)
+
+
+def test_distribution_summary_with_parallel_bzip2_decompression_matches_sequential(
+    monkeypatch,
+):
+    distro_file = os.path.join(
+        TEST_DATA_DIR, "osx-arm64-debug-baseballmetrics-0.1.0-0.tar.bz2"
+    )
+    expected = _DistributionSummary.from_file(distro_file, jobs=1)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    summary = _DistributionSummary.from_file(distro_file, jobs=4)
+    assert summary.directories == expected.directories
+    assert summary.files == expected.files
+    assert summary.compiled_object_digests == expected.compiled_object_digests
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from pydistcheck._cache import _DirectoryCache, _sha256_of_file
+
+
+def _key(s):
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+def test_sha256_of_file_works(tmp_path):
+    content = b"some-content" * 300_000
+    path = tmp_path / "lib.so"
+    path.write_bytes(content)
+    assert _sha256_of_file(str(path)) == hashlib.sha256(content).hexdigest()
+
+
+def test_directory_cache_round_trips_entries(tmp_path):
+    cache = _DirectoryCache(cache_dir=str(tmp_path), max_size_bytes=1024)
+    assert cache.get(namespace="things", key=_key("a")) is None
+    cache.put(namespace="things", key=_key("a"), value={"x": [1, 2], "y": True})
+    assert cache.get(namespace="things", key=_key("a")) == {"x": [1, 2], "y": True}
+
+    # namespaces are independent
+    assert cache.get(namespace="other-things", key=_key("a")) is None
+
+    # overwriting works
+    cache.put(namespace="things", key=_key("a"), value={"x": []})
+    assert cache.get(namespace="things", key=_key("a")) == {"x": []}
+
+    # no temporary files are left behind
+    all_files = [f for _, _, files in os.walk(tmp_path) for f in files]
+    assert all_files == [f"{_key('a')}.json"]
+
+
+def test_directory_cache_treats_corrupted_entries_as_missing(tmp_path):
+    cache = _DirectoryCache(cache_dir=str(tmp_path), max_size_bytes=1024)
+    cache.put(namespace="things", key=_key("a"), value={"x": 1})
+    entry_path = tmp_path / "things" / _key("a")[:2] / f"{_key('a')}.json"
+    entry_path.write_text("{not-json", encoding="utf-8")
+    assert cache.get(namespace="things", key=_key("a")) is None
+
+
+@pytest.mark.parametrize("key", ["", "abc", "../../../etc/passwd", _key("a").upper()])
+def test_directory_cache_rejects_keys_that_are_not_sha256_digests(tmp_path, key):
+    cache = _DirectoryCache(cache_dir=str(tmp_path), max_size_bytes=1024)
+    with pytest.raises(
+        ValueError, match=r"Cache keys must be hex\-encoded sha256 digests"
+    ):
+        cache.put(namespace="things", key=key, value={})
+
+
+def test_directory_cache_prune_removes_least_recently_used_entries(tmp_path):
+    cache = _DirectoryCache(cache_dir=str(tmp_path), max_size_bytes=1024)
+    value = {"content": "a" * 300}
+    for i in range(5):
+        cache.put(namespace="things", key=_key(str(i)), value=value)
+        entry_path = tmp_path / "things" / _key(str(i))[:2] / f"{_key(str(i))}.json"
+        mtime = time.time() - 100 + i
+        os.utime(entry_path, (mtime, mtime))
+
+    # reading an entry marks it as recently used
+    assert cache.get(namespace="things", key=_key("0")) == value
+
+    # files that pydistcheck didn't write are never removed
+    (tmp_path / "notes.txt").write_text("x" * 5000, encoding="utf-8")
+
+    cache.prune()
+    remaining = {i for i in range(5) if cache.get(namespace="things", key=_key(str(i)))}
+    assert remaining == {0, 3, 4}
+    assert (tmp_path / "notes.txt").exists()
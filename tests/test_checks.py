@@ -1,4 +1,40 @@
+import os
+import threading
+import time
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
 import pydistcheck._checks
+from pydistcheck._cache import _DirectoryCache
+from pydistcheck._checks import (
+    _DEBUG_SYMBOLS_CACHE_NAMESPACE,
+    _CompiledObjectsDebugSymbolCheck,
+    _DistroTooLargeUnCompressedCheck,
+    _ExpectedFilesCheck,
+    _FailFastObserver,
+    _FileCountCheck,
+    _FilesOnlyDifferByCaseCheck,
+    _LimitExceededError,
+    _MixedFileExtensionCheck,
+    _NonAsciiCharacterCheck,
+    _PathTooLongCheck,
+    _SpacesInPathCheck,
+    _StreamingCheck,
+    _StreamingChecksObserver,
+    _UnexpectedFilesCheck,
+)
+from pydistcheck._distribution_summary import _DataTier, _DistributionSummary
+from pydistcheck._file_utils import (
+    _ArchiveFormat,
+    _DirectoryInfo,
+    _FileFormat,
+    _FileInfo,
+)
+from pydistcheck._shared_lib_utils import _DebugSymbolsResult, _file_has_debug_symbols
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 
 def test_all_checks_constant_contains_names_of_all_checks():
@@ -13,3 +49,357 @@ def test_all_checks_constant_contains_names_of_all_checks():
 
     # check class names should be unique
     assert len(pydistcheck._checks.ALL_CHECKS) == len(check_classes)
+
+
+def _make_compiled_object(name):
+    return _FileInfo(
+        name=name,
+        file_format=_FileFormat.ELF,
+        file_extension=".so",
+        is_compiled=True,
+        uncompressed_size_bytes=100,
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2, 5])
+def test_debug_symbols_check_preserves_order_and_bounds_concurrency(jobs):
+    file_names = [f"lib/lib_{i}.so" for i in range(12)]
+    distro_summary = _DistributionSummary(
+        archive_format=_ArchiveFormat.ZIP,
+        compressed_size_bytes=100,
+        directories=[],
+        files=[_make_compiled_object(name) for name in file_names],
+        original_file="some-package-0.1.0-py3-none-any.whl",
+    )
+
+    lock = threading.Lock()
+    num_running = 0
+    max_running = 0
+
+    def _fake_detect_debug_symbols(file_absolute_path, file_format):
+        nonlocal num_running, max_running
+        with lock:
+            num_running += 1
+            max_running = max(max_running, num_running)
+        # later files finish first, so results arrive out of order
+        file_index = int(os.path.basename(file_absolute_path)[4:-3])
+        time.sleep(0.001 * (len(file_names) - file_index))
+        with lock:
+            num_running -= 1
+        return _DebugSymbolsResult(
+            has_debug_symbols=file_index % 2 == 0,
+            command=f"nm -a {file_index}",
+            detected_by="nm",
+        )
+
+    with (
+        patch("pydistcheck._checks._extract_subset_of_files_from_archive"),
+        patch(
+            "pydistcheck._checks._detect_debug_symbols",
+            side_effect=_fake_detect_debug_symbols,
+        ),
+    ):
+        errors = _CompiledObjectsDebugSymbolCheck(jobs=jobs)(distro_summary)
+
+    assert max_running <= jobs
+    assert errors == [
+        (
+            "[compiled-objects-have-debug-symbols] Found compiled object containing debug symbols. "
+            f"For details, extract the distribution contents and run 'nm -a {i} \"lib/lib_{i}.so\"'."
+        )
+        for i in range(0, 12, 2)
+    ]
+
+
+@pytest.mark.parametrize(
+    "distro_file",
+    [
+        "debug-baseballmetrics-0.1.0-macosx-wheel.tar.gz",
+        "osx-arm64-debug-baseballmetrics-0.1.0-0.conda",
+    ],
+)
+def test_debug_symbols_check_uses_compiled_objects_captured_by_summary(distro_file):
+    distro_summary = _DistributionSummary.from_file(
+        os.path.join(TEST_DATA_DIR, distro_file)
+    )
+    with patch(
+        "pydistcheck._checks._extract_subset_of_files_from_archive",
+        side_effect=RuntimeError("archive read a second time"),
+    ):
+        errors = _CompiledObjectsDebugSymbolCheck(jobs=1)(distro_summary)
+    assert len(errors) == 1
+    assert "Found compiled object containing debug symbols" in errors[0]
+
+
+def _make_wheel_with_same_basename_compiled_objects(tmp_path):
+    """
+    A wheel with 2 compiled objects that have the same basename... one with debug
+    symbols ('debug/...') and one without ('stripped/...').
+    """
+    lib_name = "lib/lib_baseballmetrics.dylib"
+    wheel_file = str(tmp_path / "baseballmetrics-0.1.0-py3-none-macosx_12_0_arm64.whl")
+    with zipfile.ZipFile(wheel_file, mode="w") as out:
+        for prefix, source_wheel in [
+            ("debug", "debug-baseballmetrics-0.1.0-py3-none-macosx_12_0_arm64.whl"),
+            ("stripped", "baseballmetrics-0.1.0-py3-none-macosx_12_0_arm64.whl"),
+        ]:
+            with zipfile.ZipFile(os.path.join(TEST_DATA_DIR, source_wheel)) as zf:
+                out.writestr(f"{prefix}/{lib_name}", zf.read(lib_name))
+    return wheel_file
+
+
+def test_debug_symbols_check_distinguishes_compiled_objects_with_the_same_basename(
+    tmp_path,
+):
+    distro_summary = _DistributionSummary.from_file(
+        _make_wheel_with_same_basename_compiled_objects(tmp_path)
+    )
+    errors = _CompiledObjectsDebugSymbolCheck(jobs=2)(distro_summary)
+    assert len(errors) == 1
+    assert '"debug/lib/lib_baseballmetrics.dylib"' in errors[0]
+
+
+def test_debug_symbols_check_caches_each_verdict_under_its_own_digest(tmp_path):
+    wheel_file = _make_wheel_with_same_basename_compiled_objects(tmp_path)
+    distro_summary = _DistributionSummary.from_file(wheel_file)
+    cache = _DirectoryCache(cache_dir=str(tmp_path / "cache"), max_size_bytes=1024**2)
+    _CompiledObjectsDebugSymbolCheck(jobs=2, cache=cache)(distro_summary)
+
+    digests = distro_summary.compiled_object_digests
+    assert len(set(digests.values())) == 2
+    with zipfile.ZipFile(wheel_file) as zf:
+        for name, digest in digests.items():
+            lib_file = tmp_path / digest
+            lib_file.write_bytes(zf.read(name))
+            has_debug_symbols, _ = _file_has_debug_symbols(
+                file_absolute_path=str(lib_file), file_format=_FileFormat.MACH_O
+            )
+            assert has_debug_symbols == name.startswith("debug/")
+            cached = cache.get(namespace=_DEBUG_SYMBOLS_CACHE_NAMESPACE, key=digest)
+            assert cached is not None
+            assert cached["has_debug_symbols"] == has_debug_symbols
+
+
+def test_debug_symbols_check_ignores_cache_entries_without_current_entry_version(
+    tmp_path,
+):
+    wheel_file = _make_wheel_with_same_basename_compiled_objects(tmp_path)
+    distro_summary = _DistributionSummary.from_file(wheel_file)
+    cache = _DirectoryCache(cache_dir=str(tmp_path / "cache"), max_size_bytes=1024**2)
+
+    # entries like those written before 'entry_version' existed, with the wrong verdicts
+    for digest in distro_summary.compiled_object_digests.values():
+        cache.put(
+            namespace=_DEBUG_SYMBOLS_CACHE_NAMESPACE,
+            key=digest,
+            value={
+                "pydistcheck_version": pydistcheck._checks.__version__,
+                "has_debug_symbols": False,
+                "command": "nm -a",
+            },
+        )
+    errors = _CompiledObjectsDebugSymbolCheck(jobs=1, cache=cache)(distro_summary)
+    assert len(errors) == 1
+    assert '"debug/lib/lib_baseballmetrics.dylib"' in errors[0]
+
+
+def test_debug_symbols_check_records_how_each_result_was_decided(tmp_path):
+    distro_summary = _DistributionSummary.from_file(
+        _make_wheel_with_same_basename_compiled_objects(tmp_path)
+    )
+    debug_check = _CompiledObjectsDebugSymbolCheck(jobs=1)
+    debug_check(distro_summary)
+    assert debug_check.detected_by == {
+        "debug/lib/lib_baseballmetrics.dylib": "built-in Mach-O parser",
+        "stripped/lib/lib_baseballmetrics.dylib": "built-in Mach-O parser",
+    }
+
+    # if files can't be parsed directly, the tools that ran are recorded instead
+    with (
+        patch(
+            "pydistcheck._shared_lib_utils._native_debug_symbols_check",
+            return_value=None,
+        ),
+        patch(
+            "pydistcheck._shared_lib_utils._look_for_debug_symbols",
+            return_value=(True, "dsymutil -s"),
+        ),
+    ):
+        debug_check(distro_summary)
+    assert set(debug_check.detected_by.values()) == {"dsymutil -s"}
+
+
+def test_debug_symbols_check_reuses_cached_results_for_identical_files(tmp_path):
+    distro_summary = _DistributionSummary.from_file(
+        os.path.join(TEST_DATA_DIR, "debug-baseballmetrics-0.1.0-macosx-wheel.tar.gz")
+    )
+    cache = _DirectoryCache(cache_dir=str(tmp_path), max_size_bytes=1024**2)
+    first_errors = _CompiledObjectsDebugSymbolCheck(jobs=1, cache=cache)(distro_summary)
+    assert len(first_errors) == 1
+
+    with patch(
+        "pydistcheck._checks._detect_debug_symbols",
+        side_effect=RuntimeError("debug symbols checked again"),
+    ):
+        second_errors = _CompiledObjectsDebugSymbolCheck(jobs=1, cache=cache)(
+            distro_summary
+        )
+    assert second_errors == first_errors
+
+    # results from other versions of pydistcheck are not reused
+    with (
+        patch("pydistcheck._checks.__version__", "0.0.1"),
+        patch(
+            "pydistcheck._checks._detect_debug_symbols",
+            return_value=_DebugSymbolsResult(
+                has_debug_symbols=False, command="nm -a", detected_by="nm"
+            ),
+        ) as mock_detect_debug_symbols,
+    ):
+        errors = _CompiledObjectsDebugSymbolCheck(jobs=1, cache=cache)(distro_summary)
+    assert errors == []
+    assert mock_detect_debug_symbols.call_count == 1
+
+
+def test_debug_symbols_check_can_use_cached_results_without_file_contents(tmp_path):
+    distro_summary = _DistributionSummary.from_file(
+        os.path.join(TEST_DATA_DIR, "osx-arm64-debug-baseballmetrics-0.1.0-0.conda")
+    )
+    cache = _DirectoryCache(cache_dir=str(tmp_path), max_size_bytes=1024**2)
+    expected_errors = _CompiledObjectsDebugSymbolCheck(jobs=1, cache=cache)(
+        distro_summary
+    )
+
+    # summaries loaded from storage don't have any file contents, only digests
+    loaded_summary = _DistributionSummary.from_dict(
+        distro_summary.to_dict(), original_file=distro_summary.original_file
+    )
+    with patch(
+        "pydistcheck._checks._extract_subset_of_files_from_archive",
+        side_effect=RuntimeError("archive read a second time"),
+    ):
+        errors = _CompiledObjectsDebugSymbolCheck(jobs=1, cache=cache)(loaded_summary)
+    assert errors == expected_errors
+
+
+@pytest.mark.parametrize("jobs", [0, -1])
+def test_debug_symbols_check_rejects_non_positive_jobs(jobs):
+    with pytest.raises(ValueError, match=r"'jobs' must be a positive integer"):
+        _CompiledObjectsDebugSymbolCheck(jobs=jobs)
+
+
+def _file_info(name, *, size_bytes):
+    return _FileInfo(
+        name=name,
+        file_format=_FileFormat.UNKNOWN,
+        file_extension=".py",
+        is_compiled=False,
+        uncompressed_size_bytes=size_bytes,
+    )
+
+
+def test_fail_fast_observer_raises_once_file_count_is_exceeded():
+    observer = _FailFastObserver([_FileCountCheck(max_allowed_files=2)])
+    observer(_file_info("a.py", size_bytes=10))
+    observer(_DirectoryInfo(name="pkg/"))
+    observer(_file_info("b.py", size_bytes=10))
+    with pytest.raises(_LimitExceededError) as err:
+        observer(_file_info("c.py", size_bytes=10))
+    assert err.value.errors == [
+        "[too-many-files] Found at least 3 files. Only 2 allowed."
+    ]
+
+
+def test_fail_fast_observer_raises_once_uncompressed_size_is_exceeded():
+    size_check = _DistroTooLargeUnCompressedCheck(
+        max_allowed_size_bytes=1024,
+        output_file_size_precision=1,
+        output_file_size_unit="B",
+    )
+    observer = _FailFastObserver([size_check, _FileCountCheck(max_allowed_files=10)])
+    observer(_file_info("a.py", size_bytes=1000))
+    with pytest.raises(_LimitExceededError) as err:
+        observer(_file_info("b.py", size_bytes=1000))
+    assert err.value.errors == [
+        "[distro-too-large-uncompressed] Uncompressed size 2000.0B (of the files "
+        "read so far) is larger than the allowed size (1024.0B)."
+    ]
+
+
+def test_streaming_check_subclasses_must_implement_every_method():
+    class _IncompleteCheck(_StreamingCheck):
+        check_name = "incomplete"
+        data_tier = _DataTier.NAMES
+
+        def reset(self):
+            pass
+
+        def observe(self, member):
+            pass
+
+    with pytest.raises(TypeError, match=r"abstract method.*finalize"):
+        _IncompleteCheck()
+
+
+def _streaming_checks():
+    return [
+        _ExpectedFilesCheck(
+            directory_patterns=["src/*", "!*/__pycache__", "nope"],
+            file_patterns=["*.py", "!*.pyc", "!*/.gitignore", "*.nope"],
+        ),
+        _FilesOnlyDifferByCaseCheck(),
+        _MixedFileExtensionCheck(),
+        _NonAsciiCharacterCheck(),
+        _PathTooLongCheck(max_path_length=30),
+        _SpacesInPathCheck(),
+        _UnexpectedFilesCheck(
+            directory_patterns=["src/*", "!*/__pycache__", "nope"],
+            file_patterns=["*.py", "!*.pyc", "!*/.gitignore", "*.nope"],
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "distro_file",
+    ["problematic-package-0.1.0.tar.gz", "problematic-package-0.1.0.zip"],
+)
+def test_streaming_checks_observing_members_while_reading_match_whole_summary(
+    distro_file,
+):
+    distro_path = os.path.join(TEST_DATA_DIR, distro_file)
+    checks = _streaming_checks()
+    expected = {
+        c.check_name: sorted(
+            c(distro_summary=_DistributionSummary.from_file(distro_path))
+        )
+        for c in checks
+    }
+    assert all(isinstance(c, _StreamingCheck) for c in checks)
+    assert any(expected.values())
+
+    observer = _StreamingChecksObserver(checks)
+    summary = _DistributionSummary.from_file(distro_path, member_observer=observer)
+    with patch.object(
+        _StreamingCheck, "__call__", side_effect=RuntimeError("summary checked again")
+    ):
+        for this_check in checks:
+            errors = observer.run_check(this_check, distro_summary=summary)
+            assert sorted(errors) == expected[this_check.check_name]
+
+    # finalize() resets each check, so it can be used for the next distribution
+    for this_check, new_check in zip(checks, _streaming_checks()):
+        assert this_check.finalize() == new_check.finalize()
+
+
+def test_streaming_checks_observer_checks_whole_summary_if_members_were_not_observed():
+    distro_path = os.path.join(TEST_DATA_DIR, "problematic-package-0.1.0.tar.gz")
+    summary = _DistributionSummary.from_file(distro_path)
+    # e.g. a summary stored by a previous run
+    stored_summary = _DistributionSummary.from_dict(
+        summary.to_dict(), original_file=distro_path
+    )
+    this_check = _SpacesInPathCheck()
+    observer = _StreamingChecksObserver([this_check])
+    errors = observer.run_check(this_check, distro_summary=stored_summary)
+    assert errors == this_check(distro_summary=summary)
+    assert len(errors) > 0
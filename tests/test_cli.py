@@ -1,12 +1,14 @@
 import os
 import re
-from sys import platform
+import shutil
 from unittest.mock import MagicMock, patch
 
 import pytest
 from click.testing import CliRunner, Result
 
 import pydistcheck.cli  # noqa: F401
+from pydistcheck._distribution_summary import _DataTier, _load_or_build_summary
+from pydistcheck._file_utils import _CapturedFiles
 from pydistcheck.cli import check
 
 BASE_PACKAGES = [
@@ -62,11 +64,14 @@ def _assert_log_matches_pattern(
 
 
 def _mock_check_num_calls(mock_check: MagicMock) -> int:
-    """returns count of times the __call__() method of a mocked check class instance was called"""
+    """
+    returns count of times a mocked check class instance was run... either by calling it,
+    or (for streaming checks, which observe files as they're read) by calling finalize()
+    """
     return sum(
         1
         for mc in mock_check.method_calls
-        if str(mc).startswith("call()(distro_summary=")
+        if str(mc).startswith(("call()(distro_summary=", "call().finalize()"))
     )
 
 
@@ -123,6 +128,35 @@ def test_check_runs_for_all_files_before_exiting():
     )
 
 
+@pytest.mark.parametrize("flags", ([], ["--inspect"]))
+def test_check_output_for_multiple_files_does_not_depend_on_jobs(flags):
+    filepaths = [
+        os.path.join(TEST_DATA_DIR, distro_file)
+        for distro_file in [*PROBLEMATIC_PACKAGES, *PACKAGES_WITH_DEBUG_SYMBOLS]
+    ]
+    serial_result = CliRunner().invoke(check, [*filepaths, *flags, "--jobs=1"])
+    parallel_result = CliRunner().invoke(check, [*filepaths, *flags, "--jobs=4"])
+    assert serial_result.exit_code == 1, serial_result.output
+    assert parallel_result.exit_code == 1, parallel_result.output
+    assert parallel_result.output == serial_result.output
+
+
+def test_check_with_multiple_jobs_stops_at_first_unrecognized_file():
+    filepaths = [
+        os.path.join(TEST_DATA_DIR, BASE_PACKAGES[0]),
+        __file__,
+        os.path.join(TEST_DATA_DIR, BASE_PACKAGES[1]),
+    ]
+    serial_result = CliRunner().invoke(check, [*filepaths, "--jobs=1"])
+    parallel_result = CliRunner().invoke(check, [*filepaths, "--jobs=3"])
+    assert serial_result.exit_code == 2
+    assert parallel_result.exit_code == 2
+    assert parallel_result.output == serial_result.output
+    _assert_log_matches_pattern(
+        parallel_result, r"^checking '.*base\-package\-0\.1\.0\.zip'$", num_times=0
+    )
+
+
 @pytest.mark.parametrize("flags", ([], ["--inspect"]))
 def test_check_fails_with_informative_error_if_file_is_an_unrecognized_format(flags):
     result = CliRunner().invoke(check, [__file__, *flags])
@@ -132,6 +166,27 @@ def test_check_fails_with_informative_error_if_file_is_an_unrecognized_format(fl
     )
 
 
+@pytest.mark.parametrize(
+    "distro_file", ["problematic-package-0.1.0.tar.gz", "problematic-package-0.1.0.zip"]
+)
+@pytest.mark.parametrize("backend", ["auto", "python"])
+def test_check_fails_with_informative_error_if_archive_is_truncated(
+    distro_file, backend, tmp_path
+):
+    with open(os.path.join(TEST_DATA_DIR, distro_file), "rb") as f:
+        contents = f.read()
+    truncated_file = os.path.join(tmp_path, distro_file)
+    with open(truncated_file, "wb") as f:
+        f.write(contents[: len(contents) // 2])
+    result = CliRunner().invoke(
+        check, [truncated_file, f"--decompression-backend={backend}"]
+    )
+    assert result.exit_code == 2, result.output
+    _assert_log_matches_pattern(
+        result, rf"^error: .*{re.escape(distro_file)}: could not read archive \(.+\)$"
+    )
+
+
 @pytest.mark.parametrize("distro_file", BASE_PACKAGES)
 def test_check_respects_ignore_with_one_check(distro_file):
     runner = CliRunner()
@@ -267,10 +322,12 @@ def test_check_fails_with_expected_error_if_multiple_checks_in_ignore_are_unreco
 def test_check_respects_select_with_one_check(
     mock_path_contains_spaces, mock_too_many_files, distro_file
 ):
-    # ensure this attribute is actually set, as it's used for filtering (the class attribute
-    # is lost somewhere in all this mocking and patching)
+    # ensure these attributes are actually set, as they're used for filtering (the class attributes
+    # are lost somewhere in all this mocking and patching)
     mock_path_contains_spaces.return_value.check_name = "path-contains-spaces"
+    mock_path_contains_spaces.return_value.data_tier = _DataTier.NAMES
     mock_too_many_files.return_value.check_name = "too-many-files"
+    mock_too_many_files.return_value.data_tier = _DataTier.NAMES
 
     # initialize the click testing class
     runner = CliRunner()
@@ -322,11 +379,14 @@ def test_check_respects_select_with_one_check(
 def test_check_respects_select_with_multiple_checks(
     mock_path_too_long, mock_path_contains_spaces, mock_too_many_files, distro_file
 ):
-    # ensure this attribute is actually set, as it's used for filtering (the class attribute
-    # is lost somewhere in all this mocking and patching)
+    # ensure these attributes are actually set, as they're used for filtering (the class attributes
+    # are lost somewhere in all this mocking and patching)
     mock_path_too_long.return_value.check_name = "path-too-long"
+    mock_path_too_long.return_value.data_tier = _DataTier.NAMES
     mock_path_contains_spaces.return_value.check_name = "path-contains-spaces"
+    mock_path_contains_spaces.return_value.data_tier = _DataTier.NAMES
     mock_too_many_files.return_value.check_name = "too-many-files"
+    mock_too_many_files.return_value.data_tier = _DataTier.NAMES
 
     # initialize the click testing class
     runner = CliRunner()
@@ -407,6 +467,35 @@ def test_check_fails_with_expected_error_if_multiple_checks_in_select_are_unreco
     )
 
 
+@pytest.mark.parametrize("distro_file", PACKAGES_WITH_DEBUG_SYMBOLS)
+def test_check_only_reads_file_headers_if_selected_checks_need_them(distro_file):
+    with patch(
+        "pydistcheck._file_utils._guess_archive_member_file_format",
+        side_effect=RuntimeError("file header read"),
+    ):
+        result = CliRunner().invoke(
+            check,
+            [
+                os.path.join(TEST_DATA_DIR, distro_file),
+                "--select=path-too-long",
+                "--select=too-many-files",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        _assert_log_matches_pattern(result, "errors found while checking\\: 0")
+
+        # '--inspect' reports on compiled objects, so needs file headers
+        result = CliRunner().invoke(
+            check,
+            [
+                os.path.join(TEST_DATA_DIR, distro_file),
+                "--select=path-too-long",
+                "--inspect",
+            ],
+        )
+        assert isinstance(result.exception, RuntimeError)
+
+
 @pytest.mark.parametrize("distro_file", BASE_PACKAGES)
 def test_check_respects_max_allowed_files(distro_file):
     runner = CliRunner()
@@ -658,6 +747,23 @@ def test_check_handles_ignore_list_in_pyproject_toml_correctly(distro_file, tmp_
         _assert_log_matches_pattern(result, "errors found while checking\\: 0")
 
 
+@pytest.mark.parametrize("distro_file", BASE_PACKAGES)
+def test_check_respects_expected_files_in_pyproject_toml(distro_file, tmp_path):
+    runner = CliRunner()
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        with open("pyproject.toml", "w") as f:
+            f.write("[tool.pydistcheck]\nexpected_files = ['!*.py']\n")
+        result = runner.invoke(
+            check,
+            [os.path.join(TEST_DATA_DIR, distro_file), "--select=unexpected-files"],
+        )
+
+    assert result.exit_code == 1, result.output
+    _assert_log_matches_pattern(
+        result, r"^1\. \[unexpected\-files\] Found unexpected file '.*\.py'"
+    )
+
+
 @pytest.mark.parametrize("distro_file", BASE_PACKAGES)
 def test_check_prefers_keyword_args_to_pyproject_toml_and_defaults(
     distro_file, tmp_path
@@ -1065,22 +1171,16 @@ def test_debug_symbols_check_works(distro_file):
     assert result.exit_code == 1, result.output
     if "macosx" in distro_file:
         # macOS wheels
+        #
+        # Mach-O files are parsed directly, so results are the same on every platform
         lib_file = r"\"lib/lib_baseballmetrics\.dylib\"'"
-        if platform.startswith(("cygwin", "win")):
-            debug_cmd = r"'llvm\-nm \-a " + lib_file
-        else:
-            # dsymutil works on both macOS and Linux
-            debug_cmd = r"'dsymutil \-s " + lib_file
+        debug_cmd = r"'dsymutil \-s " + lib_file
     elif "osx-arm64" in distro_file:
         # macOS conda packages
         lib_file = (
             r"\"lib/python3\.12/site-packages/lib/lib_baseballmetrics\.dylib\"'\."
         )
-        if platform.startswith(("cygwin", "win")):
-            debug_cmd = r"'llvm\-nm \-a " + lib_file
-        else:
-            # dsymutil works on both macOS and Linux
-            debug_cmd = r"'dsymutil \-s " + lib_file
+        debug_cmd = r"'dsymutil \-s " + lib_file
     elif NUMPY_WIN_DEBUG_WHL in distro_file:
         # windows wheels
         lib_file = r"\"numpy\.libs/libopenblas64__v0\.3\.23-293-gc2f4bdbb-gcc_10_3_0-2bde3a66a51006b2b53eb373ff767a3f\.dll\"'"
@@ -1098,6 +1198,198 @@ def test_debug_symbols_check_works(distro_file):
     _assert_log_matches_pattern(result=result, pattern=expected_msg)
 
 
+@pytest.mark.parametrize("distro_file", PACKAGES_WITH_DEBUG_SYMBOLS)
+def test_debug_symbols_check_output_does_not_depend_on_jobs(distro_file):
+    results = [
+        CliRunner().invoke(
+            check,
+            [os.path.join(TEST_DATA_DIR, distro_file), f"--jobs={jobs}"],
+        )
+        for jobs in (1, 4)
+    ]
+    assert results[0].exit_code == 1, results[0].output
+    assert results[1].exit_code == 1, results[1].output
+    assert results[0].output == results[1].output
+
+
+def test_check_reads_jobs_from_pyproject_toml(tmp_path):
+    runner = CliRunner()
+    with (
+        runner.isolated_filesystem(temp_dir=tmp_path),
+        patch("pydistcheck.cli._CompiledObjectsDebugSymbolCheck") as mock_check,
+    ):
+        mock_check.return_value.data_tier = _DataTier.CONTENT
+        mock_check.return_value.return_value = []
+        with open("pyproject.toml", "w") as f:
+            f.write("[tool.pydistcheck]\njobs = 3\n")
+        result = runner.invoke(
+            check,
+            [os.path.join(TEST_DATA_DIR, BASE_PACKAGES[0])],
+        )
+    assert result.exit_code == 0, result.output
+    mock_check.assert_called_once_with(jobs=3, cache=None)
+
+
+@pytest.mark.parametrize("jobs", ["0", "-3", "'2'"])
+def test_check_rejects_invalid_jobs_in_pyproject_toml(tmp_path, jobs):
+    config_file = tmp_path / "pyproject.toml"
+    config_file.write_text(f"[tool.pydistcheck]\njobs = {jobs}\n")
+    result = CliRunner().invoke(
+        check,
+        [f"--config={config_file}", os.path.join(TEST_DATA_DIR, BASE_PACKAGES[0])],
+    )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(
+        result,
+        r"^ERROR: Configuration value 'jobs' must be a positive integer, got .+\.$",
+    )
+
+
+def test_check_reuses_debug_symbol_results_from_cache_dir(tmp_path):
+    cache_dir = tmp_path / "cache"
+    args = [
+        os.path.join(TEST_DATA_DIR, distro_file)
+        for distro_file in PACKAGES_WITH_DEBUG_SYMBOLS
+    ] + [f"--cache-dir={cache_dir}"]
+    first_result = CliRunner().invoke(check, args)
+    assert first_result.exit_code == 1, first_result.output
+    assert len(os.listdir(cache_dir / "debug-symbols")) > 0
+
+    # changing configuration means whole distributions have to be checked again,
+    # but results for individual compiled objects can still be reused
+    with patch(
+        "pydistcheck._checks._detect_debug_symbols",
+        side_effect=RuntimeError("debug symbols checked again"),
+    ):
+        second_result = CliRunner().invoke(check, [*args, "--max-path-length=199"])
+    assert second_result.exit_code == 1, second_result.output
+    assert second_result.output == first_result.output
+
+
+def test_check_reuses_check_results_from_cache_dir(tmp_path):
+    cache_dir = tmp_path / "cache"
+    args = [
+        os.path.join(TEST_DATA_DIR, distro_file)
+        for distro_file in [*PROBLEMATIC_PACKAGES, *PACKAGES_WITH_DEBUG_SYMBOLS]
+    ] + [f"--cache-dir={cache_dir}"]
+    first_result = CliRunner().invoke(check, args)
+    assert first_result.exit_code == 1, first_result.output
+    cache_hit_msg = r"^\(using cached results from a previous run"
+    _assert_log_matches_pattern(first_result, cache_hit_msg, num_times=0)
+
+    # distributions aren't even opened if results can be reused
+    with patch(
+        "pydistcheck.cli._DistributionSummary.from_file",
+        side_effect=RuntimeError("distribution read again"),
+    ):
+        second_result = CliRunner().invoke(check, args)
+    assert second_result.exit_code == 1, second_result.output
+    _assert_log_matches_pattern(second_result, cache_hit_msg, num_times=len(args) - 1)
+    assert re.sub(r"\(using cached.*\n", "", second_result.output) == (
+        first_result.output
+    )
+
+    # different configuration -> cache miss
+    third_result = CliRunner().invoke(check, [*args, "--max-path-length=10"])
+    _assert_log_matches_pattern(third_result, cache_hit_msg, num_times=0)
+    assert "path-too-long" in third_result.output
+
+    # '--no-cache' -> cache is ignored
+    with patch(
+        "pydistcheck.cli._DirectoryCache.get",
+        side_effect=RuntimeError("cache read"),
+    ):
+        fourth_result = CliRunner().invoke(check, [*args, "--no-cache"])
+    assert fourth_result.output == first_result.output
+
+    # '--inspect' still reads the distribution, but reuses check results
+    fifth_result = CliRunner().invoke(check, [*args, "--inspect"])
+    _assert_log_matches_pattern(fifth_result, cache_hit_msg, num_times=len(args) - 1)
+    _assert_log_matches_pattern(
+        fifth_result, r"^\-+ package inspection summary", num_times=len(args) - 1
+    )
+
+
+def test_check_cleans_up_captured_files_when_inspecting_with_cached_results(tmp_path):
+    cache_dir = tmp_path / "cache"
+    args = [
+        os.path.join(TEST_DATA_DIR, distro_file)
+        for distro_file in PACKAGES_WITH_DEBUG_SYMBOLS
+    ] + [f"--cache-dir={cache_dir}"]
+    first_result = CliRunner().invoke(check, args)
+    assert first_result.exit_code == 1, first_result.output
+
+    # without stored summaries, '--inspect' has to read each distribution again
+    # (capturing compiled objects), even though check results come from the cache
+    shutil.rmtree(cache_dir / "summaries")
+    with patch.object(
+        _CapturedFiles, "cleanup", autospec=True, side_effect=_CapturedFiles.cleanup
+    ) as mock_cleanup:
+        result = CliRunner().invoke(check, [*args, "--inspect"])
+    assert result.exit_code == 1, result.output
+    _assert_log_matches_pattern(
+        result, r"^\(using cached results from a previous run", num_times=len(args) - 1
+    )
+    assert mock_cleanup.call_count == len(args) - 1
+    for call in mock_cleanup.call_args_list:
+        assert len(call.args[0]) == 0
+
+
+def test_check_reuses_stored_summaries_when_configuration_changes(tmp_path):
+    cache_dir = tmp_path / "cache"
+    args = [
+        os.path.join(TEST_DATA_DIR, distro_file)
+        for distro_file in [*PROBLEMATIC_PACKAGES, *PACKAGES_WITH_DEBUG_SYMBOLS]
+    ] + [f"--cache-dir={cache_dir}"]
+    first_result = CliRunner().invoke(check, args)
+    assert first_result.exit_code == 1, first_result.output
+
+    extra_args_to_try = (["--max-path-length=10"], ["--inspect"])
+    expected_outputs = [
+        CliRunner().invoke(check, [*args[:-1], *extra_args]).output
+        for extra_args in extra_args_to_try
+    ]
+
+    # changing configuration means checks have to run again, but the stored summaries
+    # (and cached debug symbol results) mean the distributions don't have to be read again
+    with patch(
+        "pydistcheck._distribution_summary._DistributionSummary.from_file",
+        side_effect=RuntimeError("distribution read again"),
+    ):
+        for extra_args, expected_output in zip(extra_args_to_try, expected_outputs):
+            result = CliRunner().invoke(check, [*args, *extra_args])
+            assert result.exit_code == 1, result.output
+            # '--inspect' doesn't change check results, so those can be reused too
+            output = re.sub(r"\(using cached.*\n", "", result.output)
+            assert output == expected_output
+
+
+def test_check_prunes_cache_dir_to_cache_max_size(tmp_path):
+    cache_dir = tmp_path / "cache"
+    result = CliRunner().invoke(
+        check,
+        [
+            os.path.join(TEST_DATA_DIR, PACKAGES_WITH_DEBUG_SYMBOLS[0]),
+            f"--cache-dir={cache_dir}",
+            "--cache-max-size=1B",
+        ],
+    )
+    assert result.exit_code == 1, result.output
+    assert [f for _, _, files in os.walk(cache_dir) for f in files] == []
+
+
+@pytest.mark.parametrize("jobs", [0, -2])
+def test_check_raises_informative_error_for_non_positive_jobs(jobs):
+    result = CliRunner().invoke(
+        check,
+        [os.path.join(TEST_DATA_DIR, BASE_PACKAGES[0]), f"--jobs={jobs}"],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 2
+    assert "Invalid value for '--jobs'" in result.output
+    assert f"{jobs} is not in the range x>=1" in result.output
+
+
 # --------------------- #
 # pydistcheck --inspect #
 # --------------------- #
@@ -1202,3 +1494,493 @@ def test_inspect_respects_output_file_size_precision_for_all_size_strings():
     _assert_log_matches_pattern(
         result, r" \(11\.09K\) base-package\-0\.1\.0/LICENSE\.txt"
     )
+
+
+@pytest.mark.parametrize("distro_file", BASEBALL_WHEELS)
+def test_inspect_reports_how_debug_symbols_are_detected(distro_file):
+    result = CliRunner().invoke(
+        check,
+        [
+            "--inspect",
+            os.path.join(TEST_DATA_DIR, distro_file),
+        ],
+    )
+    assert result.exit_code == 0
+    expected_file_format = "Mach\\-O" if "macosx" in distro_file else "ELF"
+    _assert_log_matches_pattern(result, r"^debug symbol detection$")
+    _assert_log_matches_pattern(
+        result,
+        rf"^  \* lib/lib_baseballmetrics\.\w+: built\-in {expected_file_format} parser$",
+    )
+
+
+def test_inspect_reports_when_debug_symbols_were_not_checked():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--inspect",
+            "--ignore=compiled-objects-have-debug-symbols",
+            os.path.join(TEST_DATA_DIR, BASEBALL_WHEELS[0]),
+        ],
+    )
+    assert result.exit_code == 0
+    _assert_log_matches_pattern(
+        result, r"^  \* unknown \(debug symbols weren't checked in this run\)$"
+    )
+
+
+@pytest.mark.parametrize("distro_file", BASE_PACKAGES)
+def test_inspect_does_not_report_debug_symbol_detection_without_compiled_objects(
+    distro_file,
+):
+    result = CliRunner().invoke(
+        check,
+        [
+            "--inspect",
+            os.path.join(TEST_DATA_DIR, distro_file),
+        ],
+    )
+    assert result.exit_code == 0
+    _assert_log_matches_pattern(result, r"^debug symbol detection$", num_times=0)
+
+
+def _check_result_lines(result: Result) -> list[str]:
+    return [line for line in result.output.split("\n") if re.match(r"^\d+\. \[", line)]
+
+
+@pytest.mark.parametrize(
+    ("manifest_file", "distro_file"),
+    [
+        ("problematic-package-0.1.0.tar.gz.txt", "problematic-package-0.1.0.tar.gz"),
+        ("problematic-package-0.1.0.zip.ndjson", "problematic-package-0.1.0.zip"),
+        ("problematic-package-0.1.0.zip.txt", "problematic-package-0.1.0.zip"),
+    ],
+)
+def test_check_with_manifest_finds_same_errors_as_with_distribution(
+    manifest_file, distro_file
+):
+    manifest_result = CliRunner().invoke(
+        check,
+        ["--manifest", os.path.join(TEST_DATA_DIR, "manifests", manifest_file)],
+    )
+    distro_result = CliRunner().invoke(
+        check,
+        [os.path.join(TEST_DATA_DIR, distro_file)],
+    )
+    assert manifest_result.exit_code == 1
+    assert distro_result.exit_code == 1
+    assert _check_result_lines(manifest_result) == _check_result_lines(distro_result)
+    _assert_log_matches_pattern(
+        manifest_result,
+        r"^skipped 'compiled\-objects\-have\-debug\-symbols' \(file contents not available\)$",
+    )
+
+
+def test_check_reads_manifest_from_stdin():
+    manifest_path = os.path.join(
+        TEST_DATA_DIR, "manifests", "problematic-package-0.1.0.zip.ndjson"
+    )
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest_contents = f.read()
+    stdin_result = CliRunner().invoke(
+        check, ["--manifest", "-"], input=manifest_contents
+    )
+    file_result = CliRunner().invoke(check, ["--manifest", manifest_path])
+    assert stdin_result.exit_code == file_result.exit_code == 1
+    assert _check_result_lines(stdin_result) == _check_result_lines(file_result)
+
+
+def test_check_rejects_manifest_urls(distribution_server):
+    server = distribution_server(supports_ranges=True)
+    result = CliRunner().invoke(
+        check,
+        [
+            "--manifest",
+            server.url_for("manifests/problematic-package-0.1.0.zip.ndjson"),
+        ],
+    )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(
+        result, r"^ERROR: '\-\-manifest' can't be used with URLs\."
+    )
+
+
+def test_check_with_manifest_skips_checks_that_need_unavailable_information():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--manifest",
+            "--max-allowed-size-compressed=1B",
+            os.path.join(TEST_DATA_DIR, "manifests", "base-package-0.1.0.tar.gz.txt"),
+            os.path.join(
+                TEST_DATA_DIR,
+                "manifests",
+                f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}.txt",
+            ),
+        ],
+    )
+    assert result.exit_code == 1
+    # 'tar -tv' output doesn't include the size of the archive, but 'unzip -Z' output does
+    _assert_log_matches_pattern(
+        result,
+        r"^skipped 'distro\-too\-large\-compressed' \(compressed size not available\)$",
+    )
+    _assert_log_matches_pattern(
+        result,
+        r"^1\. \[distro\-too\-large\-compressed\] Compressed size 4\.622K is larger than the allowed size \(1\.0B\)\.$",
+    )
+    _assert_log_matches_pattern(
+        result,
+        r"^skipped 'compiled\-objects\-have\-debug\-symbols' \(file contents not available\)$",
+        num_times=2,
+    )
+
+
+def test_check_with_manifest_reports_unknown_details_with_inspect():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--manifest",
+            "--inspect",
+            os.path.join(TEST_DATA_DIR, "manifests", "base-package-0.1.0.tar.gz.txt"),
+        ],
+    )
+    assert result.exit_code == 0
+    _assert_log_matches_pattern(result, r"^  \* compressed size: unknown$")
+    _assert_log_matches_pattern(result, r"^  \* uncompressed size: 12\.039K$")
+    _assert_log_matches_pattern(result, r"^  \* files: 11 \(unknown number compiled\)$")
+    _assert_log_matches_pattern(result, r"compression space saving", num_times=0)
+
+
+def test_check_with_manifest_fails_with_informative_error_for_invalid_manifest():
+    result = CliRunner().invoke(
+        check,
+        ["--manifest", os.path.join(TEST_DATA_DIR, "base-package-0.1.0.tar.gz")],
+    )
+    assert result.exit_code == 2
+    _assert_log_matches_pattern(result, r"does not appear to be a manifest")
+
+
+@pytest.mark.parametrize("supports_ranges", [True, False])
+@pytest.mark.parametrize(
+    "distro_file", ["problematic-package-0.1.0.zip", *PACKAGES_WITH_DEBUG_SYMBOLS]
+)
+def test_check_works_for_urls(
+    distro_file, supports_ranges, distribution_server, tmp_path
+):
+    server = distribution_server(supports_ranges=supports_ranges)
+    local_result = CliRunner().invoke(check, [os.path.join(TEST_DATA_DIR, distro_file)])
+    remote_result = CliRunner().invoke(
+        check,
+        [f"--cache-dir={tmp_path}", server.url_for(distro_file)],
+    )
+    assert remote_result.exit_code == local_result.exit_code == 1
+    assert _check_result_lines(remote_result) == _check_result_lines(local_result)
+
+
+@pytest.mark.parametrize("supports_ranges", [True, False])
+def test_check_reports_errors_reading_urls_separately_from_unsupported_files(
+    supports_ranges, distribution_server
+):
+    server = distribution_server(supports_ranges=supports_ranges)
+    result = CliRunner().invoke(check, [server.url_for("not-a-file.whl")])
+    assert result.exit_code == 3, result.output
+    _assert_log_matches_pattern(
+        result,
+        r"^error: failed to read remote distribution\. Could not download .+HTTP Error 404",
+    )
+
+
+def test_check_only_downloads_central_directory_for_remote_wheels_if_possible(
+    distribution_server,
+):
+    server = distribution_server(supports_ranges=True)
+    distro_file = "lightgbm-3.3.5-py3-none-win_amd64.whl"
+    result = CliRunner().invoke(
+        check,
+        [
+            "--ignore=compiled-objects-have-debug-symbols",
+            server.url_for(distro_file),
+        ],
+    )
+    assert result.exit_code == 0
+    assert (
+        server.num_bytes_sent
+        < os.path.getsize(os.path.join(TEST_DATA_DIR, distro_file)) / 4
+    )
+
+
+@pytest.mark.parametrize(
+    "distro_file", ["problematic-package-0.1.0.tar.gz", "problematic-package-0.1.0.zip"]
+)
+def test_check_works_for_stdin(distro_file, tmp_path):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    with open(full_path, "rb") as f:
+        distro_bytes = f.read()
+    local_result = CliRunner().invoke(check, [full_path])
+    # results for standard input are never cached, since it can only be read once
+    stdin_results = [
+        CliRunner().invoke(check, [f"--cache-dir={tmp_path}", "-"], input=distro_bytes)
+        for _ in range(2)
+    ]
+    for result in stdin_results:
+        assert result.exit_code == 1
+        assert _check_result_lines(result) == _check_result_lines(local_result)
+        _assert_log_matches_pattern(result, r"^checking '\-'$")
+        _assert_log_matches_pattern(result, r"using cached results", num_times=0)
+
+
+def test_check_reads_stdin_in_main_process_with_multiple_jobs():
+    with open(os.path.join(TEST_DATA_DIR, "base-package-0.1.0.tar.gz"), "rb") as f:
+        distro_bytes = f.read()
+    result = CliRunner().invoke(
+        check,
+        [
+            "--jobs=2",
+            os.path.join(TEST_DATA_DIR, "base-package-0.1.0.zip"),
+            "-",
+        ],
+        input=distro_bytes,
+    )
+    assert result.exit_code == 0
+    _assert_log_matches_pattern(
+        result, r"^errors found while checking: 0$", num_times=2
+    )
+
+
+def test_check_fails_with_informative_error_if_stdin_is_passed_more_than_once():
+    result = CliRunner().invoke(check, ["-", "-"], input=b"")
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(
+        result, r"^ERROR: '\-' \(standard input\) can only be passed once$"
+    )
+
+
+def test_check_fails_with_informative_error_if_stdin_is_not_a_distribution():
+    result = CliRunner().invoke(check, ["-"], input=b"not a distribution")
+    assert result.exit_code == 2
+    _assert_log_matches_pattern(
+        result, r"^error: Contents of '\-' do not appear to be a Python package"
+    )
+
+
+def test_check_fails_with_informative_error_for_unrecognized_decompression_backend():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--decompression-backend=gz",
+            os.path.join(TEST_DATA_DIR, "base-package-0.1.0.tar.gz"),
+        ],
+    )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(
+        result=result,
+        pattern=r"^ERROR: Unrecognized decompression backend 'gz'\. Valid values: auto, ",
+    )
+
+
+@pytest.mark.parametrize("backend", ["auto", "python"])
+def test_check_finds_same_errors_with_any_decompression_backend(backend):
+    distro_files = [
+        os.path.join(TEST_DATA_DIR, "problematic-package-0.1.0.tar.gz"),
+        os.path.join(TEST_DATA_DIR, "osx-arm64-debug-baseballmetrics-0.1.0-0.tar.bz2"),
+    ]
+    expected = CliRunner().invoke(check, distro_files)
+    result = CliRunner().invoke(
+        check, [*distro_files, f"--decompression-backend={backend}"]
+    )
+    assert result.exit_code == expected.exit_code == 1
+    assert _check_result_lines(result) == _check_result_lines(expected)
+
+
+def test_benchmark_decompression_prints_timings_without_running_checks():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--benchmark-decompression",
+            os.path.join(TEST_DATA_DIR, "problematic-package-0.1.0.tar.gz"),
+        ],
+    )
+    assert result.exit_code == 0
+    _assert_log_matches_pattern(result, r"^compression: gzip \(fastest of 3 runs\)$")
+    _assert_log_matches_pattern(
+        result, r"^  python +[0-9]+\.[0-9]{3}s  \([0-9.]+ MiB/s decompressed\)$"
+    )
+    _assert_log_matches_pattern(result, r"^'auto' uses: [a-z\-]+$")
+    assert "errors found while checking" not in result.output
+
+
+def test_benchmark_decompression_fails_for_zip_files():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--benchmark-decompression",
+            os.path.join(TEST_DATA_DIR, "base-package-0.1.0.zip"),
+        ],
+    )
+    assert result.exit_code == 2
+    _assert_log_matches_pattern(result, r"^error: Members of '\.zip' files .+")
+
+
+@pytest.mark.parametrize(
+    ("distro_file", "expected_estimate"),
+    [
+        ("base-package-0.1.0.tar.gz", "at most 40.0K (from the gzip trailer)"),
+        ("base-package-0.1.0.zip", "12.039K (from the zip central directory)"),
+        ("osx-arm64-baseballmetrics-0.1.0-0.conda", "38.352K (from info/paths.json)"),
+    ],
+)
+def test_estimate_sizes_checks_uncompressed_size_without_reading_files(
+    distro_file, expected_estimate
+):
+    with patch(
+        "pydistcheck.cli._load_or_build_summary",
+        wraps=_load_or_build_summary,
+    ) as mock_load:
+        result = CliRunner().invoke(
+            check,
+            [
+                "--estimate-sizes",
+                "--select=distro-too-large-uncompressed",
+                "--select=distro-too-large-compressed",
+                os.path.join(TEST_DATA_DIR, distro_file),
+            ],
+        )
+    assert result.exit_code == 0
+    assert mock_load.call_args.kwargs["data_tier"] == _DataTier.NONE
+    _assert_log_matches_pattern(
+        result,
+        rf"^estimated uncompressed size for 'distro\-too\-large\-uncompressed': {re.escape(expected_estimate)}$",
+    )
+
+
+def test_estimate_sizes_reports_estimated_sizes_that_are_too_large():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--estimate-sizes",
+            "--select=distro-too-large-uncompressed",
+            "--max-allowed-size-uncompressed=12K",
+            os.path.join(TEST_DATA_DIR, "base-package-0.1.0.zip"),
+        ],
+    )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(
+        result,
+        r"^1\. \[distro\-too\-large\-uncompressed\] Uncompressed size 12\.039K \(estimated from the zip central directory\) is larger than the allowed size \(12\.0K\)\.$",
+    )
+
+
+def test_estimate_sizes_falls_back_to_reading_files_if_upper_bound_is_too_large():
+    # the gzip trailer says at most 40.0K, but the files only add up to 12.039K
+    distro_path = os.path.join(TEST_DATA_DIR, "base-package-0.1.0.tar.gz")
+    args = ["--select=distro-too-large-uncompressed", distro_path]
+    expected = CliRunner().invoke(check, ["--max-allowed-size-uncompressed=12K", *args])
+    result = CliRunner().invoke(
+        check, ["--estimate-sizes", "--max-allowed-size-uncompressed=12K", *args]
+    )
+    assert result.exit_code == expected.exit_code == 1
+    assert _check_result_lines(result) == _check_result_lines(expected)
+    assert "estimated" not in result.output
+
+    result = CliRunner().invoke(
+        check, ["--estimate-sizes", "--max-allowed-size-uncompressed=13K", *args]
+    )
+    assert result.exit_code == 0
+    assert "estimated" not in result.output
+
+
+def test_estimate_sizes_is_not_used_if_other_checks_need_file_sizes():
+    result = CliRunner().invoke(
+        check,
+        [
+            "--estimate-sizes",
+            "--max-allowed-size-uncompressed=12K",
+            os.path.join(TEST_DATA_DIR, "base-package-0.1.0.zip"),
+        ],
+    )
+    assert result.exit_code == 1
+    assert "estimated" not in result.output
+
+
+@pytest.mark.parametrize(
+    ("limit_flag", "expected_error"),
+    [
+        (
+            "--max-allowed-size-compressed=1K",
+            r"^1\. \[distro\-too\-large\-compressed\] Compressed size 6\.384K is larger than the allowed size \(1\.0K\)\.$",
+        ),
+        (
+            "--max-allowed-files=3",
+            r"^1\. \[too\-many\-files\] Found at least 4 files\. Only 3 allowed\.$",
+        ),
+        (
+            "--max-allowed-size-uncompressed=2K",
+            r"^1\. \[distro\-too\-large\-uncompressed\] Uncompressed size [0-9.]+K \(of the files read so far\) is larger than the allowed size \(2\.0K\)\.$",
+        ),
+    ],
+)
+def test_fail_fast_stops_at_first_limit_that_is_exceeded(limit_flag, expected_error):
+    result = CliRunner().invoke(
+        check,
+        [
+            "--fail-fast",
+            limit_flag,
+            os.path.join(TEST_DATA_DIR, "problematic-package-0.1.0.tar.gz"),
+        ],
+    )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(result, r"^\(stopped early because of '\-\-fail\-fast'")
+    _assert_log_matches_pattern(result, expected_error)
+    _assert_log_matches_pattern(result, r"^errors found while checking: 1$")
+
+
+def test_fail_fast_does_not_open_distributions_that_are_too_large_compressed():
+    with patch(
+        "pydistcheck.cli._load_or_build_summary",
+        side_effect=RuntimeError("distribution was opened"),
+    ):
+        result = CliRunner().invoke(
+            check,
+            [
+                "--fail-fast",
+                "--max-allowed-size-compressed=1K",
+                os.path.join(TEST_DATA_DIR, "base-package-0.1.0.tar.gz"),
+            ],
+        )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(
+        result, r"^1\. \[distro\-too\-large\-compressed\] Compressed size"
+    )
+
+
+@pytest.mark.parametrize("distro_file", PROBLEMATIC_PACKAGES)
+def test_fail_fast_finds_same_errors_when_no_limits_are_exceeded(distro_file):
+    distro_path = os.path.join(TEST_DATA_DIR, distro_file)
+    expected = CliRunner().invoke(check, [distro_path])
+    result = CliRunner().invoke(check, ["--fail-fast", distro_path])
+    assert result.exit_code == expected.exit_code == 1
+    assert _check_result_lines(result) == _check_result_lines(expected)
+    assert "stopped early" not in result.output
+
+
+def test_fail_fast_stops_before_reading_if_size_estimate_fails():
+    with patch(
+        "pydistcheck.cli._load_or_build_summary",
+        side_effect=RuntimeError("distribution was opened"),
+    ):
+        result = CliRunner().invoke(
+            check,
+            [
+                "--fail-fast",
+                "--estimate-sizes",
+                "--select=distro-too-large-uncompressed",
+                "--max-allowed-size-uncompressed=12K",
+                os.path.join(TEST_DATA_DIR, "base-package-0.1.0.zip"),
+            ],
+        )
+    assert result.exit_code == 1
+    _assert_log_matches_pattern(result, r"^\(stopped early because of '\-\-fail\-fast'")
+    _assert_log_matches_pattern(
+        result, r"^1\. \[distro\-too\-large\-uncompressed\] .+ \(estimated from"
+    )
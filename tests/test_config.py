@@ -45,6 +45,14 @@ def test_update_from_dict_raises_exception_for_first_bad_value_encountered(base_
         base_config.update_from_dict({"a": 7, "b": 8, "inspect": False})
 
 
+@pytest.mark.parametrize("jobs", [0, -1, "2", True, 1.5])
+def test_update_from_dict_rejects_invalid_jobs(base_config, jobs):
+    with pytest.raises(
+        ValueError, match=r"Configuration value 'jobs' must be a positive integer"
+    ):
+        base_config.update_from_dict({"jobs": jobs})
+
+
 def test_update_from_dict_works_even_if_dict_does_not_include_all_config_values(
     base_config,
 ):
@@ -63,10 +71,14 @@ def test_update_from_dict_works_when_changing_all_values(base_config):
     assert base_config.output_file_size_unit == "auto"
     assert base_config.select == ()
     patch_dict = {
+        "cache_dir": "/var/cache/pydistcheck",
+        "cache_max_size": "500M",
+        "decompression_backend": "isal",
         "expected_directories": "!*/tests",
         "expected_files": "!*.xlsx,!data/*.csv",
         "ignore": ["path-contains-spaces", "too-many-files"],
         "inspect": True,
+        "jobs": 4,
         "max_allowed_files": 8,
         "max_allowed_size_compressed": "2G",
         "max_allowed_size_uncompressed": "141K",
@@ -79,10 +91,14 @@ def test_update_from_dict_works_when_changing_all_values(base_config):
         "this test needs to be updated"
     )
     base_config.update_from_dict(patch_dict)
+    assert base_config.cache_dir == "/var/cache/pydistcheck"
+    assert base_config.cache_max_size == "500M"
+    assert base_config.decompression_backend == "isal"
     assert base_config.expected_directories == "!*/tests"
     assert base_config.expected_files == "!*.xlsx,!data/*.csv"
     assert base_config.ignore == ["path-contains-spaces", "too-many-files"]
     assert base_config.inspect is True
+    assert base_config.jobs == 4
     assert base_config.max_allowed_files == 8
     assert base_config.max_allowed_size_compressed == "2G"
     assert base_config.max_allowed_size_uncompressed == "141K"
@@ -139,10 +155,14 @@ def test_update_from_toml_works_with_all_config_values(
 ):
     temp_file = os.path.join(tmpdir, f"{uuid.uuid4().hex}.toml")
     patch_dict = {
+        "cache_dir": "'.pydistcheck_cache'",
+        "cache_max_size": "'2G'",
+        "decompression_backend": "'pigz'",
         "expected_directories": "[\n'!tests/*'\n]",
         "expected_files": "[\n'!*.pq',\n'!*/tests/data/*.csv']",
         "ignore": "[\n'path-contains-spaces',\n'too-many-files'\n]",
         "inspect": "true",
+        "jobs": 16,
         "max_allowed_files": 8,
         "max_allowed_size_compressed": "'3G'",
         "max_allowed_size_uncompressed": "'4.12G'",
@@ -162,10 +182,14 @@ def test_update_from_toml_works_with_all_config_values(
         ]
         f.write("\n".join(lines))
     base_config.update_from_toml(toml_file=temp_file)
+    assert base_config.cache_dir == ".pydistcheck_cache"
+    assert base_config.cache_max_size == "2G"
+    assert base_config.decompression_backend == "pigz"
     assert base_config.expected_directories == ["!tests/*"]
     assert base_config.expected_files == ["!*.pq", "!*/tests/data/*.csv"]
     assert base_config.ignore == ["path-contains-spaces", "too-many-files"]
     assert base_config.inspect is True
+    assert base_config.jobs == 16
     assert base_config.max_allowed_files == 8
     assert base_config.max_allowed_size_compressed == "3G"
     assert base_config.max_allowed_size_uncompressed == "4.12G"
@@ -176,3 +200,31 @@ def test_update_from_toml_works_with_all_config_values(
         "mixed-file-extensions",
         "path-contains-non-ascii-characters",
     ]
+
+
+def test_check_result_settings_ignores_values_that_do_not_affect_check_results():
+    config = _Config()
+    settings = config.check_result_settings()
+    assert "cache_dir" not in settings
+    assert "jobs" not in settings
+    assert settings["max_path_length"] == 200
+
+    config.update_from_dict(
+        {
+            "cache_dir": "some-dir",
+            "decompression_backend": "python",
+            "inspect": True,
+            "jobs": 8,
+        }
+    )
+    assert config.check_result_settings() == settings
+
+    config.update_from_dict({"max_path_length": 50})
+    assert config.check_result_settings()["max_path_length"] == 50
+
+
+def test_check_result_settings_normalizes_sequences():
+    from_cli = _Config(ignore=("path-too-long",), expected_files=("!*.csv",))
+    from_toml = _Config(ignore=["path-too-long"], expected_files=["!*.csv"])
+    assert from_cli.check_result_settings() == from_toml.check_result_settings()
+    assert from_cli.check_result_settings()["ignore"] == ["path-too-long"]
@@ -0,0 +1,180 @@
+import gzip
+import io
+import os
+import shutil
+
+import pytest
+
+from pydistcheck import _decompression
+from pydistcheck._decompression import (
+    _ALL_DECOMPRESSION_BACKENDS,
+    _backend_is_available,
+    _benchmark_decompression,
+    _choose_backend,
+    _Compression,
+    _DecompressionBackend,
+    _open_decompressed_stream,
+    _open_external_decompressor_stream,
+    _raise_if_backend_is_unavailable,
+)
+from pydistcheck._distribution_summary import _DistributionSummary
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+COMPRESSED_DISTRO_FILES = [
+    "base-package-0.1.0.tar.gz",
+    "osx-arm64-debug-baseballmetrics-0.1.0-0.conda",
+    "osx-arm64-debug-baseballmetrics-0.1.0-0.tar.bz2",
+    "problematic-package-0.1.0.tar.gz",
+]
+
+
+def _skip_if_unavailable(backend):
+    if not _backend_is_available(backend):
+        pytest.skip(f"decompression backend '{backend}' is not available")
+
+
+@pytest.mark.parametrize(
+    ("compression", "backend", "expected"),
+    [
+        (_Compression.GZIP, "isal", "isal"),
+        (_Compression.GZIP, "pigz", "pigz"),
+        (_Compression.GZIP, "python", "python"),
+        # backends only apply to the formats they support
+        (_Compression.BZIP2, "isal", "python"),
+        (_Compression.ZSTD, "pigz", "python"),
+        (_Compression.BZIP2, "lbzip2", "lbzip2"),
+        (_Compression.ZSTD, "zstd", "zstd"),
+    ],
+)
+def test_choose_backend_uses_requested_backend_for_formats_it_supports(
+    compression, backend, expected
+):
+    assert _choose_backend(compression=compression, backend=backend) == expected
+
+
+def test_choose_backend_auto_uses_fastest_available_backend(monkeypatch):
+    available = {"pigz", "python", "zlib-ng"}
+    monkeypatch.setattr(
+        _decompression,
+        "_backend_is_available",
+        lambda backend, *, compression=None: backend in available,
+    )
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    assert _choose_backend(compression=_Compression.GZIP, backend="auto") == "zlib-ng"
+
+    available.remove("zlib-ng")
+    assert _choose_backend(compression=_Compression.GZIP, backend="auto") == "pigz"
+
+    # with only 1 CPU, a separate process can't decompress while this one reads
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    assert _choose_backend(compression=_Compression.GZIP, backend="auto") == "python"
+
+    # ... but it's still better than nothing
+    available = {"zstd"}
+    assert _choose_backend(compression=_Compression.ZSTD, backend="auto") == "zstd"
+
+
+def test_raise_if_backend_is_unavailable_raises_informative_errors(monkeypatch):
+    with pytest.raises(ValueError, match=r"Unrecognized decompression backend 'gz'"):
+        _raise_if_backend_is_unavailable("gz")
+
+    monkeypatch.setattr(
+        _decompression, "_backend_is_available", lambda backend, **kwargs: False
+    )
+    with pytest.raises(ValueError, match=r"requires the 'pigz' program.+PATH"):
+        _raise_if_backend_is_unavailable("pigz")
+    with pytest.raises(ValueError, match=r"pip install zlib-ng"):
+        _raise_if_backend_is_unavailable("zlib-ng")
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [b for b in _ALL_DECOMPRESSION_BACKENDS if b != _DecompressionBackend.AUTO],
+)
+@pytest.mark.parametrize("distro_file", COMPRESSED_DISTRO_FILES)
+def test_distribution_summary_is_the_same_for_every_backend(distro_file, backend):
+    _skip_if_unavailable(backend)
+    distro_path = os.path.join(TEST_DATA_DIR, distro_file)
+    expected = _DistributionSummary.from_file(
+        distro_path, decompression_backend="python"
+    )
+    summary = _DistributionSummary.from_file(distro_path, decompression_backend=backend)
+    assert summary.compressed_size_bytes == expected.compressed_size_bytes
+    assert summary.directories == expected.directories
+    assert summary.files == expected.files
+    assert summary.compiled_object_digests == expected.compiled_object_digests
+
+
+def test_external_decompressor_raises_informative_error_for_corrupt_input():
+    if shutil.which("gzip") is None:
+        pytest.skip("'gzip' is not available")
+    compressed = gzip.compress(b"pydistcheck" * 10_000)
+    corrupt = compressed[:-20] + b"\x00" * 20
+    with (
+        pytest.raises(OSError, match=r"'gzip -d -c' exited with code 1: .+"),
+        _open_external_decompressor_stream(
+            io.BytesIO(corrupt), command=["gzip", "-d", "-c"]
+        ) as decompressed,
+    ):
+        decompressed.read()
+
+
+def test_external_decompressor_can_be_stopped_early():
+    if shutil.which("gzip") is None:
+        pytest.skip("'gzip' is not available")
+    uncompressed = os.urandom(10 * 1024 * 1024)
+    compressed = io.BytesIO(gzip.compress(uncompressed, compresslevel=1))
+    with (  # noqa: PT012
+        pytest.raises(RuntimeError, match="stopped reading"),
+        _open_external_decompressor_stream(
+            compressed, command=["gzip", "-d", "-c"]
+        ) as decompressed,
+    ):
+        assert decompressed.read(100) == uncompressed[:100]
+        raise RuntimeError("stopped reading")  # noqa: EM101
+
+
+def test_open_decompressed_stream_passes_on_errors_from_reading_input():
+    class _FailingFile(io.BytesIO):
+        def read(self, size=-1):
+            raise ValueError("Could not download")  # noqa: EM101
+
+    _skip_if_unavailable("zstd")
+    with (
+        pytest.raises(ValueError, match=r"Could not download"),
+        _open_decompressed_stream(
+            _FailingFile(), compression=_Compression.ZSTD, backend="zstd"
+        ) as decompressed,
+    ):
+        decompressed.read()
+
+
+@pytest.mark.parametrize(
+    ("distro_file", "expected_compression"),
+    [
+        ("base-package-0.1.0.tar.gz", "gzip"),
+        ("osx-arm64-baseballmetrics-0.1.0-0.conda", "zstd"),
+        ("osx-arm64-baseballmetrics-0.1.0-0.tar.bz2", "bzip2"),
+    ],
+)
+def test_benchmark_decompression_times_every_supporting_backend(
+    distro_file, expected_compression
+):
+    compression, results = _benchmark_decompression(
+        os.path.join(TEST_DATA_DIR, distro_file), num_runs=1
+    )
+    assert compression == expected_compression
+    assert [r.backend for r in results] == list(
+        _decompression._BACKENDS_BY_COMPRESSION[compression]
+    )
+    for result in results:
+        if _backend_is_available(result.backend, compression=compression):
+            assert result.seconds is not None
+            assert result.uncompressed_size_bytes > 0
+        else:
+            assert result.seconds is None
+
+
+def test_benchmark_decompression_rejects_zip_files():
+    with pytest.raises(ValueError, match=r"compressed individually"):
+        _benchmark_decompression(os.path.join(TEST_DATA_DIR, "base-package-0.1.0.zip"))
@@ -1,9 +1,31 @@
+import gzip
+import io
+import json
 import os
+import shutil
+import tarfile
+import threading
 import zipfile
+from unittest.mock import patch
 
 import pytest
 
-from pydistcheck._distribution_summary import _DistributionSummary, _FileInfo
+from pydistcheck._cache import _DirectoryCache
+from pydistcheck._distribution_summary import (
+    _DataTier,
+    _DistributionSummary,
+    _FileInfo,
+    _load_or_build_summary,
+)
+from pydistcheck._file_utils import (
+    _ArchiveFormat,
+    _CapturedFiles,
+    _extract_subset_of_files_from_archive,
+    _FileFormat,
+    _guess_archive_member_file_format,
+    _mapped_file,
+    _read_zip_member_header_from_memory,
+)
 
 BASE_PACKAGE_SDISTS = ["base-package-0.1.0.tar.gz", "base-package-0.1.0.zip"]
 MACOS_SUFFIX = "macosx_12_0_arm64.whl"
@@ -13,6 +35,17 @@ BASE_WHEELS = [
     f"baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}",
 ]
 WINDOWS_WHEELS = ["lightgbm-3.3.5-py3-none-win_amd64.whl"]
+CONDA_PACKAGES = [
+    "osx-arm64-baseballmetrics-0.1.0-0.conda",
+    "osx-arm64-debug-baseballmetrics-0.1.0-0.conda",
+]
+TARFILES = [
+    "base-package-0.1.0.tar.gz",
+    "debug-baseballmetrics-0.1.0-macosx-wheel.tar.bz2",
+    "debug-baseballmetrics-0.1.0-macosx-wheel.tar.gz",
+    "osx-arm64-baseballmetrics-0.1.0-0.tar.bz2",
+    "problematic-package-0.1.0.tar.gz",
+]
 TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 
@@ -223,3 +256,623 @@ def test_file_info_correctly_determines_file_type(distro_file):
         file_info = _FileInfo.from_zipfile_member(archive_file=zf, zip_info=zip_info)
         assert file_info.is_compiled is True
         assert file_info.file_format == expected_file_format
+
+
+@pytest.mark.parametrize("distro_file", TARFILES)
+def test_distribution_summary_reads_tarfiles_in_a_single_forward_pass(distro_file):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+
+    # build the expected results the slow way, with random access to each member
+    expected_files = []
+    expected_directory_paths = []
+    with tarfile.open(full_path, mode="r") as tf:
+        for tar_info in tf.getmembers():
+            if tar_info.isfile():
+                expected_files.append(
+                    _FileInfo.from_tarfile_member(archive_file=tf, tar_info=tar_info)
+                )
+            else:
+                expected_directory_paths.append(tar_info.name)
+
+    # random access (and therefore re-decompressing the stream) should never be needed
+    with patch.object(
+        tarfile.TarFile, "getmembers", side_effect=RuntimeError("getmembers() called")
+    ):
+        ds = _DistributionSummary.from_file(full_path)
+
+    assert ds.files == expected_files
+    assert ds.directory_paths == expected_directory_paths
+    assert any(f.is_compiled for f in ds.files) == ("baseballmetrics" in distro_file)
+
+
+@pytest.mark.parametrize("distro_file", CONDA_PACKAGES)
+def test_distribution_summary_streams_conda_packages_without_temporary_files(
+    distro_file,
+):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    with patch("tempfile.mkdtemp", side_effect=RuntimeError("mkdtemp() called")):
+        ds = _DistributionSummary.from_file(full_path)
+
+    # files from the outer zip, 'info-*.tar.zst', and 'pkg-*.tar.zst' should all be found
+    assert ds.num_files == 22
+    assert ds.num_directories == 0
+    assert "metadata.json" in ds.file_paths
+    assert "info/paths.json" in ds.file_paths
+    assert [f.name for f in ds.compiled_objects] == [
+        "lib/python3.12/site-packages/lib/lib_baseballmetrics.dylib"
+    ]
+    assert ds.compiled_objects[0].file_format == "Mach-O"
+
+
+@pytest.mark.parametrize("data_tier", [_DataTier.NAMES, _DataTier.SIZES])
+@pytest.mark.parametrize(
+    "distro_file", [*BASE_PACKAGE_SDISTS, *BASE_WHEELS, *CONDA_PACKAGES, *TARFILES]
+)
+def test_distribution_summary_skips_reading_file_headers_below_headers_tier(
+    distro_file, data_tier
+):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    full_summary = _DistributionSummary.from_file(full_path)
+    with patch(
+        "pydistcheck._file_utils._guess_archive_member_file_format",
+        side_effect=RuntimeError("file header read"),
+    ):
+        ds = _DistributionSummary.from_file(full_path, data_tier=data_tier)
+
+    assert ds.data_tier == data_tier
+    assert ds.all_paths == full_summary.all_paths
+    assert ds.uncompressed_size_bytes == full_summary.uncompressed_size_bytes
+    assert ds.compiled_objects == []
+    assert {f.file_format for f in ds.files} == {_FileFormat.UNKNOWN}
+
+
+@pytest.mark.parametrize("distro_file", [*BASE_WHEELS, *WINDOWS_WHEELS])
+def test_distribution_summary_reads_only_the_central_directory_for_zip_names(
+    distro_file,
+):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    with patch.object(
+        zipfile.ZipFile, "open", side_effect=RuntimeError("zip member opened")
+    ):
+        ds = _DistributionSummary.from_file(full_path, data_tier=_DataTier.NAMES)
+    assert ds.num_files > 0
+
+
+@pytest.mark.parametrize("distro_file", [*BASE_PACKAGE_SDISTS, *CONDA_PACKAGES])
+def test_distribution_summary_does_not_open_archive_for_none_tier(distro_file):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    with (
+        patch("tarfile.open", side_effect=RuntimeError("tarfile opened")),
+        patch("zipfile.ZipFile", side_effect=RuntimeError("zipfile opened")),
+    ):
+        ds = _DistributionSummary.from_file(full_path, data_tier=_DataTier.NONE)
+    assert ds.compressed_size_bytes == os.path.getsize(full_path)
+    assert ds.num_files == 0
+    assert ds.num_directories == 0
+
+
+DEBUG_PACKAGES = [
+    "debug-baseballmetrics-0.1.0-macosx-wheel.tar.bz2",
+    "debug-baseballmetrics-0.1.0-macosx-wheel.tar.gz",
+    f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}",
+    "osx-arm64-debug-baseballmetrics-0.1.0-0.conda",
+]
+
+
+@pytest.mark.parametrize("distro_file", [*DEBUG_PACKAGES, *WINDOWS_WHEELS])
+def test_distribution_summary_captures_compiled_objects_in_the_same_pass(
+    distro_file, tmp_path
+):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    ds = _DistributionSummary.from_file(full_path)
+    captured = ds.compiled_object_contents
+    assert len(ds.compiled_objects) > 0
+    assert len(captured) == len(ds.compiled_objects)
+    for file_info in ds.compiled_objects:
+        assert file_info.name in captured
+        with open(
+            captured.materialize(file_info.name, out_dir=str(tmp_path)), "rb"
+        ) as f:
+            content = f.read()
+        assert len(content) == file_info.uncompressed_size_bytes
+        assert (
+            content[:4]
+            in {
+                b"\x7fELF",
+                b"\xcf\xfa\xed\xfe",
+                b"\xca\xfe\xba\xbe",
+            }
+            or content[:2] == b"MZ"
+        )
+    ds.compiled_object_contents.cleanup()
+    assert len(captured) == 0
+
+
+@pytest.mark.parametrize(
+    "distro_file",
+    [*TARFILES, *CONDA_PACKAGES, "base-package-0.1.0.zip"],
+)
+def test_distribution_summary_calls_member_observer_for_every_member(distro_file):
+    observed = []
+    ds = _DistributionSummary.from_file(
+        os.path.join(TEST_DATA_DIR, distro_file), member_observer=observed.append
+    )
+    assert sorted(m.name for m in observed) == sorted(ds.all_paths)
+    ds.compiled_object_contents.cleanup()
+
+
+class _StopReadingError(Exception):
+    pass
+
+
+@pytest.mark.parametrize("distro_file", [*DEBUG_PACKAGES, *WINDOWS_WHEELS])
+def test_distribution_summary_stops_reading_when_member_observer_raises(
+    distro_file,
+):
+    observed = []
+
+    def _observer(member):
+        observed.append(member)
+        if len(observed) == 3:
+            raise _StopReadingError
+
+    with (
+        patch(
+            "pydistcheck._distribution_summary._CapturedFiles.cleanup",
+            autospec=True,
+        ) as mock_cleanup,
+        pytest.raises(_StopReadingError),
+    ):
+        _DistributionSummary.from_file(
+            os.path.join(TEST_DATA_DIR, distro_file), member_observer=_observer
+        )
+    assert len(observed) == 3
+    # anything captured so far is cleaned up
+    mock_cleanup.assert_called_once()
+
+
+@pytest.mark.parametrize("data_tier", [_DataTier.NAMES, _DataTier.HEADERS])
+def test_distribution_summary_only_captures_compiled_objects_for_content_tier(
+    data_tier,
+):
+    full_path = os.path.join(TEST_DATA_DIR, DEBUG_PACKAGES[0])
+    ds = _DistributionSummary.from_file(full_path, data_tier=data_tier)
+    assert len(ds.compiled_object_contents) == 0
+
+
+def test_captured_files_spill_to_disk_above_memory_limit(tmp_path):
+    captured = _CapturedFiles(max_in_memory_bytes=10)
+    small = io.BytesIO(b"abcdefgh")
+    captured.add(name="lib/small.so", header=small.read(4), fileobj=small)
+    large = io.BytesIO(b"0123456789" * 100)
+    captured.add(name="../../large.so", header=large.read(4), fileobj=large)
+
+    assert "lib/small.so" in captured
+    assert "../../large.so" in captured
+    assert "lib/other.so" not in captured
+    assert captured.num_on_disk == 1
+
+    small_path = captured.materialize("lib/small.so", out_dir=str(tmp_path))
+    large_path = captured.materialize("../../large.so", out_dir=str(tmp_path))
+    with open(small_path, "rb") as f:
+        assert f.read() == b"abcdefgh"
+    with open(large_path, "rb") as f:
+        assert f.read() == b"0123456789" * 100
+
+    # members' names from the archive are never used as paths
+    assert os.path.dirname(small_path) == str(tmp_path)
+    spill_dir = os.path.dirname(large_path)
+    assert os.path.basename(spill_dir).startswith("pydistcheck-")
+
+    captured.cleanup()
+    assert len(captured) == 0
+    assert not os.path.exists(spill_dir)
+
+
+def test_captured_files_with_the_same_basename_do_not_overwrite_each_other(tmp_path):
+    captured = _CapturedFiles(max_in_memory_bytes=10)
+    for name, content in [("a/lib.so", b"aaaa"), ("b/lib.so", b"bbbb")]:
+        f = io.BytesIO(content)
+        captured.add(name=name, header=f.read(2), fileobj=f)
+    for name, content in [("c/lib.so", b"c" * 20), ("d/lib.so", b"d" * 20)]:
+        f = io.BytesIO(content)
+        captured.add(name=name, header=f.read(2), fileobj=f)
+    assert captured.num_on_disk == 2
+
+    paths = {
+        name: captured.materialize(name, out_dir=str(tmp_path))
+        for name in ["a/lib.so", "b/lib.so", "c/lib.so", "d/lib.so"]
+    }
+    assert len(set(paths.values())) == 4
+    for name, content in [
+        ("a/lib.so", b"aaaa"),
+        ("b/lib.so", b"bbbb"),
+        ("c/lib.so", b"c" * 20),
+        ("d/lib.so", b"d" * 20),
+    ]:
+        with open(paths[name], "rb") as f:
+            assert f.read() == content
+    captured.cleanup()
+
+
+@pytest.mark.parametrize("data_tier", [_DataTier.NAMES, _DataTier.CONTENT])
+@pytest.mark.parametrize(
+    "distro_file", [*BASE_PACKAGE_SDISTS, *DEBUG_PACKAGES, *WINDOWS_WHEELS]
+)
+def test_distribution_summary_round_trips_through_json(distro_file, data_tier):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    ds = _DistributionSummary.from_file(full_path, data_tier=data_tier)
+    loaded = _DistributionSummary.from_dict(
+        json.loads(json.dumps(ds.to_dict())), original_file=full_path
+    )
+    assert loaded == ds
+    assert loaded.data_tier == data_tier
+    assert len(loaded.compiled_object_contents) == 0
+    if data_tier == _DataTier.CONTENT and "debug" in distro_file:
+        assert set(loaded.compiled_object_digests) == {
+            f.name for f in ds.compiled_objects
+        }
+
+
+def _copy_test_file(distro_file, tmp_path):
+    out_path = str(tmp_path / distro_file)
+    shutil.copyfile(os.path.join(TEST_DATA_DIR, distro_file), out_path)
+    return out_path
+
+
+@pytest.mark.parametrize("distro_file", [*BASE_PACKAGE_SDISTS, *CONDA_PACKAGES])
+def test_load_or_build_summary_reuses_stored_summaries(distro_file, tmp_path):
+    distro_path = _copy_test_file(distro_file, tmp_path)
+    cache = _DirectoryCache(cache_dir=str(tmp_path / "cache"), max_size_bytes=1024**2)
+    expected = _load_or_build_summary(
+        distro_path, data_tier=_DataTier.HEADERS, cache=cache
+    )
+
+    from_file_error = RuntimeError("distribution read again")
+    with patch.object(_DistributionSummary, "from_file", side_effect=from_file_error):
+        # same or lower data tier -> reused
+        for data_tier in [_DataTier.NAMES, _DataTier.HEADERS]:
+            ds = _load_or_build_summary(distro_path, data_tier=data_tier, cache=cache)
+            assert ds == expected
+
+        # higher data tier -> rebuilt
+        with pytest.raises(RuntimeError, match="distribution read again"):
+            _load_or_build_summary(
+                distro_path, data_tier=_DataTier.CONTENT, cache=cache
+            )
+
+        # modification time changed -> rebuilt
+        os.utime(distro_path, ns=(0, 0))
+        with pytest.raises(RuntimeError, match="distribution read again"):
+            _load_or_build_summary(distro_path, data_tier=_DataTier.NAMES, cache=cache)
+
+
+def test_load_or_build_summary_validates_digest(tmp_path):
+    distro_path = _copy_test_file(BASE_PACKAGE_SDISTS[1], tmp_path)
+    cache = _DirectoryCache(cache_dir=str(tmp_path / "cache"), max_size_bytes=1024**2)
+    _load_or_build_summary(distro_path, data_tier=_DataTier.HEADERS, cache=cache)
+
+    # same size and modification time, different content
+    stat_result = os.stat(distro_path)
+    with open(distro_path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last_byte = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last_byte[0] ^ 0xFF]))
+    os.utime(distro_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+    with (
+        patch("pydistcheck._distribution_summary._sha256_of_distribution") as mock_sha,
+        patch.object(
+            _DistributionSummary,
+            "from_file",
+            side_effect=RuntimeError("distribution read again"),
+        ),
+    ):
+        mock_sha.return_value = "0" * 64
+        with pytest.raises(RuntimeError, match="distribution read again"):
+            _load_or_build_summary(distro_path, data_tier=_DataTier.NAMES, cache=cache)
+
+
+def test_load_or_build_summary_raises_for_unsupported_files(tmp_path):
+    cache = _DirectoryCache(cache_dir=str(tmp_path / "cache"), max_size_bytes=1024**2)
+    with pytest.raises(ValueError, match=r"does not appear to be a Python package"):
+        _load_or_build_summary(__file__, data_tier=_DataTier.NAMES, cache=cache)
+
+
+MANIFESTS = {
+    "base-package-0.1.0.tar.gz.txt": "base-package-0.1.0.tar.gz",
+    f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}.txt": (
+        f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}"
+    ),
+    "problematic-package-0.1.0.tar.gz.txt": "problematic-package-0.1.0.tar.gz",
+    "problematic-package-0.1.0.zip.ndjson": "problematic-package-0.1.0.zip",
+    "problematic-package-0.1.0.zip.txt": "problematic-package-0.1.0.zip",
+}
+
+
+@pytest.mark.parametrize(("manifest_file", "distro_file"), MANIFESTS.items())
+def test_distribution_summary_from_manifest_matches_distribution(
+    manifest_file, distro_file
+):
+    manifest_summary = _DistributionSummary.from_manifest(
+        os.path.join(TEST_DATA_DIR, "manifests", manifest_file)
+    )
+    distro_summary = _DistributionSummary.from_file(
+        os.path.join(TEST_DATA_DIR, distro_file), data_tier=_DataTier.SIZES
+    )
+    assert manifest_summary.data_tier == _DataTier.SIZES
+    assert manifest_summary.archive_format == distro_summary.archive_format
+    assert sorted(manifest_summary.directory_paths) == sorted(
+        distro_summary.directory_paths
+    )
+    assert sorted(
+        (f.name, f.uncompressed_size_bytes) for f in manifest_summary.files
+    ) == sorted((f.name, f.uncompressed_size_bytes) for f in distro_summary.files)
+    assert manifest_summary.size_by_file_extension == (
+        distro_summary.size_by_file_extension
+    )
+    if manifest_file.endswith(".tar.gz.txt"):
+        # 'tar -tv' output doesn't include the size of the archive
+        assert manifest_summary.compressed_size_bytes is None
+    else:
+        assert manifest_summary.compressed_size_bytes is not None
+
+
+def test_distribution_summary_from_manifest_unescapes_gnu_tar_names():
+    summary = _DistributionSummary.from_manifest(
+        os.path.join(TEST_DATA_DIR, "manifests", "problematic-package-0.1.0.tar.gz.txt")
+    )
+    assert (
+        "problematic-package-0.1.0/problematic_package/€veryone-loves-python.py"
+        in summary.file_paths
+    )
+
+
+def test_distribution_summary_from_manifest_uses_archive_format_from_manifest(
+    tmp_path,
+):
+    manifest_file = os.path.join(tmp_path, "listing.ndjson")
+    with open(manifest_file, "w") as f:
+        f.write('{"archive_name": "pkg-0.1.0.tar.gz"}\n')
+        f.write('{"name": "pkg-0.1.0/", "type": "directory"}\n')
+        f.write('{"name": "pkg-0.1.0/setup.py", "size": 10}\n')
+    summary = _DistributionSummary.from_manifest(manifest_file)
+    assert summary.archive_format == _ArchiveFormat.GZIP_TAR
+    assert summary.compressed_size_bytes is None
+    assert summary.file_paths == ["pkg-0.1.0/setup.py"]
+    assert summary.directory_paths == ["pkg-0.1.0/"]
+
+
+@pytest.mark.parametrize(
+    ("contents", "error_msg"),
+    [
+        ("hello\n", r"does not appear to be a manifest"),
+        ('{"name": "setup.py"}\n', r"Could not parse line 1 of NDJSON manifest"),
+        (
+            "-rw-r--r--  2.0 unx 10 b- defN 23-Feb-06 04:25 setup.py\nnonsense\n",
+            r"Could not parse line 2 of 'unzip \-Z' manifest",
+        ),
+    ],
+)
+def test_distribution_summary_from_manifest_raises_for_invalid_manifests(
+    contents, error_msg, tmp_path
+):
+    manifest_file = os.path.join(tmp_path, "listing.txt")
+    with open(manifest_file, "w") as f:
+        f.write(contents)
+    with pytest.raises(ValueError, match=error_msg):
+        _DistributionSummary.from_manifest(manifest_file)
+
+
+STREAMABLE_PACKAGES = [
+    *BASE_PACKAGE_SDISTS,
+    *CONDA_PACKAGES,
+    *DEBUG_PACKAGES,
+    "osx-arm64-baseballmetrics-0.1.0-0.tar.bz2",
+]
+
+
+def _assert_summaries_match(actual, expected):
+    assert actual.archive_format == expected.archive_format
+    assert actual.compressed_size_bytes == expected.compressed_size_bytes
+    assert actual.directories == expected.directories
+    assert actual.files == expected.files
+    assert actual.compiled_object_digests == expected.compiled_object_digests
+
+
+@pytest.mark.parametrize("distro_file", STREAMABLE_PACKAGES)
+def test_distribution_summary_from_stdin_matches_local_file(distro_file, monkeypatch):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    with open(full_path, "rb") as f:
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(f.read())))
+    ds = _DistributionSummary.from_file("-")
+    _assert_summaries_match(ds, _DistributionSummary.from_file(full_path))
+    assert ds.original_file == "-"
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="named pipes not supported")
+@pytest.mark.parametrize("distro_file", STREAMABLE_PACKAGES)
+def test_distribution_summary_from_named_pipe_matches_local_file(distro_file, tmp_path):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    pipe_path = os.path.join(tmp_path, "distribution")
+    os.mkfifo(pipe_path)
+
+    def _write_to_pipe():
+        with open(full_path, "rb") as src, open(pipe_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024)
+
+    writer = threading.Thread(target=_write_to_pipe)
+    writer.start()
+    try:
+        ds = _DistributionSummary.from_file(pipe_path)
+    finally:
+        writer.join()
+    _assert_summaries_match(ds, _DistributionSummary.from_file(full_path))
+
+
+@pytest.mark.parametrize("data_tier", [_DataTier.NONE, _DataTier.NAMES])
+def test_distribution_summary_from_stdin_counts_whole_stream(data_tier, monkeypatch):
+    full_path = os.path.join(TEST_DATA_DIR, "base-package-0.1.0.tar.gz")
+    with open(full_path, "rb") as f:
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(f.read())))
+    ds = _DistributionSummary.from_file("-", data_tier=data_tier)
+    assert ds.compressed_size_bytes == os.path.getsize(full_path)
+
+
+def test_distribution_summary_from_stdin_raises_for_unrecognized_content(
+    monkeypatch,
+):
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(b"hello")))
+    with pytest.raises(
+        ValueError, match=r"Contents of '\-' do not appear to be a Python package"
+    ):
+        _DistributionSummary.from_file("-")
+
+
+def test_distribution_summary_works_for_zstd_compressed_tarfiles(tmp_path, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    gz_path = os.path.join(
+        TEST_DATA_DIR, "debug-baseballmetrics-0.1.0-macosx-wheel.tar.gz"
+    )
+    zst_path = os.path.join(
+        tmp_path, "debug-baseballmetrics-0.1.0-macosx-wheel.tar.zst"
+    )
+    with gzip.open(gz_path, "rb") as f:
+        tar_bytes = f.read()
+    with open(zst_path, "wb") as f:
+        f.write(zstandard.ZstdCompressor().compress(tar_bytes))
+
+    expected = _DistributionSummary.from_file(gz_path)
+    ds = _DistributionSummary.from_file(zst_path)
+    assert ds.archive_format == _ArchiveFormat.ZSTD_TAR
+    assert ds.compressed_size_bytes == os.path.getsize(zst_path)
+    assert ds.files == expected.files
+    assert ds.directories == expected.directories
+
+    # the format is detected from the content when read from standard input
+    with open(zst_path, "rb") as f:
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(f.read())))
+    _assert_summaries_match(_DistributionSummary.from_file("-"), ds)
+
+    # compiled objects can be extracted from it, e.g. for summaries loaded from a cache
+    out_dir = os.path.join(tmp_path, "out")
+    _extract_subset_of_files_from_archive(
+        archive_file=zst_path,
+        archive_format=ds.archive_format,
+        relative_paths=[ds.compiled_objects[0].name],
+        out_dir=out_dir,
+    )
+    assert os.path.isfile(os.path.join(out_dir, ds.compiled_objects[0].name))
+
+
+def test_extract_subset_of_files_from_archive_stops_after_last_requested_file(
+    tmp_path,
+):
+    # the second member is incompressible, and the archive is cut off partway
+    # through it... the first member can only be extracted without an error if
+    # nothing after it is read
+    archive_path = os.path.join(tmp_path, "pkg-0.1.0.tar.gz")
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode="w") as tf:
+        for name, content in [
+            ("pkg-0.1.0/lib.so", b"compiled"),
+            ("pkg-0.1.0/data.bin", os.urandom(1024 * 1024)),
+        ]:
+            tar_info = tarfile.TarInfo(name=name)
+            tar_info.size = len(content)
+            tf.addfile(tar_info, io.BytesIO(content))
+    compressed = gzip.compress(tar_buffer.getvalue())
+    with open(archive_path, "wb") as f:
+        f.write(compressed[: len(compressed) // 2])
+
+    out_dir = os.path.join(tmp_path, "out")
+    _extract_subset_of_files_from_archive(
+        archive_file=archive_path,
+        archive_format=_ArchiveFormat.GZIP_TAR,
+        relative_paths=["pkg-0.1.0/lib.so"],
+        out_dir=out_dir,
+    )
+    with open(os.path.join(out_dir, "pkg-0.1.0", "lib.so"), "rb") as f:
+        assert f.read() == b"compiled"
+
+
+ZIP_PACKAGES = [
+    "base-package-0.1.0.zip",
+    *BASE_WHEELS,
+    *CONDA_PACKAGES,
+    f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}",
+    *WINDOWS_WHEELS,
+]
+
+
+@pytest.mark.parametrize("distro_file", ZIP_PACKAGES)
+def test_read_zip_member_header_from_memory_matches_zipfile(distro_file):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    with (
+        open(full_path, "rb") as f,
+        zipfile.ZipFile(f) as zf,
+        _mapped_file(f) as mapped_archive,
+    ):
+        assert mapped_archive is not None
+        for zip_info in zf.infolist():
+            header = _read_zip_member_header_from_memory(
+                mapped_archive=mapped_archive, zip_info=zip_info
+            )
+            assert header == zf.read(zip_info)[:4], zip_info.filename
+
+
+def test_read_zip_member_header_from_memory_handles_all_compression_types(tmp_path):
+    zip_path = os.path.join(tmp_path, "test.zip")
+    # random bytes after the header, so deflate has to use a large dynamic Huffman block
+    elf_content = b"\x7fELF" + os.urandom(100_000)
+    with zipfile.ZipFile(zip_path, mode="w") as zf:
+        zf.writestr("stored.so", elf_content, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("deflated.so", elf_content, compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("bzip2.so", elf_content, compress_type=zipfile.ZIP_BZIP2)
+        zf.writestr("empty.txt", b"", compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("short.txt", b"ab", compress_type=zipfile.ZIP_STORED)
+
+    with (
+        open(zip_path, "rb") as f,
+        zipfile.ZipFile(f) as zf,
+        _mapped_file(f) as mapped_archive,
+    ):
+        headers = {
+            zip_info.filename: _read_zip_member_header_from_memory(
+                mapped_archive=mapped_archive, zip_info=zip_info
+            )
+            for zip_info in zf.infolist()
+        }
+        # everything else falls back to ZipFile.open()
+        assert headers == {
+            "stored.so": b"\x7fELF",
+            "deflated.so": b"\x7fELF",
+            "bzip2.so": None,
+            "empty.txt": b"",
+            "short.txt": b"ab",
+        }
+        file_formats = {
+            zip_info.filename: _guess_archive_member_file_format(
+                archive_file=zf, member=zip_info, mapped_archive=mapped_archive
+            )
+            for zip_info in zf.infolist()
+        }
+    assert file_formats == {
+        "stored.so": (_FileFormat.ELF, True),
+        "deflated.so": (_FileFormat.ELF, True),
+        "bzip2.so": (_FileFormat.ELF, True),
+        "empty.txt": (_FileFormat.OTHER, False),
+        "short.txt": (_FileFormat.OTHER, False),
+    }
+
+
+@pytest.mark.parametrize("distro_file", [*BASE_WHEELS, *WINDOWS_WHEELS])
+def test_distribution_summary_sniffs_zip_headers_without_opening_members(distro_file):
+    full_path = os.path.join(TEST_DATA_DIR, distro_file)
+    expected = _DistributionSummary.from_file(full_path, data_tier=_DataTier.CONTENT)
+    with patch.object(
+        zipfile.ZipFile, "open", side_effect=RuntimeError("ZipFile.open() called")
+    ):
+        ds = _DistributionSummary.from_file(full_path, data_tier=_DataTier.HEADERS)
+    assert ds.files == expected.files
@@ -0,0 +1,167 @@
+import os
+import random
+import socket
+import zipfile
+
+import pytest
+
+from pydistcheck._distribution_summary import _DataTier, _DistributionSummary
+from pydistcheck._remote import _HTTPRangeFile, _is_url, _open_url, _RemoteFileError
+
+MANYLINUX_SUFFIX = "manylinux1_x86_64.manylinux_2_28_x86_64.manylinux_2_5_x86_64.whl"
+DISTRO_FILES = [
+    "base-package-0.1.0.tar.gz",
+    "base-package-0.1.0.zip",
+    f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}",
+    "osx-arm64-debug-baseballmetrics-0.1.0-0.tar.bz2",
+    "problematic-package-0.1.0.zip",
+]
+LARGE_WHEEL = "lightgbm-3.3.5-py3-none-win_amd64.whl"
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected"),
+    [
+        ("https://example.com/pkg-0.1.0.tar.gz", True),
+        ("HTTP://example.com/pkg-0.1.0.tar.gz", True),
+        ("file:///tmp/pkg-0.1.0.tar.gz", False),
+        ("ftp://example.com/pkg-0.1.0.tar.gz", False),
+        ("dist/pkg-0.1.0.tar.gz", False),
+    ],
+)
+def test_is_url_works(filename, expected):
+    assert _is_url(filename) is expected
+
+
+def test_http_range_file_reads_same_bytes_as_local_file(distribution_server):
+    server = distribution_server(supports_ranges=True)
+    local_file = os.path.join(TEST_DATA_DIR, "problematic-package-0.1.0.zip")
+    with open(local_file, "rb") as f:
+        expected = f.read()
+
+    # tiny blocks and cache, so reads span blocks and blocks are evicted
+    range_file = _HTTPRangeFile(
+        url=server.url_for("problematic-package-0.1.0.zip"),
+        size_bytes=len(expected),
+        block_size_bytes=100,
+        max_cached_blocks=3,
+    )
+    rng = random.Random(708)  # noqa: S311
+    for _ in range(200):
+        start = rng.randrange(0, len(expected))
+        num_bytes = rng.randrange(1, 500)
+        range_file.seek(start)
+        assert range_file.read(num_bytes) == expected[start : start + num_bytes]
+
+    range_file.seek(-10, os.SEEK_END)
+    assert range_file.read() == expected[-10:]
+    assert range_file.read(10) == b""
+
+
+def test_http_range_file_fetches_larger_ranges_for_sequential_reads(
+    distribution_server,
+):
+    server = distribution_server(supports_ranges=True)
+    size_bytes = os.path.getsize(os.path.join(TEST_DATA_DIR, LARGE_WHEEL))
+    range_file = _HTTPRangeFile(
+        url=server.url_for(LARGE_WHEEL),
+        size_bytes=size_bytes,
+        block_size_bytes=1024,
+        max_cached_blocks=64,
+    )
+    while range_file.read(1024):
+        pass
+    # 1 block, then 2, 4, 8, 16, then 32 at a time
+    assert range_file.num_requests < 40
+    assert range_file.num_bytes_downloaded == size_bytes
+
+
+def test_open_url_only_downloads_what_zipfile_needs(distribution_server):
+    server = distribution_server(supports_ranges=True)
+    with open(os.path.join(TEST_DATA_DIR, LARGE_WHEEL), "rb") as f:
+        expected_names = zipfile.ZipFile(f).namelist()
+
+    with _open_url(server.url_for(LARGE_WHEEL)) as f:
+        assert zipfile.ZipFile(f).namelist() == expected_names
+
+    assert all(h is not None for h in server.range_headers)
+    assert (
+        server.num_bytes_sent
+        < os.path.getsize(os.path.join(TEST_DATA_DIR, LARGE_WHEEL)) / 4
+    )
+
+
+def test_open_url_downloads_whole_file_if_server_does_not_support_ranges(
+    distribution_server,
+):
+    server = distribution_server(supports_ranges=False)
+    with open(os.path.join(TEST_DATA_DIR, LARGE_WHEEL), "rb") as f:
+        expected = f.read()
+
+    with _open_url(server.url_for(LARGE_WHEEL)) as f:
+        assert f.read() == expected
+
+    assert len(server.range_headers) == 1
+
+
+def test_open_url_raises_informative_error_for_missing_files(distribution_server):
+    server = distribution_server(supports_ranges=True)
+    with pytest.raises(_RemoteFileError, match=r"Could not download .+HTTP Error 404"):
+        _open_url(server.url_for("not-a-file.whl"))
+
+
+def test_open_url_raises_informative_error_if_connection_is_refused():
+    # find a port that nothing is listening on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(_RemoteFileError, match=r"Could not download .+refused"):
+        _open_url(f"http://127.0.0.1:{port}/some-package-0.1.0.tar.gz")
+
+
+def test_http_range_file_raises_informative_error_if_server_goes_away(
+    distribution_server,
+):
+    server = distribution_server(supports_ranges=True)
+    with _open_url(server.url_for(LARGE_WHEEL)) as f:
+        server.shutdown()
+        server.server_close()
+        with pytest.raises(_RemoteFileError, match=r"Could not read bytes 0\-"):
+            f.read(10)
+
+
+def test_open_url_rejects_other_schemes():
+    with pytest.raises(ValueError, match=r"Only http:// and https:// URLs"):
+        _open_url("file:///etc/passwd")
+
+
+@pytest.mark.parametrize("supports_ranges", [True, False])
+@pytest.mark.parametrize("distro_file", DISTRO_FILES)
+def test_distribution_summary_from_url_matches_local_file(
+    distro_file, supports_ranges, distribution_server
+):
+    server = distribution_server(supports_ranges=supports_ranges)
+    local_summary = _DistributionSummary.from_file(
+        os.path.join(TEST_DATA_DIR, distro_file)
+    )
+    remote_summary = _DistributionSummary.from_file(server.url_for(distro_file))
+    assert remote_summary.archive_format == local_summary.archive_format
+    assert remote_summary.compressed_size_bytes == local_summary.compressed_size_bytes
+    assert remote_summary.directories == local_summary.directories
+    assert remote_summary.files == local_summary.files
+    assert remote_summary.compiled_object_digests == (
+        local_summary.compiled_object_digests
+    )
+
+
+def test_distribution_summary_from_url_ignores_query_and_fragment(
+    distribution_server,
+):
+    server = distribution_server(supports_ranges=True)
+    distro_file = "base-package-0.1.0.zip"
+    summary = _DistributionSummary.from_file(
+        server.url_for(distro_file) + "?token=abc#sha256=123",
+        data_tier=_DataTier.NAMES,
+    )
+    assert summary.num_files == 11
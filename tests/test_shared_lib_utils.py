@@ -1,11 +1,332 @@
+import io
+import os
+import re
+import shutil
+import struct
 import subprocess
+import sys
+import time
+import zipfile
 from unittest.mock import Mock, patch
 
+import pytest
+
 from pydistcheck._shared_lib_utils import (
     _MACHO_STRIP_SYMBOL,
+    _NO_DEBUG_SYMBOLS,
+    _command_output_matches,
+    _commands_for_file_format,
+    _debug_symbol_tools,
+    _DebugSymbolsResult,
+    _detect_debug_symbols,
+    _file_has_debug_symbols,
     _get_symbols,
+    _look_for_debug_symbols,
+    _native_debug_symbols_check,
+    _pe_has_debug_symbols,
     _run_command,
+    _tool_is_available,
 )
+from pydistcheck._file_utils import _FileFormat
+
+MACOS_SUFFIX = "macosx_12_0_arm64.whl"
+MANYLINUX_SUFFIX = "manylinux1_x86_64.manylinux_2_28_x86_64.manylinux_2_5_x86_64.whl"
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def _extract_from_wheel(*, wheel_file: str, member_name: str, out_dir: str) -> str:
+    with zipfile.ZipFile(os.path.join(TEST_DATA_DIR, wheel_file), mode="r") as zf:
+        return zf.extract(member_name, path=out_dir)
+
+
+def _make_elf(
+    *,
+    elf_class: int,
+    byte_order: str,
+    section_names: list[str],
+    symbol_types: tuple[int, ...] = (),
+) -> bytes:
+    """
+    Create a minimal ELF file with a section header table, a table of section names,
+    and (if ``symbol_types`` is non-empty) a '.symtab' with one symbol of each type.
+    """
+    is_64_bit = elf_class == 2
+    ehdr_size = 64 if is_64_bit else 52
+    shentsize = 64 if is_64_bit else 40
+    symentsize = 24 if is_64_bit else 16
+    section_header_format = "IIQQQQIIQQ" if is_64_bit else "IIIIIIIIII"
+
+    all_names = ["", *section_names, ".shstrtab"]
+    if symbol_types:
+        all_names.insert(-1, ".symtab")
+    names_blob = b""
+    name_offsets = []
+    for name in all_names:
+        name_offsets.append(len(names_blob))
+        names_blob += name.encode("ascii") + b"\x00"
+
+    symtab_blob = b""
+    for symbol_type in symbol_types:
+        if is_64_bit:
+            symtab_blob += struct.pack(
+                byte_order + "IBBHQQ", 0, symbol_type, 0, 0, 0, 0
+            )
+        else:
+            symtab_blob += struct.pack(
+                byte_order + "IIIBBH", 0, 0, 0, symbol_type, 0, 0
+            )
+
+    names_offset = ehdr_size
+    symtab_offset = names_offset + len(names_blob)
+    shoff = symtab_offset + len(symtab_blob)
+
+    section_headers = b""
+    for i, name in enumerate(all_names):
+        sh_type, sh_offset, sh_size, sh_entsize = 1, 0, 0, 0
+        if name == ".shstrtab":
+            sh_type, sh_offset, sh_size = 3, names_offset, len(names_blob)
+        elif name == ".symtab":
+            sh_type, sh_offset, sh_size = 2, symtab_offset, len(symtab_blob)
+            sh_entsize = symentsize
+        elif i == 0:
+            sh_type = 0
+        section_headers += struct.pack(
+            byte_order + section_header_format,
+            name_offsets[i],
+            sh_type,
+            0,
+            0,
+            sh_offset,
+            sh_size,
+            0,
+            0,
+            0,
+            sh_entsize,
+        )
+
+    ei_data = 1 if byte_order == "<" else 2
+    e_ident = b"\x7fELF" + bytes([elf_class, ei_data, 1]) + b"\x00" * 9
+    if is_64_bit:
+        ehdr = e_ident + struct.pack(
+            byte_order + "HHIQQQIHHHHHH",
+            3,
+            62,
+            1,
+            0,
+            0,
+            shoff,
+            0,
+            ehdr_size,
+            0,
+            0,
+            shentsize,
+            len(all_names),
+            len(all_names) - 1,
+        )
+    else:
+        ehdr = e_ident + struct.pack(
+            byte_order + "HHIIIIIHHHHHH",
+            3,
+            3,
+            1,
+            0,
+            0,
+            shoff,
+            0,
+            ehdr_size,
+            0,
+            0,
+            shentsize,
+            len(all_names),
+            len(all_names) - 1,
+        )
+    return ehdr + names_blob + symtab_blob + section_headers
+
+
+def _make_macho(
+    *,
+    is_64_bit: bool,
+    byte_order: str,
+    sections: list[tuple[str, str]],
+    symbols: list[tuple[int, str]],
+) -> bytes:
+    """
+    Create a minimal Mach-O file with one segment load command holding ``sections``
+    (``(segment_name, section_name)`` pairs), and an ``LC_SYMTAB`` load command
+    with one ``(n_type, name)`` symbol per item in ``symbols``.
+    """
+    if is_64_bit:
+        magic, header_size, lc_segment = 0xFEEDFACF, 32, 0x19
+        segment_format, section_format, nlist_format = (
+            "16sQQQQiiII",
+            "16s16sQQIIIIIIII",
+            "IBBHQ",
+        )
+    else:
+        magic, header_size, lc_segment = 0xFEEDFACE, 28, 0x1
+        segment_format, section_format, nlist_format = (
+            "16sIIIIiiII",
+            "16s16sIIIIIIIII",
+            "IBBhI",
+        )
+
+    segment_cmdsize = (
+        8
+        + struct.calcsize(byte_order + segment_format)
+        + len(sections) * struct.calcsize(byte_order + section_format)
+    )
+    symtab_cmdsize = 24
+    sizeofcmds = segment_cmdsize + symtab_cmdsize
+
+    strings = b"\x00"
+    nlists = b""
+    for n_type, name in symbols:
+        nlists += struct.pack(byte_order + nlist_format, len(strings), n_type, 0, 0, 0)
+        strings += name.encode("ascii") + b"\x00"
+    symoff = header_size + sizeofcmds
+    stroff = symoff + len(nlists)
+
+    header = struct.pack(byte_order + "IiiIIII", magic, 0, 0, 1, 2, sizeofcmds, 0) + (
+        b"\x00" * 4 if is_64_bit else b""
+    )
+    segment = struct.pack(byte_order + "II", lc_segment, segment_cmdsize)
+    segment += struct.pack(
+        byte_order + segment_format,
+        sections[0][0].encode("ascii") if sections else b"",
+        0,
+        0,
+        0,
+        0,
+        0,
+        0,
+        len(sections),
+        0,
+    )
+    for segname, sectname in sections:
+        segment += struct.pack(
+            byte_order + section_format,
+            sectname.encode("ascii"),
+            segname.encode("ascii"),
+            *([0] * len(section_format.replace("16s", ""))),
+        )
+    symtab = struct.pack(
+        byte_order + "IIIIII",
+        0x2,
+        symtab_cmdsize,
+        symoff,
+        len(symbols),
+        stroff,
+        len(strings),
+    )
+    return header + segment + symtab + nlists + strings
+
+
+def _make_fat_binary(*, thin_binaries: list[bytes], magic: int) -> bytes:
+    fat_arch_format = ">iiIII" if magic == 0xCAFEBABE else ">iiQQII"
+    alignment = 4096
+    header = struct.pack(">II", magic, len(thin_binaries))
+    body = b""
+    for i, thin_binary in enumerate(thin_binaries):
+        # each architecture starts at the next page boundary
+        arch_offset = alignment * (1 + -(-len(body) // alignment))
+        body += b"\x00" * (arch_offset - alignment - len(body)) + thin_binary
+        fields = [i, 0, arch_offset, len(thin_binary), 12]
+        if magic != 0xCAFEBABE:
+            fields.append(0)
+        header += struct.pack(fat_arch_format, *fields)
+    return header + b"\x00" * (alignment - len(header)) + body
+
+
+def _make_pe(
+    *,
+    is_pe32_plus: bool,
+    section_names: list[str],
+    num_symbols: int = 0,
+    debug_types: tuple[int, ...] = (),
+) -> bytes:
+    """
+    Create a minimal PE file with the given sections, a COFF symbol table with ``num_symbols``
+    entries, and a debug directory in an '.rdata' section with one entry per item in ``debug_types``.
+
+    Section names longer than 8 characters are stored in the COFF string table.
+    """
+    all_sections = [*section_names, ".rdata"]
+    optional_header_magic = 0x20B if is_pe32_plus else 0x10B
+    num_rva_and_sizes_offset = 108 if is_pe32_plus else 92
+    size_of_optional_header = num_rva_and_sizes_offset + 4 + 16 * 8
+
+    rdata_rva, rdata_offset = 0x1000, 0x400
+    rdata = b""
+    for debug_type in debug_types:
+        rdata += struct.pack("<IIHHIIII", 0, 0, 0, 0, debug_type, 0, 0, 0)
+
+    string_table = b""
+    raw_names = []
+    for name in all_sections:
+        if len(name) > 8:
+            raw_names.append(f"/{4 + len(string_table)}".encode("ascii"))
+            string_table += name.encode("ascii") + b"\x00"
+        else:
+            raw_names.append(name.encode("ascii"))
+    string_table = struct.pack("<I", 4 + len(string_table)) + string_table
+    pointer_to_symbol_table = rdata_offset + len(rdata) if num_symbols else 0
+
+    data_directories = [(0, 0)] * 16
+    if debug_types:
+        data_directories[6] = (rdata_rva, len(rdata))
+    optional_header = struct.pack("<H", optional_header_magic)
+    optional_header += b"\x00" * (num_rva_and_sizes_offset - len(optional_header))
+    optional_header += struct.pack("<I", 16)
+    for rva, size in data_directories:
+        optional_header += struct.pack("<II", rva, size)
+
+    section_table = b""
+    for raw_name in raw_names:
+        if raw_name == b".rdata":
+            fields = (len(rdata), rdata_rva, len(rdata), rdata_offset)
+        else:
+            fields = (0, 0, 0, 0)
+        section_table += struct.pack("<8sIIII16s", raw_name, *fields, b"")
+
+    dos_header = b"MZ" + b"\x00" * 58 + struct.pack("<I", 64)
+    coff_header = struct.pack(
+        "<HHIIIHH",
+        0x8664,
+        len(all_sections),
+        0,
+        pointer_to_symbol_table,
+        num_symbols,
+        size_of_optional_header,
+        0,
+    )
+    headers = dos_header + b"PE\x00\x00" + coff_header + optional_header + section_table
+    out = headers + b"\x00" * (rdata_offset - len(headers)) + rdata
+    if num_symbols:
+        out += b"\x00" * (num_symbols * 18) + string_table
+    return out
+
+
+def test_detect_debug_symbols_records_tools_that_found_nothing(tmp_path):
+    some_file = tmp_path / "lib.so"
+    some_file.write_bytes(b"not a compiled object")
+    with (
+        patch(
+            "pydistcheck._shared_lib_utils._tool_is_available",
+            side_effect=lambda tool_name: tool_name in {"objdump", "nm"},
+        ),
+        patch(
+            "pydistcheck._shared_lib_utils._command_output_matches", return_value=False
+        ),
+        patch("pydistcheck._shared_lib_utils._run_command", return_value=""),
+    ):
+        result = _detect_debug_symbols(str(some_file), file_format=_FileFormat.ELF)
+    assert result == _DebugSymbolsResult(
+        has_debug_symbols=False, command=_NO_DEBUG_SYMBOLS, detected_by="objdump, nm"
+    )
+
+    with patch("pydistcheck._shared_lib_utils._tool_is_available", return_value=False):
+        result = _detect_debug_symbols(str(some_file), file_format=_FileFormat.ELF)
+    assert result.detected_by == "no tools available"
 
 
 def test_run_command_handles_binary_output():
@@ -58,3 +379,397 @@ def test_get_symbols_filters_radr_symbol():
         assert "_data" in result
         assert _MACHO_STRIP_SYMBOL not in result
         assert len(result.split("\n")) == 2  # Only two real symbols
+
+
+@pytest.mark.parametrize(
+    ("wheel_prefix", "expected_result"),
+    [
+        ("baseballmetrics", (False, _NO_DEBUG_SYMBOLS)),
+        ("debug-baseballmetrics", (True, "objdump --all-headers")),
+    ],
+)
+def test_file_has_debug_symbols_parses_elf_files_without_running_any_commands(
+    tmp_path, wheel_prefix, expected_result
+):
+    lib_file = _extract_from_wheel(
+        wheel_file=f"{wheel_prefix}-0.1.0-py3-none-{MANYLINUX_SUFFIX}",
+        member_name="lib/lib_baseballmetrics.so",
+        out_dir=str(tmp_path),
+    )
+    with patch("subprocess.run", side_effect=RuntimeError("subprocess.run() called")):
+        assert _file_has_debug_symbols(file_absolute_path=lib_file) == expected_result
+
+
+@pytest.mark.parametrize("elf_format", [(1, "<"), (1, ">"), (2, "<"), (2, ">")])
+@pytest.mark.parametrize(
+    ("section_names", "symbol_types", "expected_result"),
+    [
+        ([".text", ".dynsym"], (), (False, _NO_DEBUG_SYMBOLS)),
+        ([".text", ".debug_info", ".debug_line"], (), (True, "objdump --all-headers")),
+        ([".text", ".debug_info"], (), (True, "objdump -W")),
+        ([".text", ".zdebug_info"], (), (True, "readelf -S")),
+        # only global functions and objects in '.symtab'
+        ([".text"], (0, 2, 1), (False, _NO_DEBUG_SYMBOLS)),
+        # file symbol in '.symtab'
+        ([".text"], (0, 2, 4), (True, "nm -a")),
+    ],
+)
+def test_native_debug_symbols_check_handles_all_elf_classes_and_byte_orders(
+    tmp_path, elf_format, section_names, symbol_types, expected_result
+):
+    elf_class, byte_order = elf_format
+    lib_file = tmp_path / "lib.so"
+    lib_file.write_bytes(
+        _make_elf(
+            elf_class=elf_class,
+            byte_order=byte_order,
+            section_names=section_names,
+            symbol_types=symbol_types,
+        )
+    )
+    assert _native_debug_symbols_check(str(lib_file)) == expected_result
+
+
+def test_native_debug_symbols_check_returns_none_for_malformed_elf_files(tmp_path):
+    lib_file = tmp_path / "lib.so"
+    elf_bytes = _make_elf(
+        elf_class=2, byte_order="<", section_names=[".text", ".debug_info"]
+    )
+    # truncate in the middle of the section header table
+    lib_file.write_bytes(elf_bytes[:-10])
+    assert _native_debug_symbols_check(str(lib_file)) is None
+
+
+def test_native_debug_symbols_check_returns_none_for_unrecognized_formats(tmp_path):
+    some_file = tmp_path / "thing.py"
+    some_file.write_text("print('hello')\n")
+    assert _native_debug_symbols_check(str(some_file)) is None
+
+
+@pytest.mark.parametrize(
+    ("wheel_prefix", "expected_result"),
+    [
+        ("baseballmetrics", (False, _NO_DEBUG_SYMBOLS)),
+        ("debug-baseballmetrics", (True, "dsymutil -s")),
+    ],
+)
+def test_file_has_debug_symbols_parses_macho_files_without_running_any_commands(
+    tmp_path, wheel_prefix, expected_result
+):
+    lib_file = _extract_from_wheel(
+        wheel_file=f"{wheel_prefix}-0.1.0-py3-none-{MACOS_SUFFIX}",
+        member_name="lib/lib_baseballmetrics.dylib",
+        out_dir=str(tmp_path),
+    )
+    with patch("subprocess.run", side_effect=RuntimeError("subprocess.run() called")):
+        assert _file_has_debug_symbols(file_absolute_path=lib_file) == expected_result
+
+
+@pytest.mark.parametrize("fat_magic", [0xCAFEBABE, 0xCAFEBABF])
+def test_native_debug_symbols_check_handles_macho_fat_binaries(tmp_path, fat_magic):
+    thin_binaries = {}
+    for wheel_prefix in ["baseballmetrics", "debug-baseballmetrics"]:
+        lib_file = _extract_from_wheel(
+            wheel_file=f"{wheel_prefix}-0.1.0-py3-none-{MACOS_SUFFIX}",
+            member_name="lib/lib_baseballmetrics.dylib",
+            out_dir=str(tmp_path / wheel_prefix),
+        )
+        with open(lib_file, "rb") as f:
+            thin_binaries[wheel_prefix] = f.read()
+
+    # debug symbols in any of the architectures should be found
+    fat_file = tmp_path / "fat.dylib"
+    fat_file.write_bytes(
+        _make_fat_binary(
+            thin_binaries=[
+                thin_binaries["baseballmetrics"],
+                thin_binaries["debug-baseballmetrics"],
+            ],
+            magic=fat_magic,
+        )
+    )
+    assert _native_debug_symbols_check(str(fat_file)) == (True, "dsymutil -s")
+
+    fat_file.write_bytes(
+        _make_fat_binary(
+            thin_binaries=[thin_binaries["baseballmetrics"]] * 2, magic=fat_magic
+        )
+    )
+    assert _native_debug_symbols_check(str(fat_file)) == (False, _NO_DEBUG_SYMBOLS)
+
+
+@pytest.mark.parametrize(
+    "macho_format", [(True, "<"), (True, ">"), (False, "<"), (False, ">")]
+)
+@pytest.mark.parametrize(
+    ("sections", "symbols", "expected_result"),
+    [
+        ([("__TEXT", "__text")], [(0x0F, "_main")], (False, _NO_DEBUG_SYMBOLS)),
+        # N_OPT symbol added by Apple's 'strip'
+        (
+            [("__TEXT", "__text")],
+            [(0x0F, "_main"), (0x3C, _MACHO_STRIP_SYMBOL)],
+            (False, _NO_DEBUG_SYMBOLS),
+        ),
+        # N_FUN
+        ([("__TEXT", "__text")], [(0x24, "_main")], (True, "nm -a")),
+        # N_OSO
+        (
+            [("__TEXT", "__text")],
+            [(0x24, "_main"), (0x66, "/build/main.o")],
+            (True, "dsymutil -s"),
+        ),
+        (
+            [("__DWARF", "__debug_info"), ("__DWARF", "__debug_line")],
+            [(0x0F, "_main")],
+            (True, "llvm-objdump --macho --all-headers"),
+        ),
+    ],
+)
+def test_native_debug_symbols_check_handles_macho_load_commands(
+    tmp_path, macho_format, sections, symbols, expected_result
+):
+    is_64_bit, byte_order = macho_format
+    lib_file = tmp_path / "lib.dylib"
+    lib_file.write_bytes(
+        _make_macho(
+            is_64_bit=is_64_bit,
+            byte_order=byte_order,
+            sections=sections,
+            symbols=symbols,
+        )
+    )
+    assert _native_debug_symbols_check(str(lib_file)) == expected_result
+
+
+def test_native_debug_symbols_check_returns_none_for_java_class_files(tmp_path):
+    # same magic as Mach-O fat binaries, followed by minor version 0 and major version 65 (Java 21)
+    class_file = tmp_path / "Thing.class"
+    class_file.write_bytes(struct.pack(">IHH", 0xCAFEBABE, 0, 65) + b"\x00" * 64)
+    assert _native_debug_symbols_check(str(class_file)) is None
+
+
+def test_file_has_debug_symbols_parses_pe_files_without_running_any_commands(tmp_path):
+    lib_file = _extract_from_wheel(
+        wheel_file="lightgbm-3.3.5-py3-none-win_amd64.whl",
+        member_name="lightgbm/lib_lightgbm.dll",
+        out_dir=str(tmp_path),
+    )
+    with patch("subprocess.run", side_effect=RuntimeError("subprocess.run() called")):
+        assert _file_has_debug_symbols(file_absolute_path=lib_file) == (
+            False,
+            _NO_DEBUG_SYMBOLS,
+        )
+
+
+def test_file_has_debug_symbols_does_not_flag_dlls_that_only_reference_a_pdb(tmp_path):
+    lib_file = tmp_path / "lib_thing.dll"
+    lib_file.write_bytes(
+        _make_pe(is_pe32_plus=True, section_names=[".text", ".data"], debug_types=(2,))
+    )
+    with patch("subprocess.run", side_effect=RuntimeError("subprocess.run() called")):
+        assert _file_has_debug_symbols(file_absolute_path=str(lib_file)) == (
+            False,
+            _NO_DEBUG_SYMBOLS,
+        )
+
+
+@pytest.mark.parametrize("is_pe32_plus", [True, False])
+@pytest.mark.parametrize(
+    ("section_names", "num_symbols", "debug_types", "expected_result"),
+    [
+        ([".text", ".data"], 0, (), (False, _NO_DEBUG_SYMBOLS)),
+        # POGO entry in the debug directory, from MSVC release builds
+        ([".text", ".data"], 0, (13,), (False, _NO_DEBUG_SYMBOLS)),
+        # DWARF sections from MinGW, with long names in the COFF string table
+        (
+            [".text", ".debug_info", ".debug_line"],
+            2,
+            (),
+            (True, "objdump --all-headers"),
+        ),
+        ([".text", ".debug_info"], 1, (), (True, "objdump -W")),
+        ([".text", ".data"], 5, (), (True, "nm -a")),
+        # CodeView entry in the debug directory, pointing to a separate '.pdb'...
+        # MSVC writes that for every '/DEBUG' build, even if the '.pdb' isn't shipped
+        ([".text", ".data"], 0, (2,), (False, _NO_DEBUG_SYMBOLS)),
+        ([".text", ".data"], 0, (13, 2), (False, _NO_DEBUG_SYMBOLS)),
+    ],
+)
+def test_pe_has_debug_symbols_works_on_byte_buffers(
+    is_pe32_plus, section_names, num_symbols, debug_types, expected_result
+):
+    pe_bytes = _make_pe(
+        is_pe32_plus=is_pe32_plus,
+        section_names=section_names,
+        num_symbols=num_symbols,
+        debug_types=debug_types,
+    )
+    assert _pe_has_debug_symbols(io.BytesIO(pe_bytes)) == expected_result
+
+
+def test_native_debug_symbols_check_returns_none_for_dos_executables(tmp_path):
+    exe_file = tmp_path / "thing.exe"
+    exe_file.write_bytes(b"MZ" + b"\x00" * 126)
+    assert _native_debug_symbols_check(str(exe_file)) is None
+
+
+def _python_command(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+DEBUG_PATTERN = re.compile(rb"^Contents of the \.debug", flags=re.MULTILINE)
+
+
+def test_command_output_matches_stops_command_at_first_match():
+    cmd = _python_command(
+        "import sys, time\n"
+        "print('Contents of the .debug_info section:', flush=True)\n"
+        "time.sleep(60)\n"
+    )
+    start_time = time.monotonic()
+    assert _command_output_matches(args=cmd, pattern=DEBUG_PATTERN) is True
+    assert time.monotonic() - start_time < 30
+
+
+def test_command_output_matches_handles_lines_split_across_reads():
+    cmd = _python_command(
+        "import sys, time\n"
+        "print('x' * 200000)\n"
+        "sys.stdout.write('Contents of the ')\n"
+        "sys.stdout.flush()\n"
+        "time.sleep(0.2)\n"
+        "print('.debug_info section:')\n"
+    )
+    assert _command_output_matches(args=cmd, pattern=DEBUG_PATTERN) is True
+
+
+def test_command_output_matches_searches_last_line_without_trailing_newline():
+    cmd = _python_command(
+        "import sys; sys.stdout.write('abc\\nContents of the .debug_line section')"
+    )
+    assert _command_output_matches(args=cmd, pattern=DEBUG_PATTERN) is True
+
+
+def test_command_output_matches_returns_false_if_nothing_matches():
+    cmd = _python_command(
+        "for i in range(100000):\n    print(f'{i} Contents of the .text section')\n"
+    )
+    assert _command_output_matches(args=cmd, pattern=DEBUG_PATTERN) is False
+
+
+def test_command_output_matches_returns_false_if_tool_is_not_available():
+    assert (
+        _command_output_matches(
+            args=["some-tool-that-definitely-does-not-exist"], pattern=DEBUG_PATTERN
+        )
+        is False
+    )
+
+
+@pytest.mark.skipif(shutil.which("objdump") is None, reason="objdump is not available")
+def test_look_for_debug_symbols_works_with_external_tools(tmp_path):
+    lib_file = _extract_from_wheel(
+        wheel_file=f"debug-baseballmetrics-0.1.0-py3-none-{MANYLINUX_SUFFIX}",
+        member_name="lib/lib_baseballmetrics.so",
+        out_dir=str(tmp_path),
+    )
+    assert _look_for_debug_symbols(lib_file=lib_file) == (
+        True,
+        "objdump --all-headers",
+    )
+
+
+@pytest.fixture
+def all_tools_available():
+    _tool_is_available.cache_clear()
+    with patch("shutil.which", side_effect=lambda tool: f"/usr/bin/{tool}"):
+        yield
+    _tool_is_available.cache_clear()
+
+
+def test_tool_is_available_only_looks_for_each_tool_once():
+    _tool_is_available.cache_clear()
+    with patch("shutil.which", return_value=None) as mock_which:
+        for _ in range(3):
+            assert _tool_is_available("objdump") is False
+            assert _tool_is_available("readelf") is False
+    assert mock_which.call_count == 2
+    _tool_is_available.cache_clear()
+
+
+def test_commands_for_file_format_routes_commands_by_format(all_tools_available):
+    elf_commands = [" ".join(cmd) for cmd, _ in _commands_for_file_format("ELF")]
+    assert "readelf -S" in elf_commands
+    assert "objdump --all-headers" in elf_commands
+    assert not any(cmd.startswith("dsymutil") for cmd in elf_commands)
+    assert not any("--macho" in cmd for cmd in elf_commands)
+
+    macho_commands = [" ".join(cmd) for cmd, _ in _commands_for_file_format("Mach-O")]
+    assert macho_commands[0] == "dsymutil -s"
+    assert "objdump --macho -W" in macho_commands
+    assert "readelf -S" not in macho_commands
+
+    pe_commands = [" ".join(cmd) for cmd, _ in _commands_for_file_format("Windows PE")]
+    assert pe_commands[0] == "objdump --all-headers"
+    assert not any(cmd.startswith(("dsymutil", "readelf")) for cmd in pe_commands)
+    assert not any("--macho" in cmd for cmd in pe_commands)
+
+    # if the format isn't known, every command is tried
+    assert len(_commands_for_file_format(None)) == 14
+    assert len(_commands_for_file_format("Other")) == 14
+
+
+def test_commands_for_file_format_skips_tools_that_are_not_available():
+    _tool_is_available.cache_clear()
+    with patch(
+        "shutil.which",
+        side_effect=lambda tool: None if tool == "objdump" else f"/usr/bin/{tool}",
+    ):
+        commands = [cmd for cmd, _ in _commands_for_file_format("ELF")]
+        assert commands
+        assert all(cmd[0] != "objdump" for cmd in commands)
+        assert _debug_symbol_tools("ELF") == [
+            "llvm-objdump",
+            "readelf",
+            "nm",
+            "llvm-nm",
+        ]
+    _tool_is_available.cache_clear()
+
+
+def test_file_has_debug_symbols_only_runs_applicable_commands_when_parsing_fails(
+    tmp_path, all_tools_available
+):
+    # a truncated ELF file can't be parsed directly, so tools have to be used
+    lib_file = tmp_path / "lib.so"
+    elf_bytes = _make_elf(elf_class=2, byte_order="<", section_names=[".text"])
+    lib_file.write_bytes(elf_bytes[:-10])
+    with (
+        patch(
+            "pydistcheck._shared_lib_utils._command_output_matches", return_value=False
+        ) as mock_matches,
+        patch(
+            "pydistcheck._shared_lib_utils._run_command", return_value=""
+        ) as mock_run_command,
+    ):
+        assert _file_has_debug_symbols(
+            file_absolute_path=str(lib_file), file_format="ELF"
+        ) == (False, _NO_DEBUG_SYMBOLS)
+    commands_run = [
+        " ".join(mock_call.kwargs["args"][:-1]) for mock_call in mock_matches.mock_calls
+    ]
+    assert commands_run == [
+        "objdump --all-headers",
+        "objdump -W",
+        "objdump -g",
+        "llvm-objdump --all-headers",
+        "llvm-objdump -W",
+        "llvm-objdump -g",
+        "readelf -S",
+    ]
+    nm_commands_run = [
+        " ".join(mock_call.kwargs["args"][:-1])
+        for mock_call in mock_run_command.mock_calls
+    ]
+    assert nm_commands_run == ["nm", "nm -a", "llvm-nm", "llvm-nm -a"]
@@ -0,0 +1,162 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+from pydistcheck import _size_estimate
+from pydistcheck._distribution_summary import _DistributionSummary
+from pydistcheck._size_estimate import (
+    _estimate_from_gzip_trailer,
+    _estimate_uncompressed_size,
+    _size_of_conda_package_files,
+)
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@pytest.mark.parametrize(
+    "distro_file",
+    [
+        "base-package-0.1.0.zip",
+        "baseballmetrics-0.1.0-py3-none-macosx_12_0_arm64.whl",
+        "osx-arm64-baseballmetrics-0.1.0-0.conda",
+        "osx-arm64-baseballmetrics-0.1.0-0.tar.bz2",
+    ],
+)
+def test_estimate_matches_uncompressed_size_for_zip_and_conda_files(distro_file):
+    distro_path = os.path.join(TEST_DATA_DIR, distro_file)
+    estimate = _estimate_uncompressed_size(distro_path)
+    assert estimate is not None
+    assert not estimate.is_upper_bound
+    summary = _DistributionSummary.from_file(distro_path)
+    assert estimate.size_bytes == summary.uncompressed_size_bytes
+
+
+@pytest.mark.parametrize(
+    "distro_file",
+    ["base-package-0.1.0.tar.gz", "problematic-package-0.1.0.tar.gz"],
+)
+def test_estimate_is_upper_bound_for_gzip_files(distro_file):
+    distro_path = os.path.join(TEST_DATA_DIR, distro_file)
+    estimate = _estimate_uncompressed_size(distro_path)
+    assert estimate is not None
+    assert estimate.is_upper_bound
+    assert estimate.source == "the gzip trailer"
+    # the length of the whole tar file, including headers and padding
+    with gzip.open(distro_path) as f:
+        assert estimate.size_bytes == len(f.read())
+    summary = _DistributionSummary.from_file(distro_path)
+    assert estimate.size_bytes >= summary.uncompressed_size_bytes
+
+
+def _tar_gz_with_file_of_size(size_bytes: int) -> bytes:
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode="w") as tf:
+        tar_info = tarfile.TarInfo(name="pkg-0.1.0/data.bin")
+        tar_info.size = size_bytes
+        tf.addfile(tar_info, io.BytesIO(os.urandom(size_bytes)))
+    return gzip.compress(tar_buffer.getvalue())
+
+
+def test_gzip_trailer_is_not_used_if_length_could_plausibly_have_wrapped(monkeypatch):
+    compressed = gzip.compress(b"\x00" * 10_240)
+    assert _estimate_from_gzip_trailer(io.BytesIO(compressed)) is not None
+    # pretend this file could plausibly be compressed enough to need more than 32 bits
+    monkeypatch.setattr(_size_estimate, "_MAX_PLAUSIBLE_COMPRESSION_RATIO", 2**32)
+    assert _estimate_from_gzip_trailer(io.BytesIO(compressed)) is None
+
+
+def test_gzip_trailer_is_used_for_files_larger_than_4mb():
+    # deflate could in theory shrink 4 GiB to this size, but not plausibly
+    compressed = _tar_gz_with_file_of_size(5 * 1024 * 1024)
+    assert len(compressed) * _size_estimate._MAX_DEFLATE_RATIO > 2**32
+    estimate = _estimate_from_gzip_trailer(io.BytesIO(compressed))
+    assert estimate is not None
+    assert estimate.size_bytes == len(gzip.decompress(compressed))
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        # ISIZE of the last member isn't a whole number of tar blocks
+        [b"\x00" * 10_000, b"\x00" * 2_000 + b"pydistcheck"],
+        # ISIZE of the last member is too small for everything before it
+        [os.urandom(100_000), b"\x00" * 1024],
+        # empty last member, like the end-of-file marker in BGZF files
+        [b"\x00" * 10_240, b""],
+    ],
+)
+def test_gzip_trailer_is_not_used_for_multi_member_files(members):
+    compressed = b"".join(gzip.compress(member) for member in members)
+    assert _estimate_from_gzip_trailer(io.BytesIO(compressed)) is None
+
+
+def test_gzip_trailer_is_not_used_for_bgzf_files():
+    # a BGZF block header: FEXTRA flag, with a 'BC' subfield holding the block size
+    bgzf_header = (
+        b"\x1f\x8b\x08\x04" + b"\x00" * 4 + b"\x00\xff" + b"\x06\x00BC\x02\x00\x1b\x00"
+    )
+    compressed = gzip.compress(b"\x00" * 10_240)
+    bgzf_block = bgzf_header + compressed[10:]
+    assert _estimate_from_gzip_trailer(io.BytesIO(bgzf_block)) is None
+    # the same member without the subfield is fine
+    assert _estimate_from_gzip_trailer(io.BytesIO(compressed)) is not None
+
+
+def test_gzip_trailer_skips_optional_header_fields(tmp_path):
+    tar_gz_path = os.path.join(tmp_path, "pkg-0.1.0.tar.gz")
+    with gzip.GzipFile(tar_gz_path, mode="wb") as f:
+        f.write(b"\x00" * 10_240)
+    # 'gzip.GzipFile' stores the file name (FNAME) in the header
+    with open(tar_gz_path, "rb") as f:
+        assert f.read(4)[3] & 0x08
+        f.seek(0)
+        estimate = _estimate_from_gzip_trailer(f)
+    assert estimate is not None
+    assert estimate.size_bytes == 10_240
+
+
+def test_no_estimate_for_tarballs_without_conda_metadata():
+    # a re-tarred wheel... bzip2 has no size trailer, and this has no 'info/paths.json'
+    distro_path = os.path.join(
+        TEST_DATA_DIR, "debug-baseballmetrics-0.1.0-macosx-wheel.tar.bz2"
+    )
+    assert _estimate_uncompressed_size(distro_path) is None
+
+
+def test_no_estimate_for_conda_packages_missing_file_sizes(tmp_path):
+    paths_json = json.dumps(
+        {
+            "paths": [
+                {"_path": "lib/a.py", "path_type": "hardlink", "size_in_bytes": 10},
+                {"_path": "lib/b.py", "path_type": "hardlink"},
+            ]
+        }
+    ).encode("utf-8")
+    distro_path = tmp_path / "pkg-0.1.0-0.tar.bz2"
+    with tarfile.open(distro_path, mode="w:bz2") as tf:
+        tar_info = tarfile.TarInfo("info/paths.json")
+        tar_info.size = len(paths_json)
+        tf.addfile(tar_info, io.BytesIO(paths_json))
+    assert _estimate_uncompressed_size(str(distro_path)) is None
+
+
+def test_size_of_conda_package_files_skips_links_and_directories():
+    paths_json = {
+        "paths": [
+            {"_path": "lib/a.py", "path_type": "hardlink", "size_in_bytes": 10},
+            {"_path": "lib/b.py", "size_in_bytes": 5},
+            {"_path": "lib/c.py", "path_type": "softlink", "size_in_bytes": 10},
+            {"_path": "lib/empty", "path_type": "directory"},
+        ]
+    }
+    assert _size_of_conda_package_files(json.dumps(paths_json).encode()) == 15
+    assert _size_of_conda_package_files(b"not json") is None
+
+
+def test_estimate_raises_for_unsupported_formats():
+    with pytest.raises(ValueError, match=r"does not appear to be a Python package"):
+        _estimate_uncompressed_size(os.path.join(TEST_DATA_DIR, "pkg.rar"))
@@ -1,6 +1,9 @@
+import pickle
+from fnmatch import fnmatchcase
+
 import pytest
 
-from pydistcheck._utils import _FileSize
+from pydistcheck._utils import _FileSize, _PatternIndex
 
 
 @pytest.mark.parametrize(
@@ -156,3 +159,73 @@ def test_file_is_hashable():
 )
 def test_file_size_string_representation_looks_correct(file_size, expected_str):
     assert str(file_size) == expected_str
+
+
+PATTERNS = [
+    "*/.DS_Store",
+    "*/.github",
+    "*.pyc",
+    "*/docs/conf.py",
+    "pkg/setup.py",
+    "*/tests/*",
+    "*/build/*.so",
+    "*.py[co]",
+    "*?.txt",
+    "*",
+    "*/",
+    "*.pyc",
+]
+PATHS = [
+    ".DS_Store",
+    "/.DS_Store",
+    "pkg/.DS_Store",
+    "pkg/sub/.DS_Store",
+    "pkg/.DS_Store/x",
+    "pkg/.github",
+    "pkg/.github/",
+    "a.pyc",
+    "pkg/mod.pyo",
+    "pkg/docs/conf.py",
+    "docs/conf.py",
+    "pkg/setup.py",
+    "pkg/setup.pyc",
+    "pkg/tests/test_x.py",
+    "pkg/build/lib.so",
+    "pkg/build/sub/lib.so",
+    ".txt",
+    "pkg/a.txt",
+    "PKG/.ds_store",
+    "",
+]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_pattern_index_matches_same_patterns_as_fnmatchcase(path):
+    index = _PatternIndex(PATTERNS)
+    expected = [i for i, p in enumerate(PATTERNS) if fnmatchcase(path, p)]
+    assert index.match(path) == expected
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_pattern_index_matches_directories_with_or_without_trailing_slash(path):
+    index = _PatternIndex(PATTERNS)
+    expected = [
+        i
+        for i, p in enumerate(PATTERNS)
+        if fnmatchcase(path, p) or fnmatchcase(path, p + "/")
+    ]
+    assert index.match_directory(path) == expected
+
+
+def test_pattern_index_reports_original_patterns():
+    index = _PatternIndex(["*.pyc", "*/.git", "*.pyc", "src/*/x?"])
+    assert [index.patterns[i] for i in index.match("pkg/a.pyc")] == ["*.pyc", "*.pyc"]
+    assert index.match_directory("pkg/.git/") == [1]
+    assert index.match("src/pkg/x1") == [3]
+    assert index.match("pkg/README.md") == []
+
+
+def test_pattern_index_can_be_pickled():
+    # checks are sent to other processes when checking distributions in parallel
+    index = pickle.loads(pickle.dumps(_PatternIndex(PATTERNS)))  # noqa: S301
+    assert index.match("pkg/sub/.DS_Store") == [0, 9]